@@ -0,0 +1,31 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Database rows are rolled back after every test (and primary keys get reused),
+    so cached per-user data must not leak from one test into the next.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def no_background_prefetch(settings):
+    """
+    Background pre-generation threads would outlive the test transaction;
+    the prefetch tests run the builds inline instead.
+    """
+    settings.GAME_PREFETCH = False
+
+
+@pytest.fixture(autouse=True)
+def no_async_game_creation(settings):
+    """
+    Games are created in the request unless a test turns asynchronous creation
+    back on (and runs the jobs inline).
+    """
+    settings.ASYNC_GAME_CREATION = []
@@ -1,11 +1,17 @@
 from django.contrib import admin
-from .models import Game, Cell, Item, Room
+from .models import (Game, Cell, Item, Room, DailyChallenge, DailyChallengeResult, DailyChallengeStart, BankPuzzle,
+                     GameCreationJob)
 
 admin.site.register(Game)
 admin.site.register(Item)
 admin.site.register(Room)
+admin.site.register(DailyChallenge)
+admin.site.register(DailyChallengeResult)
+admin.site.register(DailyChallengeStart)
+admin.site.register(BankPuzzle)
+admin.site.register(GameCreationJob)
 
 @admin.register(Cell)
 class CellAdmin(admin.ModelAdmin):
-    list_display = ('id', 'game', 'row', 'column', 'selected_item', 'correct_item', 'prefilled')
-    list_filter = ('game', 'prefilled')
\ No newline at end of file
+    list_display = ('id', 'game', 'index', 'selected_item')
+    list_filter = ('game',)
\ No newline at end of file
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class GameplayConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'gameplay'
\ No newline at end of file
+    name = 'gameplay'
+
+    def ready(self):
+        # Register cache invalidation handlers
+        from . import signals  # noqa: F401
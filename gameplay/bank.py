@@ -0,0 +1,161 @@
+import itertools
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+
+from .models import BankPuzzle
+from .utils import dig_rated_puzzle, generate_sudoku, in_rating_band
+
+# Seed of the first candidate; chunk k tries the seeds DEFAULT_BANK_SEED + k * chunk_size onwards
+DEFAULT_BANK_SEED = 1
+
+# Candidate seeds per task sent to a worker process
+CHUNK_SIZE = 100
+
+# Rows per INSERT
+BATCH_SIZE = 500
+
+# Outcome of build_bank (and the progress passed to its callback)
+BankBuildProgress = namedtuple("BankBuildProgress", ["difficulty", "stored", "target", "inserted", "duplicates",
+                                                     "candidates", "seconds"])
+
+
+def encode_grid(grid):
+    """
+    Converts a 9x9 grid into the 81-digit string stored in BankPuzzle (0 = empty).
+    """
+    return "".join(str(number) for row in grid for number in row)
+
+
+def make_unique_puzzle(seed, difficulty='easy'):
+    """
+    Builds a puzzle with exactly one solution, rated within the difficulty's band, from a seed.
+
+    Generates a board with generate_sudoku and digs puzzles out of it (see dig_rated_puzzle);
+    the bank only keeps puzzles whose rating is inside the band.
+
+    Returns:
+        tuple[str, str, int] | None: (givens, solution, rating), the grids as 81-digit strings,
+        or None if no puzzle within the band was found for this seed.
+    """
+    rng = random.Random(seed)
+    board = generate_sudoku(rng)
+    rated = dig_rated_puzzle(board, difficulty, rng)
+    if rated is None:
+        return None
+
+    hidden, rating = rated
+    if not in_rating_band(rating, difficulty):
+        return None
+    grid = [[0 if r * 9 + c in hidden else board[r][c] for c in range(9)] for r in range(9)]
+    return encode_grid(grid), encode_grid(board), rating
+
+
+def generate_chunk(difficulty, base_seed, chunk, chunk_size=CHUNK_SIZE):
+    """
+    Worker task: tries every seed of one chunk.
+
+    Runs in a worker process and never touches the database; the parent process inserts the results.
+
+    Returns:
+        list[tuple[int, str, str, int]]: (seed, givens, solution, rating) of the seeds that produced a puzzle.
+    """
+    start = base_seed + chunk * chunk_size
+    puzzles = []
+    for seed in range(start, start + chunk_size):
+        puzzle = make_unique_puzzle(seed, difficulty)
+        if puzzle is not None:
+            puzzles.append((seed, *puzzle))
+    return puzzles
+
+
+def get_done_chunks(difficulty, base_seed, chunk_size=CHUNK_SIZE):
+    """
+    Returns the chunks of an earlier build with this seed that already stored puzzles.
+    """
+    seeds = BankPuzzle.objects.filter(difficulty=difficulty, seed__gte=base_seed).values_list("seed", flat=True)
+    return {(seed - base_seed) // chunk_size for seed in seeds.iterator()}
+
+
+def store_puzzles(difficulty, puzzles):
+    """
+    Bulk inserts generated puzzles, skipping ones already in the bank.
+
+    Returns:
+        tuple[int, int]: (inserted, duplicates)
+    """
+    unique = {givens: (seed, solution, rating) for seed, givens, solution, rating in puzzles}
+    existing = set(BankPuzzle.objects.filter(givens__in=list(unique)).values_list("givens", flat=True))
+    rows = [
+        BankPuzzle(difficulty=difficulty, givens=givens, solution=solution, seed=seed, rating=rating)
+        for givens, (seed, solution, rating) in unique.items()
+        if givens not in existing
+    ]
+    # ignore_conflicts covers a concurrent build inserting the same puzzle in between
+    BankPuzzle.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(rows), len(puzzles) - len(rows)
+
+
+def get_executor(workers):
+    """
+    Returns a process pool for build_bank. Workers set up Django themselves,
+    so the pool also works where processes are spawned instead of forked.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+
+def build_bank(difficulty, target, workers=None, seed=DEFAULT_BANK_SEED, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Fills the bank with puzzles of one difficulty until it holds `target` of them.
+
+    Chunks of candidate seeds are generated on a process pool, at most two per worker
+    in flight, and every finished chunk is inserted right away. Each chunk has its own
+    seed range, so the puzzles don't depend on the number of workers, and a stopped
+    build started again with the same seed and chunk size skips the chunks it stored.
+
+    Args:
+        difficulty (str): Difficulty level ('easy', 'medium', 'hard').
+        target (int): Number of puzzles the bank should hold for the difficulty.
+        workers (int): Worker processes (all CPUs when omitted).
+        seed (int): Seed of the first candidate.
+        chunk_size (int): Candidate seeds per task.
+        progress (callable): Called with a BankBuildProgress after every stored chunk.
+
+    Returns:
+        BankBuildProgress: Totals of the build.
+    """
+    start = time.perf_counter()
+    stored = BankPuzzle.objects.filter(difficulty=difficulty).count()
+    done = get_done_chunks(difficulty, seed, chunk_size)
+    chunks = (chunk for chunk in itertools.count() if chunk not in done)
+    inserted = duplicates = candidates = 0
+
+    def report():
+        return BankBuildProgress(difficulty, stored, target, inserted, duplicates, candidates,
+                                 time.perf_counter() - start)
+
+    workers = workers or os.cpu_count() or 1
+    executor = get_executor(workers)
+    pending = set()
+    try:
+        while stored < target:
+            while len(pending) < 2 * workers:
+                pending.add(executor.submit(generate_chunk, difficulty, seed, next(chunks), chunk_size))
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                candidates += chunk_size
+                if stored >= target:
+                    continue
+                new, dup = store_puzzles(difficulty, future.result()[:target - stored])
+                stored += new
+                inserted += new
+                duplicates += dup
+                if progress:
+                    progress(report())
+    finally:
+        executor.shutdown(cancel_futures=True)
+    return report()
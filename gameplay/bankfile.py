@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Difficulties in file order; the index is the difficulty code stored in every record
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Header: magic, format version, record size, digest of the records,
+# then (first record, record count) per difficulty, padded to 64 bytes
+MAGIC = b"MYSTBANK"
+VERSION = 1
+HEADER = struct.Struct("<8sHH8s" + "II" * len(DIFFICULTIES) + "20x")
+
+# Record: 81 solution digits at 4 bits each (cell i in byte i // 2, even cells in the high nibble),
+# an 81-bit little-endian givens mask (bit i set = cell i visible), difficulty code, rating (0 = not rated)
+DIGITS_SIZE = 41
+MASK_SIZE = 11
+RECORD_SIZE = DIGITS_SIZE + MASK_SIZE + 2
+
+
+def encode_record(solution, givens, difficulty, rating=0):
+    """
+    Packs one puzzle (81-digit solution and givens strings, 0 = hidden) into a RECORD_SIZE byte record.
+    """
+    digits = bytearray(DIGITS_SIZE)
+    for i, digit in enumerate(solution):
+        digits[i >> 1] |= int(digit) << (0 if i & 1 else 4)
+    mask = sum(1 << i for i, given in enumerate(givens) if given != "0")
+    return bytes(digits) + mask.to_bytes(MASK_SIZE, "little") + bytes((DIFFICULTIES.index(difficulty), rating))
+
+
+def write_bank_file(path, puzzles):
+    """
+    Writes a bank file from (difficulty, givens, solution, rating) tuples (rating None = not rated).
+
+    Records are grouped by difficulty in DIFFICULTIES order. The file is written next to
+    `path` and moved over it, so processes that mapped the old file keep reading it
+    until they notice the new one (see get_bank_file).
+
+    Returns:
+        dict[str, int]: Records per difficulty.
+    """
+    records = {difficulty: [] for difficulty in DIFFICULTIES}
+    for difficulty, givens, solution, rating in puzzles:
+        records[difficulty].append(encode_record(solution, givens, difficulty, rating or 0))
+
+    digest = hashlib.sha256()
+    table = []
+    start = 0
+    for difficulty in DIFFICULTIES:
+        for record in records[difficulty]:
+            digest.update(record)
+        table += [start, len(records[difficulty])]
+        start += len(records[difficulty])
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, digest.digest()[:8], *table))
+        for difficulty in DIFFICULTIES:
+            f.writelines(records[difficulty])
+    os.replace(temp_path, path)
+    return {difficulty: len(records[difficulty]) for difficulty in DIFFICULTIES}
+
+
+class PuzzleBankFile:
+    """
+    A read-only memory-mapped bank file.
+
+    Records are read straight from the mapping by index, so picking a puzzle costs
+    no I/O beyond the page holding it, and every process maps the same page cache.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a puzzle bank file.")
+        magic, version, record_size, digest, *table = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank file.")
+        self.digest = digest.hex()
+        self._ranges = {difficulty: (table[2 * i], table[2 * i + 1]) for i, difficulty in enumerate(DIFFICULTIES)}
+        if HEADER.size + sum(count for _, count in self._ranges.values()) * RECORD_SIZE > len(self._map):
+            raise ValueError(f"{path} is truncated.")
+
+    def count(self, difficulty):
+        """
+        Returns the number of puzzles of a difficulty.
+        """
+        return self._ranges.get(difficulty, (0, 0))[1]
+
+    def read(self, difficulty, index):
+        """
+        Decodes the index-th puzzle of a difficulty.
+
+        Returns:
+            tuple[list[list[int]], set[int]]: The 9x9 solution board and the hidden cell indexes.
+        """
+        start, count = self._ranges[difficulty]
+        if not 0 <= index < count:
+            raise IndexError(f"No {difficulty} puzzle {index} in the bank ({count} puzzles).")
+        offset = HEADER.size + (start + index) * RECORD_SIZE
+        record = self._map[offset:offset + RECORD_SIZE]
+
+        board = [[0] * 9 for _ in range(9)]
+        for i in range(81):
+            byte = record[i >> 1]
+            board[i // 9][i % 9] = byte & 0x0F if i & 1 else byte >> 4
+        mask = int.from_bytes(record[DIGITS_SIZE:DIGITS_SIZE + MASK_SIZE], "little")
+        return board, {i for i in range(81) if not mask >> i & 1}
+
+    def close(self):
+        self._map.close()
+
+
+# Bank files opened by this process: path -> (file identity, PuzzleBankFile)
+_open_files = {}
+_open_files_lock = threading.Lock()
+
+
+def get_bank_file():
+    """
+    Returns the bank file at settings.PUZZLE_BANK_FILE, mapped once per process,
+    or None when there is no (valid) bank file.
+
+    A file replaced by export_puzzle_bank is noticed by its changed inode and mapped again.
+    """
+    path = getattr(settings, "PUZZLE_BANK_FILE", None)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _open_files_lock:
+        opened = _open_files.get(str(path))
+        if opened is None or opened[0] != identity:
+            try:
+                bank = PuzzleBankFile(path)
+            except (OSError, ValueError):
+                logger.exception("Could not open the puzzle bank file %s", path)
+                bank = None  # Not retried until the file changes
+            opened = _open_files[str(path)] = (identity, bank)
+        return opened[1]
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+from .rating import rate_puzzle
+from .utils import VISIBLE_CELLS, build_block_items, count_solutions, generate_sudoku, has_solution, select_valid_rooms
+
+DEFAULT_SEED = 20240601
+
+# Well-known puzzles that are slow for a backtracking solver (givens row by row, 0 = empty)
+HARD_PUZZLES = {
+    "ai_escargot": "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+    "inkala_2012": "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "easter_monster": "100000002090400050006000700050903000000070000000850040700000600030009080002000001",
+    "golden_nugget": "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+}
+
+# Calls per benchmark traced with tracemalloc (tracing slows calls down, so timings are taken without it)
+MEMORY_SAMPLE = 5
+
+# Compared metrics and whether a higher value is better
+COMPARED_METRICS = {"ops_per_sec": True, "p95_ms": False, "peak_kib": False}
+
+
+@contextmanager
+def seeded(seed):
+    """
+    Seeds the global random generator for the with-block and restores its previous state afterwards.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+def parse_puzzle(givens):
+    """
+    Converts an 81-character string of givens (0 = empty) into a 9x9 grid.
+    """
+    return [[int(givens[r * 9 + c]) for c in range(9)] for r in range(9)]
+
+
+def make_puzzle(board, visible, rng):
+    """
+    Returns a copy of a solved board with all but `visible` randomly chosen cells emptied (0).
+    """
+    shown = set(rng.sample(range(81), visible))
+    return [[board[r][c] if r * 9 + c in shown else 0 for c in range(9)] for r in range(9)]
+
+
+def build_corpus(seed=DEFAULT_SEED, boards=200, puzzles=20):
+    """
+    Builds the reproducible benchmark corpus: solved boards and, per difficulty,
+    puzzles with as many givens as a game shows (VISIBLE_CELLS).
+
+    Returns:
+        dict: {"seed", "boards": [grid], "puzzles": {difficulty: [grid]}, "hard": {name: grid}}
+    """
+    rng = random.Random(seed)
+    solved = [generate_sudoku(rng) for _ in range(max(boards, puzzles))]
+    return {
+        "seed": seed,
+        "boards": solved[:boards],
+        "puzzles": {
+            difficulty: [make_puzzle(board, visible, rng) for board in solved[:puzzles]]
+            for difficulty, visible in VISIBLE_CELLS.items()
+        },
+        "hard": {name: parse_puzzle(givens) for name, givens in HARD_PUZZLES.items()},
+    }
+
+
+def corpus_digest(corpus):
+    """
+    Short hash of the corpus content; baselines are only comparable on the same corpus.
+    """
+    payload = json.dumps([corpus["boards"], corpus["puzzles"], corpus["hard"]], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def run_benchmark(func, cases, prepare=None, seed=None):
+    """
+    Calls func once per case and measures it.
+
+    Each case is passed through prepare() first (untimed, e.g. to copy a grid the call modifies).
+    With a seed the global random generator is seeded for the run, so randomized functions
+    do the same work on every run.
+
+    Returns:
+        dict: ops, ops_per_sec, mean/p50/p95/p99 latency in ms and peak_kib (tracemalloc peak of one call)
+    """
+    prepare = prepare or (lambda case: case)
+    latencies = []
+    with seeded(seed):
+        for case in cases:
+            args = prepare(case)
+            start = time.perf_counter()
+            func(args)
+            latencies.append(time.perf_counter() - start)
+
+    peak = 0
+    with seeded(seed):
+        tracemalloc.start()
+        try:
+            for case in cases[:MEMORY_SAMPLE]:
+                args = prepare(case)
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                func(args)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+
+    total = sum(latencies)
+    p50, p95, p99 = latency_percentiles(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / total, 2) if total else 0.0,
+        "mean_ms": round(total / len(latencies) * 1000, 4) if latencies else 0.0,
+        "p50_ms": round(p50 * 1000, 4),
+        "p95_ms": round(p95 * 1000, 4),
+        "p99_ms": round(p99 * 1000, 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def latency_percentiles(values):
+    """
+    Returns (p50, p95, p99) of the values.
+    """
+    if len(values) >= 2:
+        cuts = statistics.quantiles(values, n=100)
+        return cuts[49], cuts[94], cuts[98]
+    value = values[0] if values else 0.0
+    return value, value, value
+
+
+def encode_puzzle(grid):
+    """
+    Converts a 9x9 grid into the 81-digit string rate_puzzle takes.
+    """
+    return "".join(str(number) for row in grid for number in row)
+
+
+def copy_grid(grid):
+    return [row[:] for row in grid]
+
+
+def get_benchmarks(corpus, database=False, repeat=1):
+    """
+    Returns the suite as [(name, func, cases, prepare)].
+
+    The room benchmarks (database=True) need the item fixtures loaded;
+    select_valid_rooms raises ValueError without them.
+    """
+    benchmarks = [
+        ("generate_sudoku", lambda _: generate_sudoku(), list(range(len(corpus["boards"]))) * repeat, None),
+    ]
+    for difficulty, puzzles in corpus["puzzles"].items():
+        benchmarks.append((f"has_solution[{difficulty}]", has_solution, puzzles * repeat, copy_grid))
+        benchmarks.append((f"count_solutions[{difficulty}]", count_solutions, puzzles * repeat, None))
+        benchmarks.append((f"rate_puzzle[{difficulty}]", rate_puzzle, puzzles * repeat, encode_puzzle))
+    for name, grid in corpus["hard"].items():
+        benchmarks.append((f"has_solution[{name}]", has_solution, [grid] * repeat, copy_grid))
+    if database:
+        valid_rooms = select_valid_rooms()
+        benchmarks += [
+            ("select_valid_rooms", lambda _: select_valid_rooms(), list(range(20)) * repeat, None),
+            ("build_block_items", build_block_items, valid_rooms * 10 * repeat, None),
+        ]
+    return benchmarks
+
+
+def run_suite(corpus, database=False, repeat=1, only=None, progress=None):
+    """
+    Runs every benchmark (or those whose name contains `only`) and returns {name: result}.
+    """
+    results = {}
+    for name, func, cases, prepare in get_benchmarks(corpus, database, repeat):
+        if only and only not in name:
+            continue
+        results[name] = run_benchmark(func, cases, prepare, seed=corpus["seed"])
+        if progress:
+            progress(name, results[name])
+    return results
+
+
+def get_benchmark_dir():
+    """
+    Returns the directory baselines are stored in (settings.BENCHMARK_DIR).
+    """
+    return Path(getattr(settings, "BENCHMARK_DIR", Path(settings.BASE_DIR) / "benchmarks"))
+
+
+def resolve_baseline(name):
+    """
+    Bare names ("baseline") refer to <BENCHMARK_DIR>/<name>.json, anything else is a path.
+    """
+    path = Path(name)
+    if path.suffix or path.parent != Path("."):
+        return path
+    return get_benchmark_dir() / f"{name}.json"
+
+
+def save_baseline(path, corpus, results):
+    """
+    Writes the results with the corpus parameters and environment to a JSON baseline.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": corpus["seed"],
+        "corpus": corpus_digest(corpus),
+        "results": results,
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+    return data
+
+
+def load_baseline(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(baseline, current, threshold=0.1):
+    """
+    Diffs two result sets benchmark by benchmark.
+
+    Returns:
+        list[dict]: name, metric, old, new, relative change and whether it is a regression
+                    (worse by more than `threshold`, e.g. 0.1 = 10 %)
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = baseline[name].get(metric), current[name].get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            rows.append({
+                "name": name,
+                "metric": metric,
+                "old": old,
+                "new": new,
+                "change": change,
+                "regression": worse > threshold,
+            })
+    return rows
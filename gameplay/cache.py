@@ -0,0 +1,268 @@
+from collections import namedtuple
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Game, PlayerStoryProgress
+
+# Backends that keep entries inside one process (see settings.CACHES)
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared():
+    """
+    True if the default cache is shared by all worker processes (e.g. Redis),
+    so an invalidation in one process is seen by the others.
+    """
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_CACHE_BACKENDS
+
+
+def shared_timeout(timeout):
+    """
+    Returns the timeout for an entry that other processes invalidate on change.
+
+    With a per-process cache those invalidations never arrive, so the entry is
+    capped at settings.LOCAL_CACHE_TIMEOUT seconds instead of `timeout` (None = forever).
+    """
+    if cache_is_shared():
+        return timeout
+    local = getattr(settings, "LOCAL_CACHE_TIMEOUT", 30)
+    return local if timeout is None else min(timeout, local)
+
+# How long the active game id stays cached (seconds) with a shared cache; entries are also invalidated on every change
+ACTIVE_GAME_TIMEOUT = 60 * 60 * 24
+
+# Stored instead of None so that "player has no active game" is cached too
+NO_ACTIVE_GAME = "-"
+
+# Lightweight stand-in for the active Game: templates only need its id
+ActiveGame = namedtuple("ActiveGame", ["id"])
+
+
+def active_game_key(user_id):
+    """
+    Returns the cache key holding the active (unfinished) game id of the given user.
+    """
+    return f"gameplay:active_game:{user_id}"
+
+
+def load_active_game_id(user_id):
+    """
+    Returns the UUID of the user's unfinished game, or None.
+
+    The id is served from the cache; the database is only hit on a cache miss
+    and the result (including "no game") is stored for the next call.
+    """
+    key = active_game_key(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return None if cached == NO_ACTIVE_GAME else uuid.UUID(cached)
+
+    game_id = (
+        Game.objects.filter(player_id=user_id, completed=False, reserved=False)
+        .values_list("id", flat=True)
+        .first()
+    )
+    cache.set(key, str(game_id) if game_id else NO_ACTIVE_GAME, shared_timeout(ACTIVE_GAME_TIMEOUT))
+    return game_id
+
+
+def remember_active_game(user_id, game_id):
+    """
+    Write-through update after a new unfinished game was created for the user.
+    """
+    cache.set(active_game_key(user_id), str(game_id), shared_timeout(ACTIVE_GAME_TIMEOUT))
+
+
+def forget_active_game(user_id):
+    """
+    Drops the cached active game id (game completed, deleted or swept).
+    """
+    cache.delete(active_game_key(user_id))
+
+
+def get_active_game(request):
+    """
+    Returns the active game of the logged-in user as an ActiveGame(id), or None.
+
+    The value is memoized on the request, so the context processor and the views
+    share a single lookup per request (and usually no query at all thanks to the cache).
+    """
+    if not hasattr(request, "_active_game"):
+        game_id = None
+        if request.user.is_authenticated:
+            game_id = load_active_game_id(request.user.pk)
+        request._active_game = ActiveGame(game_id) if game_id else None
+    return request._active_game
+
+
+# How long a player's progress summary stays cached (seconds) with a shared cache; saves and deletes keep it in sync
+PROGRESS_SUMMARY_TIMEOUT = 60 * 60 * 24
+
+# Difficulties tracked in PlayerStoryProgress (one unlocked list per difficulty)
+PROGRESS_DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class ProgressSummary:
+    """
+    Read-only snapshot of a player's story progress.
+
+    Holds the unlocked memory orders for each difficulty, so menus and story pages
+    can check counts without loading PlayerStoryProgress from the database.
+    """
+    __slots__ = ("unlocked_easy", "unlocked_medium", "unlocked_hard")
+
+    def __init__(self, unlocked_easy=(), unlocked_medium=(), unlocked_hard=()):
+        self.unlocked_easy = list(unlocked_easy)
+        self.unlocked_medium = list(unlocked_medium)
+        self.unlocked_hard = list(unlocked_hard)
+
+    @classmethod
+    def from_progress(cls, progress):
+        """
+        Builds the summary from a PlayerStoryProgress instance.
+        """
+        return cls(progress.unlocked_easy, progress.unlocked_medium, progress.unlocked_hard)
+
+    def unlocked(self, difficulty):
+        """
+        Returns the set of unlocked memory orders for the given difficulty.
+        """
+        return set(getattr(self, f"unlocked_{difficulty}"))
+
+    def count(self, difficulty):
+        """
+        Returns the number of unlocked memories for the given difficulty.
+        """
+        return len(getattr(self, f"unlocked_{difficulty}"))
+
+    @property
+    def counts(self):
+        """
+        Mapping difficulty → number of unlocked memories.
+        """
+        return {difficulty: self.count(difficulty) for difficulty in PROGRESS_DIFFICULTIES}
+
+    @property
+    def total(self):
+        """
+        Total number of unlocked memories across all difficulties.
+        """
+        return sum(self.counts.values())
+
+    @property
+    def has_any(self):
+        """
+        True if the player has unlocked at least one memory.
+        """
+        return self.total > 0
+
+    def as_dict(self):
+        """
+        Plain representation stored in the cache.
+        """
+        return {
+            "unlocked_easy": self.unlocked_easy,
+            "unlocked_medium": self.unlocked_medium,
+            "unlocked_hard": self.unlocked_hard,
+        }
+
+
+def progress_summary_key(user_id):
+    """
+    Returns the cache key holding the progress summary of the given user.
+    """
+    return f"gameplay:progress:{user_id}"
+
+
+def load_progress_summary(user_id):
+    """
+    Returns the ProgressSummary for the given user.
+
+    Served from the cache; on a miss the PlayerStoryProgress row is read once
+    (a missing row means nothing is unlocked yet) and the summary is cached.
+    """
+    if user_id is None:
+        return ProgressSummary()
+
+    key = progress_summary_key(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return ProgressSummary(**cached)
+
+    progress = PlayerStoryProgress.objects.filter(player_id=user_id).first()
+    summary = ProgressSummary.from_progress(progress) if progress else ProgressSummary()
+    cache.set(key, summary.as_dict(), shared_timeout(PROGRESS_SUMMARY_TIMEOUT))
+    return summary
+
+
+def store_progress_summary(progress):
+    """
+    Write-through update of the cached summary from a freshly saved PlayerStoryProgress.
+    """
+    summary = ProgressSummary.from_progress(progress)
+    cache.set(progress_summary_key(progress.player_id), summary.as_dict(),
+              shared_timeout(PROGRESS_SUMMARY_TIMEOUT))
+    return summary
+
+
+def reset_progress_summary(user_id):
+    """
+    Write-through update after the player's progress was reset (row deleted).
+    """
+    cache.set(progress_summary_key(user_id), ProgressSummary().as_dict(),
+              shared_timeout(PROGRESS_SUMMARY_TIMEOUT))
+
+
+def forget_progress_summary(user_id):
+    """
+    Drops the cached summary, e.g. after a rolled-back transaction; the next read reloads it.
+    """
+    cache.delete(progress_summary_key(user_id))
+
+
+# Cache key of the item catalog version; dropped whenever an Item or Room changes
+CATALOG_VERSION_KEY = "gameplay:catalog_version"
+
+# How long the blocks drawn from a seed stay cached (seconds); they never change, so this only bounds memory
+LAYOUT_TIMEOUT = 60 * 60 * 24
+
+
+def load_cached_catalog_version():
+    """
+    Returns the cached catalog version, or None on a miss.
+    """
+    return cache.get(CATALOG_VERSION_KEY)
+
+
+def store_catalog_version(version):
+    cache.set(CATALOG_VERSION_KEY, version, shared_timeout(None))
+
+
+def forget_catalog_version():
+    """
+    Drops the cached catalog version after the rooms or items changed.
+    """
+    cache.delete(CATALOG_VERSION_KEY)
+
+
+def layout_key(seed, catalog_version):
+    """
+    Returns the cache key of the block rooms and items drawn from a seed on a given catalog.
+    """
+    return f"gameplay:layout:{catalog_version}:{seed}"
+
+
+# How long a puzzle rating stays cached (seconds); a rating never changes, so this only bounds memory
+RATING_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def rating_key(puzzle_hash):
+    """
+    Returns the cache key of the difficulty rating of a puzzle (see gameplay.rating.puzzle_hash).
+    """
+    return f"gameplay:rating:{puzzle_hash}"
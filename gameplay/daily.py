@@ -0,0 +1,276 @@
+import bisect
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from main.metrics import registry
+from .cache import shared_timeout
+from .models import DailyChallenge, DailyChallengeResult, DailyChallengeStart, Game
+from .utils import (GameCreationError, encode_puzzle, generate_layout, get_catalog_version, layout_is_solvable,
+                    load_blocks)
+
+logger = logging.getLogger(__name__)
+
+# How long a day's challenge and leaderboard stay cached (seconds); the date is part of the key
+DAILY_TIMEOUT = 60 * 60 * 36
+
+# How long the generation lock is held at most (seconds) before another request may take over
+GENERATION_LOCK_TIMEOUT = 60
+
+# How often requests waiting for the lock holder look for the finished challenge (seconds)
+GENERATION_POLL_INTERVAL = 0.05
+
+# Seeds tried per day and difficulty before giving up on a solvable layout
+MAX_SEED_ATTEMPTS = 20
+
+
+def challenge_key(date, difficulty):
+    return f"gameplay:daily:{date.isoformat()}:{difficulty}"
+
+
+def generation_lock_key(date, difficulty):
+    return f"gameplay:daily_lock:{date.isoformat()}:{difficulty}"
+
+
+def leaderboard_key(challenge_id):
+    return f"gameplay:daily_leaderboard:{challenge_id}"
+
+
+def daily_seed(date, difficulty, attempt=0):
+    """
+    Seed of the day's puzzle; derived from SECRET_KEY so upcoming puzzles can't be computed in advance.
+    """
+    digest = hashlib.sha256(f"{settings.SECRET_KEY}:daily:{date.isoformat()}:{difficulty}:{attempt}".encode())
+    return int(digest.hexdigest()[:15], 16)
+
+
+def get_daily_challenge(difficulty, date=None):
+    """
+    Returns the day's DailyChallenge for a difficulty, generating it on first use.
+
+    Served from the cache; on a miss the row is read, and only the very first request
+    of the day (or `manage.py daily_challenge` ahead of time) generates it.
+    After an item catalog change a new challenge is generated for the rest of the day;
+    games and results of the old one stay with it.
+    """
+    date = date or timezone.localdate()
+    key = challenge_key(date, difficulty)
+    challenge = cache.get(key)
+    if challenge is None:
+        challenge = latest_challenge(date, difficulty)
+
+    if challenge is None or challenge.catalog_version != get_catalog_version():
+        challenge = generate_daily_challenge(difficulty, date)
+    cache.set(key, challenge, shared_timeout(DAILY_TIMEOUT))
+    return challenge
+
+
+def find_daily_challenge(difficulty, date=None):
+    """
+    Returns the day's challenge if it exists, without generating it (e.g. for the leaderboard).
+    """
+    date = date or timezone.localdate()
+    challenge = cache.get(challenge_key(date, difficulty))
+    if challenge is None:
+        challenge = latest_challenge(date, difficulty)
+    return challenge
+
+
+def latest_challenge(date, difficulty):
+    """
+    Returns the day's newest challenge row (there is one per item catalog used that day), or None.
+    """
+    return DailyChallenge.objects.filter(date=date, difficulty=difficulty).order_by("-created_at", "-pk").first()
+
+
+def generate_daily_challenge(difficulty, date):
+    """
+    Generates the day's challenge on the current item catalog once.
+
+    Concurrent first requests are serialized by a cache lock: one request generates,
+    the others wait for its row. If the lock holder takes longer than the lock timeout,
+    a waiting request generates as well and the unique (date, difficulty, catalog) row decides.
+
+    Raises:
+        GameCreationError: If no seed of the day yields a solvable layout.
+    """
+    catalog_version = get_catalog_version()
+    lock = generation_lock_key(date, difficulty)
+    deadline = time.monotonic() + GENERATION_LOCK_TIMEOUT
+    locked = cache.add(lock, 1, GENERATION_LOCK_TIMEOUT)
+    while not locked:
+        time.sleep(GENERATION_POLL_INTERVAL)
+        challenge = DailyChallenge.objects.filter(date=date, difficulty=difficulty,
+                                                  catalog_version=catalog_version).first()
+        if challenge:
+            return challenge
+        if time.monotonic() > deadline:
+            break
+        locked = cache.add(lock, 1, GENERATION_LOCK_TIMEOUT)
+
+    try:
+        challenge = DailyChallenge.objects.filter(date=date, difficulty=difficulty,
+                                                  catalog_version=catalog_version).first()
+        if challenge:
+            return challenge
+
+        seed, layout = find_solvable_seed(date, difficulty)
+        givens, solution = encode_puzzle(layout)
+        try:
+            with transaction.atomic():
+                challenge = DailyChallenge.objects.create(
+                    date=date, difficulty=difficulty, seed=seed, catalog_version=catalog_version,
+                    givens=givens, solution=solution,
+                )
+        except IntegrityError:
+            # Inserted concurrently by a request that gave up waiting
+            challenge = DailyChallenge.objects.get(date=date, difficulty=difficulty, catalog_version=catalog_version)
+
+        registry.inc("daily_challenge_generated_total", difficulty=difficulty,
+                     help_text="Daily challenge puzzles generated")
+        logger.info("Generated the %s daily challenge for %s (seed %d)", difficulty, date, seed)
+        return challenge
+    finally:
+        if locked:
+            cache.delete(lock)
+
+
+def find_solvable_seed(date, difficulty):
+    """
+    Returns (seed, layout) of the first seed of the day whose layout passes the solvability check
+    and is rated within the difficulty's band; the first solvable one as a last resort.
+    """
+    fallback = None
+    for attempt in range(MAX_SEED_ATTEMPTS):
+        seed = daily_seed(date, difficulty, attempt)
+        layout, in_band = generate_layout(seed, difficulty)
+        if not layout_is_solvable(layout):
+            continue
+        if in_band:
+            return seed, layout
+        if fallback is None:
+            fallback = seed, layout
+    if fallback is not None:
+        return fallback
+    raise GameCreationError(f"No solvable {difficulty} daily challenge for {date}.")
+
+
+def start_daily_game(player, difficulty):
+    """
+    Creates the player's game for today's challenge and records their first start.
+
+    The game copies the challenge's seed and puzzle and its blocks are shared and cached, so this
+    is only the start and Game inserts: no board generation, room selection or solvability check.
+    """
+    challenge = get_daily_challenge(difficulty)
+    load_blocks(challenge.seed, challenge.catalog_version)  # Cached for the game page
+
+    with transaction.atomic():
+        # Restarting keeps the first start, so a player can't learn the puzzle and then restart the clock
+        DailyChallengeStart.objects.bulk_create([DailyChallengeStart(challenge=challenge, player=player)],
+                                                ignore_conflicts=True)
+        game = Game.objects.create(
+            player=player,
+            difficulty=difficulty,
+            seed=challenge.seed,
+            catalog_version=challenge.catalog_version,
+            givens=challenge.givens,
+            solution=challenge.solution,
+            challenge=challenge,
+        )
+
+    registry.inc("daily_challenge_games_total", difficulty=difficulty,
+                 help_text="Daily challenge games started from the shared layout")
+    return game
+
+
+def daily_time(game, completed_at=None):
+    """
+    Returns the seconds from the player's first start of the game's challenge to `completed_at` (default now).
+    """
+    completed_at = completed_at or timezone.now()
+    started_at = (DailyChallengeStart.objects.filter(challenge_id=game.challenge_id, player_id=game.player_id)
+                  .values_list("started_at", flat=True).first())
+    return (completed_at - (started_at or game.created_at)).total_seconds()
+
+
+def record_daily_result(game, seconds):
+    """
+    Stores the player's first completion of the game's challenge and, after commit,
+    merges it into the cached leaderboard.
+
+    Returns:
+        DailyChallengeResult | None: The new result, or None if the player already finished this challenge.
+    """
+    try:
+        with transaction.atomic():
+            result = DailyChallengeResult.objects.create(
+                challenge_id=game.challenge_id, player=game.player, seconds=seconds
+            )
+    except IntegrityError:
+        return None
+
+    username = game.player.username
+    transaction.on_commit(lambda: add_to_leaderboard(game.challenge_id, username, seconds))
+    return result
+
+
+def get_daily_leaderboard(challenge):
+    """
+    Returns the fastest results of a challenge as [{"player", "seconds"}], fastest first.
+
+    Cached; completions are merged into the cached list as they happen (add_to_leaderboard),
+    so the results table is only read when the entry is missing.
+    """
+    key = leaderboard_key(challenge.pk)
+    entries = cache.get(key)
+    if entries is None:
+        rows = (challenge.results.order_by("seconds", "completed_at")
+                .values_list("player__username", "seconds")[:get_leaderboard_size()])
+        entries = [{"player": player, "seconds": seconds} for player, seconds in rows]
+        cache.set(key, entries, shared_timeout(DAILY_TIMEOUT))
+    return entries
+
+
+def add_to_leaderboard(challenge_id, username, seconds):
+    """
+    Merges one completion into the cached leaderboard.
+
+    Updates are serialized with a short cache lock; when the lock is busy the entry is
+    dropped instead, and the next read rebuilds it from the results table.
+    """
+    key = leaderboard_key(challenge_id)
+    lock = f"{key}:lock"
+    if not cache.add(lock, 1, 5):
+        cache.delete(key)
+        return
+    try:
+        entries = cache.get(key)
+        if entries is None or any(entry["player"] == username for entry in entries):
+            return
+        size = get_leaderboard_size()
+        if len(entries) >= size and seconds >= entries[-1]["seconds"]:
+            return
+        bisect.insort(entries, {"player": username, "seconds": seconds}, key=lambda entry: entry["seconds"])
+        cache.set(key, entries[:size], shared_timeout(DAILY_TIMEOUT))
+    finally:
+        cache.delete(lock)
+
+
+def get_player_rank(challenge, player):
+    """
+    Returns (rank, seconds) of the player's result in a challenge, or None if they haven't finished it.
+    """
+    result = challenge.results.filter(player=player).first()
+    if result is None:
+        return None
+    return challenge.results.filter(seconds__lt=result.seconds).count() + 1, result.seconds
+
+
+def get_leaderboard_size():
+    return getattr(settings, "DAILY_LEADERBOARD_SIZE", 20)
@@ -0,0 +1,132 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from main.db import call_with_retry
+from main.metrics import registry
+from .models import Game, GameCreationJob
+from .utils import GameCreationError, create_game_for_player
+from .workers import closes_connection, get_pool
+
+logger = logging.getLogger(__name__)
+
+# Job states (GameCreationJob.status)
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+SUPERSEDED = "superseded"  # the player started another game while the job was queued or running
+
+# How long a job is kept (seconds); the preparing page gives up after this
+JOB_TIMEOUT = 60 * 10
+
+
+def get_job_settings():
+    """
+    Returns (difficulties created asynchronously, worker threads, seconds between the preparing page's status polls).
+    """
+    return (
+        getattr(settings, "ASYNC_GAME_CREATION", ()),
+        getattr(settings, "GAME_CREATION_WORKERS", 2),
+        getattr(settings, "GAME_CREATION_POLL_INTERVAL", 0.5),
+    )
+
+
+def get_executor():
+    """
+    Returns the process-wide thread pool running game creation jobs.
+    """
+    return get_pool("creation", get_job_settings()[1])
+
+
+def job_cutoff():
+    """
+    Returns the queue time before which a job has expired.
+    """
+    return timezone.now() - timedelta(seconds=JOB_TIMEOUT)
+
+
+def supersede_jobs(player_id):
+    """
+    Called when the player starts a game: their queued or running jobs must not replace
+    that game when they finish.
+    """
+    GameCreationJob.objects.filter(player_id=player_id, status=PENDING).update(status=SUPERSEDED)
+
+
+def is_async(difficulty):
+    """
+    True if games of this difficulty are created on the worker pool (settings.ASYNC_GAME_CREATION).
+    """
+    return difficulty in get_job_settings()[0]
+
+
+def enqueue_game_creation(player_id, difficulty):
+    """
+    Queues create_game_for_player on the worker pool and returns the id of the job to poll.
+
+    The job becomes the player's newest one: an older job still queued or running is superseded.
+    Expired jobs of all players are deleted on the way.
+    """
+    GameCreationJob.objects.filter(queued_at__lt=job_cutoff()).delete()
+    supersede_jobs(player_id)
+    job = GameCreationJob.objects.create(player_id=player_id, difficulty=difficulty)
+    get_executor().submit(run_game_creation, job.id, player_id, difficulty)
+    return job.id
+
+
+@closes_connection
+def run_game_creation(job_id, player_id, difficulty):
+    """
+    Worker task: creates the game and records the outcome on the job.
+
+    Only the player's newest start counts: a superseded job creates nothing (or drops the
+    game it just built), and a finished job replaces the player's other unfinished games,
+    so a double click or a second start never leaves two games behind. The job is finished
+    by a single conditional UPDATE, so a job superseded meanwhile never hands its game over.
+    """
+    queued_at = (GameCreationJob.objects.filter(id=job_id, status=PENDING)
+                 .values_list("queued_at", flat=True).first())
+    status = SUPERSEDED
+    try:
+        if queued_at is not None:
+            registry.observe("game_creation_queue_seconds", (timezone.now() - queued_at).total_seconds(),
+                             difficulty=difficulty, help_text="Time an asynchronous game creation waited for a worker")
+            game = create_game_for_player(User.objects.get(pk=player_id), difficulty=difficulty)
+            status = call_with_retry(hand_over_game, job_id, player_id, game)
+    except (User.DoesNotExist, GameCreationError):
+        status = FAILED
+    except Exception:
+        logger.exception("Asynchronous %s game creation for player %s failed", difficulty, player_id)
+        status = FAILED
+    if status == FAILED:
+        # Retried like the hand-over, so a contended write never leaves the job pending
+        call_with_retry(GameCreationJob.objects.filter(id=job_id, status=PENDING).update, status=FAILED)
+    registry.inc("game_creation_jobs_total", status=status, difficulty=difficulty,
+                 help_text="Asynchronous game creations by outcome")
+
+
+def hand_over_game(job_id, player_id, game):
+    """
+    Finishes a job with its game, unless the job was superseded meanwhile (then the game is dropped).
+    The player's other unfinished games are deleted in the same transaction.
+
+    Returns:
+        str: The job's final status (READY or SUPERSEDED).
+    """
+    with transaction.atomic():
+        if GameCreationJob.objects.filter(id=job_id, status=PENDING).update(status=READY, game_id=game.id):
+            Game.objects.filter(player_id=player_id, completed=False, reserved=False).exclude(id=game.id).delete()
+            return READY
+        game.delete()
+        return SUPERSEDED
+
+
+def get_job(job_id, player_id):
+    """
+    Returns the GameCreationJob, or None if it is unknown, expired or belongs to another player.
+    """
+    return GameCreationJob.objects.filter(id=job_id, player_id=player_id, queued_at__gte=job_cutoff()).first()
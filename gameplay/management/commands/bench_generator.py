@@ -0,0 +1,115 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gameplay.benchmarks import (
+    DEFAULT_SEED,
+    build_corpus,
+    compare_results,
+    corpus_digest,
+    load_baseline,
+    resolve_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks the board generator and solver on a seeded corpus.
+
+    Covers generate_sudoku, has_solution on puzzles of every difficulty and on
+    known-hard puzzles, count_solutions and rate_puzzle on the puzzles of every
+    difficulty, and (with the item fixtures loaded) select_valid_rooms and
+    build_block_items. Reports ops/sec, p50/p95/p99 latency and the tracemalloc peak per call.
+
+    Results can be stored as a JSON baseline and diffed against a later run,
+    so a generator or solver change comes with numbers.
+
+    Usage:
+        python manage.py bench_generator --save baseline       # writes benchmarks/baseline.json
+        python manage.py bench_generator --compare baseline    # runs again and diffs
+        python manage.py bench_generator --compare old.json --against new.json
+    """
+    help = "Benchmark the sudoku generator and solver and compare against JSON baselines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Corpus seed")
+        parser.add_argument("--boards", type=int, default=200, help="Generated boards in the corpus")
+        parser.add_argument("--puzzles", type=int, default=20, help="Puzzles per difficulty in the corpus")
+        parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per benchmark")
+        parser.add_argument("--only", help="Only benchmarks whose name contains this text")
+        parser.add_argument("--no-db", action="store_true", help="Skip the benchmarks that query rooms")
+        parser.add_argument("--save", metavar="BASELINE", help="Store the results as a JSON baseline")
+        parser.add_argument("--compare", metavar="BASELINE", help="Diff the results against a baseline")
+        parser.add_argument("--against", metavar="BASELINE",
+                            help="With --compare: diff two stored baselines instead of running")
+        parser.add_argument("--threshold", type=float, default=10.0,
+                            help="Percent change counted as a regression (default 10)")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit with an error when a regression is found")
+
+    def handle(self, *args, **options):
+        if options["against"]:
+            if not options["compare"]:
+                raise CommandError("--against needs --compare")
+            baseline = self.load(options["compare"])
+            current = self.load(options["against"])
+            self.compare(baseline, current, options)
+            return
+
+        corpus = build_corpus(options["seed"], options["boards"], options["puzzles"])
+        self.stdout.write(f"Corpus {corpus_digest(corpus)} (seed {corpus['seed']}): {len(corpus['boards'])} boards, "
+                          f"{options['puzzles']} puzzles per difficulty, {len(corpus['hard'])} hard puzzles")
+        self.stdout.write(f"{'benchmark':<30}{'ops':>7}{'ops/s':>11}{'p50 ms':>10}{'p95 ms':>10}"
+                          f"{'p99 ms':>10}{'peak KiB':>10}")
+
+        database = not options["no_db"]
+        try:
+            results = run_suite(corpus, database=database, repeat=options["repeat"],
+                                only=options["only"], progress=self.report)
+        except ValueError as e:
+            # select_valid_rooms without the item fixtures
+            raise CommandError(f"{e} Load gameplay/fixtures/items.json or pass --no-db.")
+
+        if options["save"]:
+            path = resolve_baseline(options["save"])
+            save_baseline(path, corpus, results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {path}"))
+
+        if options["compare"]:
+            current = {"seed": corpus["seed"], "corpus": corpus_digest(corpus), "results": results}
+            self.compare(self.load(options["compare"]), current, options)
+
+    def load(self, name):
+        path = resolve_baseline(name)
+        if not path.is_file():
+            raise CommandError(f"Baseline not found: {path}")
+        return load_baseline(path)
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<30}{result['ops']:>7}{result['ops_per_sec']:>11.1f}{result['p50_ms']:>10.3f}"
+            f"{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['peak_kib']:>10.1f}"
+        )
+
+    def compare(self, baseline, current, options):
+        """
+        Prints the change per benchmark and metric, marking regressions beyond the threshold.
+        """
+        if baseline.get("corpus") != current.get("corpus"):
+            self.stdout.write(self.style.WARNING(
+                f"Corpora differ ({baseline.get('corpus')} vs {current.get('corpus')}); "
+                "use the same --seed, --boards and --puzzles for comparable numbers."
+            ))
+
+        rows = compare_results(baseline["results"], current["results"], options["threshold"] / 100)
+        self.stdout.write(f"{'benchmark':<30}{'metric':<13}{'old':>12}{'new':>12}{'change':>9}")
+        for row in rows:
+            line = (f"{row['name']:<30}{row['metric']:<13}{row['old']:>12.3f}{row['new']:>12.3f}"
+                    f"{row['change']:>+9.1%}")
+            self.stdout.write(self.style.ERROR(line + "  REGRESSION") if row["regression"] else line)
+
+        regressions = [row for row in rows if row["regression"]]
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) beyond {options['threshold']:.0f} %")
+        summary = f"{len(regressions)} regression(s) beyond {options['threshold']:.0f} %"
+        self.stdout.write(self.style.WARNING(summary) if regressions else self.style.SUCCESS(summary))
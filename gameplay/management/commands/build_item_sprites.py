@@ -0,0 +1,132 @@
+import io
+import json
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gameplay.sprites import ICON_SIZE, SPRITE_MANIFEST, css_string
+from main.images import OPTIMIZED_DIR, content_hash, get_static_source_dir
+
+
+class Command(BaseCommand):
+    """
+    Packs all item icons from static/items/ into a single sprite atlas.
+
+    Writes a 1x atlas (48px cells, the .item-icon display size), a 2x atlas for
+    HiDPI screens (only when the icons are large enough), and a stylesheet with one background offset per group_id
+    (the icon filename is the item's group_id). All files are content-hashed
+    and listed in static/optimized/sprites.json, which the {% item_icon %} tag reads.
+
+    Usage:
+        python manage.py build_item_sprites
+    """
+    help = "Build the item icon sprite atlas (1x and 2x) and its CSS."
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise CommandError("Pillow is required: pip install -r requirements.txt")
+
+        static_dir = get_static_source_dir()
+        sources = sorted((static_dir / "items").glob("*.png"))
+        if not sources:
+            raise CommandError(f"No item icons found in {static_dir / 'items'}")
+
+        out_dir = static_dir / OPTIMIZED_DIR / "sprites"
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        columns = math.ceil(math.sqrt(len(sources)))
+        rows = math.ceil(len(sources) / columns)
+        groups = [source.stem for source in sources]
+
+        # A 2x atlas only helps when the sources have the resolution for it
+        scales = [(1, "")]
+        largest = 0
+        for source in sources:
+            with Image.open(source) as icon:
+                largest = max(largest, *icon.size)
+        if largest >= ICON_SIZE * 2:
+            scales.append((2, "@2x"))
+        else:
+            self.stdout.write(f"Icons are only {largest}px, skipping the 2x atlas.")
+
+        images = {}
+        for scale, suffix in scales:
+            cell = ICON_SIZE * scale
+            atlas = Image.new("RGBA", (columns * cell, rows * cell), (0, 0, 0, 0))
+            for index, source in enumerate(sources):
+                with Image.open(source) as icon:
+                    icon = icon.convert("RGBA")
+                    # Fit the icon into its cell keeping the aspect ratio (centred below)
+                    ratio = min(cell / icon.width, cell / icon.height)
+                    if ratio != 1:
+                        size = (max(1, round(icon.width * ratio)), max(1, round(icon.height * ratio)))
+                        icon = icon.resize(size, Image.Resampling.LANCZOS)
+                    x = (index % columns) * cell + (cell - icon.width) // 2
+                    y = (index // columns) * cell + (cell - icon.height) // 2
+                    atlas.paste(icon, (x, y), icon)
+            images[scale] = self.write_file(out_dir, f"items{suffix}", "png", self.encode(atlas))
+
+        css = self.build_css(groups, columns, rows, images)
+        css_path = self.write_file(out_dir, "items", "css", css.encode("utf-8"))
+
+        manifest = {
+            "css": css_path,
+            "image": images[1],
+            "image_2x": images.get(2),
+            "groups": groups,
+        }
+        (static_dir / OPTIMIZED_DIR / SPRITE_MANIFEST).write_text(
+            json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Packed {len(groups)} icons into a {columns}x{rows} atlas ({', '.join(images.values())})."
+        ))
+
+    def encode(self, atlas):
+        """
+        Returns the atlas as optimized PNG bytes.
+        """
+        buffer = io.BytesIO()
+        atlas.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+    def write_file(self, out_dir, stem, extension, data):
+        """
+        Writes data under a content-hashed name and returns its static path.
+        """
+        target = out_dir / f"{stem}.{content_hash(data)}.{extension}"
+        if not target.exists():
+            target.write_bytes(data)
+        return f"{OPTIMIZED_DIR}/sprites/{target.name}"
+
+    def build_css(self, groups, columns, rows, images):
+        """
+        Generates the sprite stylesheet: shared atlas rules plus one offset per group_id.
+
+        Image URLs are relative to the stylesheet, which lives next to the atlases.
+        """
+        width, height = columns * ICON_SIZE, rows * ICON_SIZE
+        lines = [
+            "/* Generated by manage.py build_item_sprites – do not edit */",
+            ".item-sprite {",
+            "    display: inline-block;",
+            f"    width: {ICON_SIZE}px;",
+            f"    height: {ICON_SIZE}px;",
+            f"    background-image: url('{images[1].rsplit('/', 1)[-1]}');",
+            f"    background-size: {width}px {height}px;",
+            "    background-repeat: no-repeat;",
+            "}",
+        ]
+        if 2 in images:
+            lines += [
+                "@media (min-resolution: 2dppx), (-webkit-min-device-pixel-ratio: 2) {",
+                f"    .item-sprite {{ background-image: url('{images[2].rsplit('/', 1)[-1]}'); }}",
+                "}",
+            ]
+        for index, group in enumerate(groups):
+            x = (index % columns) * ICON_SIZE
+            y = (index // columns) * ICON_SIZE
+            lines.append(f".item-sprite[data-group={css_string(group)}] {{ background-position: {-x}px {-y}px; }}")
+        return "\n".join(lines) + "\n"
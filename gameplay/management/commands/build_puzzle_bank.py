@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gameplay.bank import CHUNK_SIZE, DEFAULT_BANK_SEED, build_bank
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class Command(BaseCommand):
+    """
+    Builds the puzzle bank: puzzles with exactly one solution, generated on all CPU cores.
+
+    Running it again with the same --seed and --chunk-size resumes an interrupted build,
+    or tops the bank up to a larger --count.
+
+    Usage:
+        python manage.py build_puzzle_bank --count 100000
+        python manage.py build_puzzle_bank --count 5000 --difficulty hard --workers 8
+    """
+    help = "Generate unique-solution puzzles into the puzzle bank in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, required=True, help="Puzzles the bank should hold per difficulty")
+        parser.add_argument("--difficulty", choices=DIFFICULTIES, action="append",
+                            help="Difficulty to build (repeatable, default all)")
+        parser.add_argument("--workers", type=int, help="Worker processes (default: all CPUs)")
+        parser.add_argument("--seed", type=int, default=DEFAULT_BANK_SEED, help="Seed of the first candidate")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Candidate seeds per worker task")
+
+    def handle(self, *args, **options):
+        if options["count"] < 0 or options["chunk_size"] < 1:
+            raise CommandError("--count must not be negative and --chunk-size must be positive")
+
+        for difficulty in options["difficulty"] or DIFFICULTIES:
+            result = build_bank(difficulty, options["count"], workers=options["workers"], seed=options["seed"],
+                                chunk_size=options["chunk_size"], progress=self.report)
+            self.stdout.write(self.style.SUCCESS(
+                f"{difficulty}: {result.stored} puzzles in the bank, {result.inserted} new, "
+                f"{result.duplicates} duplicates skipped, {result.seconds:.1f} s"
+            ))
+
+    def report(self, progress):
+        rate = progress.inserted / progress.seconds if progress.seconds else 0
+        self.stdout.write(f"{progress.difficulty}: {progress.stored}/{progress.target} "
+                          f"({progress.candidates} seeds tried, {rate:.0f} puzzles/s)")
@@ -0,0 +1,41 @@
+from datetime import date as date_cls, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gameplay.daily import get_daily_challenge
+from gameplay.utils import GameCreationError
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class Command(BaseCommand):
+    """
+    Generates the daily challenge puzzles ahead of time (e.g. from a nightly cron job),
+    so no player request has to wait for the generation.
+
+    Usage:
+        python manage.py daily_challenge                  # today
+        python manage.py daily_challenge --days 2         # today and tomorrow
+        python manage.py daily_challenge --date 2025-06-01
+    """
+    help = "Generate the daily challenge puzzles for every difficulty."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="First day (YYYY-MM-DD), default today")
+        parser.add_argument("--days", type=int, default=1, help="Number of days to generate")
+
+    def handle(self, *args, **options):
+        try:
+            start = date_cls.fromisoformat(options["date"]) if options["date"] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f"Invalid date: {options['date']}")
+
+        for offset in range(options["days"]):
+            day = start + timedelta(days=offset)
+            for difficulty in DIFFICULTIES:
+                try:
+                    challenge = get_daily_challenge(difficulty, day)
+                except GameCreationError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f"{day} {difficulty:<6} seed {challenge.seed}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from gameplay.prefetch import expire_reservations
+
+
+class Command(BaseCommand):
+    """
+    Deletes reserved (pre-generated, unclaimed) games older than settings.GAME_PREFETCH_TTL.
+
+    Builds and claims already expire reservations as they go; run this periodically
+    (e.g. from a cron job) so the games of players who stopped playing are removed too.
+
+    Usage:
+        python manage.py expire_reservations
+    """
+    help = "Delete reserved games that were not claimed within GAME_PREFETCH_TTL."
+
+    def handle(self, *args, **options):
+        expired = expire_reservations()
+        self.stdout.write(f"{expired} expired reservations deleted")
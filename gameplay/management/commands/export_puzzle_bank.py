@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gameplay.bankfile import PuzzleBankFile, write_bank_file
+from gameplay.models import BankPuzzle
+
+
+class Command(BaseCommand):
+    """
+    Writes the puzzle bank table into the binary bank file that game creation reads
+    (settings.PUZZLE_BANK_FILE). Running servers pick the new file up on their next game.
+
+    Usage:
+        python manage.py build_puzzle_bank --count 100000
+        python manage.py export_puzzle_bank
+        python manage.py export_puzzle_bank --output /srv/mystdoku/puzzle_bank.bin
+    """
+    help = "Export the puzzle bank into the memory-mapped bank file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="File to write (default: settings.PUZZLE_BANK_FILE)")
+
+    def handle(self, *args, **options):
+        path = options["output"] or getattr(settings, "PUZZLE_BANK_FILE", None)
+        if not path:
+            raise CommandError("No --output given and settings.PUZZLE_BANK_FILE is not set.")
+
+        puzzles = BankPuzzle.objects.order_by("id").values_list("difficulty", "givens", "solution", "rating")
+        counts = write_bank_file(path, puzzles.iterator())
+
+        bank = PuzzleBankFile(path)
+        for difficulty, count in counts.items():
+            self.stdout.write(f"{difficulty:<6} {count} puzzles")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path} (digest {bank.digest})"))
+        bank.close()
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gameplay.models import Cell, Game
+from gameplay.utils import generate_layout, get_game_layout
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds a game's board from its seed and stored puzzle, e.g. to reproduce a bug report.
+
+    With a game id the layout is rebuilt from the stored seed and puzzle and the player's moves
+    are checked against it; with --seed any layout can be generated without a game.
+
+    Usage:
+        python manage.py replay_game 3f2c...-uuid
+        python manage.py replay_game --seed 123456789 --difficulty hard
+    """
+    help = "Print the board of a game and check the player's moves against it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("game_id", nargs="?", help="UUID of the game to rebuild")
+        parser.add_argument("--seed", type=int, help="Generate the layout of this seed instead")
+        parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="easy")
+
+    def handle(self, *args, **options):
+        if options["seed"] is not None:
+            layout, _ = generate_layout(options["seed"], options["difficulty"])
+            self.print_layout(layout)
+            return
+
+        if not options["game_id"]:
+            raise CommandError("Pass a game id or --seed.")
+        try:
+            game = Game.objects.get(id=options["game_id"])
+        except (Game.DoesNotExist, ValueError):
+            raise CommandError(f"Game {options['game_id']} does not exist.")
+        try:
+            layout = get_game_layout(game)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Game {game.id}: seed {game.seed}, {game.difficulty}, catalog {game.catalog_version}")
+        self.print_layout(layout)
+
+        moves = list(Cell.objects.filter(game=game).order_by("index").values_list("index", "selected_item_id"))
+        self.stdout.write(f"Moves: {len(moves)}")
+        mismatches = self.compare(moves, layout)
+        for mismatch in mismatches:
+            self.stdout.write(self.style.ERROR(mismatch))
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} move(s) don't fit the layout rebuilt from the seed.")
+        self.stdout.write(self.style.SUCCESS("The player's moves fit the layout rebuilt from the seed."))
+
+    def print_layout(self, layout):
+        """
+        Prints the solution with hidden cells in brackets, then the room of every block.
+        """
+        for r, row in enumerate(layout.board):
+            self.stdout.write(" ".join(
+                f"[{value}]" if r * 9 + c in layout.hidden_cells else f" {value} " for c, value in enumerate(row)
+            ))
+        self.stdout.write(f"Rooms: {layout.block_rooms}")
+
+    def compare(self, moves, layout):
+        """
+        Returns a description of every (index, item id) move that doesn't fit the layout:
+        a move on a prefilled cell, or an item that is not one of the cell's block items.
+        """
+        mismatches = []
+        for index, item_id in moves:
+            row, column = divmod(index, 9)
+            block = (row // 3) * 3 + column // 3
+            if index not in layout.hidden_cells:
+                mismatches.append(f"Cell ({row}, {column}): move on a prefilled cell")
+            if item_id not in layout.block_items[str(block)].values():
+                mismatches.append(f"Cell ({row}, {column}): item {item_id} is not an item of block {block}")
+        return mismatches
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='catalog_version',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0003_daily_challenge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='reserved',
+            field=models.BooleanField(default=False),
+        ),
+    ]
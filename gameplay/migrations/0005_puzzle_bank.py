@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0004_game_reserved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankPuzzle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('givens', models.CharField(max_length=81, unique=True)),
+                ('solution', models.CharField(max_length=81)),
+                ('seed', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['difficulty', 'seed'], name='gameplay_ba_difficu_835108_idx')],
+            },
+        ),
+    ]
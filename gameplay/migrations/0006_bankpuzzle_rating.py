@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0005_puzzle_bank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankpuzzle',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.7 on 2026-10-19 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def keep_moves_only(apps, schema_editor):
+    """
+    Games without a seed can't be rebuilt and are removed; of the other games' cells only
+    the player's moves are kept (hidden cells with a selected item).
+    """
+    Game = apps.get_model('gameplay', 'Game')
+    Cell = apps.get_model('gameplay', 'Cell')
+    Game.objects.filter(seed__isnull=True).delete()
+    Cell.objects.filter(models.Q(prefilled=True) | models.Q(selected_item__isnull=True)).delete()
+
+
+def set_cell_index(apps, schema_editor):
+    Cell = apps.get_model('gameplay', 'Cell')
+    Cell.objects.update(index=models.F('row') * 9 + models.F('column'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0007_daily_challenge_start'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_moves_only, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='cell',
+            name='index',
+            field=models.PositiveSmallIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_cell_index, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='cell',
+            name='column',
+        ),
+        migrations.RemoveField(
+            model_name='cell',
+            name='correct_item',
+        ),
+        migrations.RemoveField(
+            model_name='cell',
+            name='prefilled',
+        ),
+        migrations.RemoveField(
+            model_name='cell',
+            name='row',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='block_items',
+        ),
+        migrations.RemoveField(
+            model_name='game',
+            name='block_rooms',
+        ),
+        migrations.AlterField(
+            model_name='cell',
+            name='selected_item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='selected_cells', to='gameplay.item'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='cell',
+            unique_together={('game', 'index')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gameplay', '0008_seed_only_games'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailychallenge',
+            name='givens',
+            field=models.CharField(blank=True, default='', max_length=81),
+        ),
+        migrations.AddField(
+            model_name='dailychallenge',
+            name='solution',
+            field=models.CharField(blank=True, default='', max_length=81),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='givens',
+            field=models.CharField(blank=True, default='', max_length=81),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='solution',
+            field=models.CharField(blank=True, default='', max_length=81),
+        ),
+    ]
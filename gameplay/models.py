@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models import JSONField
 import uuid
 
 class Room(models.Model):
@@ -48,14 +47,23 @@ class Game(models.Model):
     We are using the user ID and game creation time as additional identifiers for future scoreboards.
     We also set up the user so that if they delete their account, their entire game history will be removed.
     Instead of an int ID, we use UUID because it looks better.
+
+    Of the board only the puzzle is stored (givens and solution); the rooms and items of the
+    blocks are drawn again from the seed and the catalog version (see gameplay.utils.get_game_layout).
+    The player's moves are saved as Cell rows.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False) # Unique UUID as the primary key
     player = models.ForeignKey(User, on_delete=models.CASCADE)   # ForeignKey to the User model
     created_at = models.DateTimeField(auto_now_add=True)   # Timestamp when the game is created
     completed = models.BooleanField(default=False)  # Game status (completed or in progress)
-    block_rooms = JSONField(default=list)  # List of 9 Room IDs for the current game
-    block_items = JSONField(default=dict)  # Mapping: block -> number -> item ID (mapping for blocks in sudoku)
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default='easy') # Difficulty level (easy, medium, hard)
+    seed = models.BigIntegerField(null=True, blank=True)  # Seed the layout was generated from (see gameplay.utils.generate_layout)
+    catalog_version = models.CharField(max_length=16, blank=True, default="")  # Item catalog the seed was applied to
+    givens = models.CharField(max_length=81, blank=True, default="")  # Visible digits, 0 = hidden cell
+    solution = models.CharField(max_length=81, blank=True, default="")  # The full board
+    reserved = models.BooleanField(default=False)  # Pre-generated in the background, not yet claimed (see gameplay.prefetch)
+    challenge = models.ForeignKey('DailyChallenge', on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='games')  # Set when the game is a daily challenge
 
     def __str__(self):
         return f"Game {self.id} - User: {self.player.username} - {'Completed' if self.completed else 'In progress'}"
@@ -63,44 +71,137 @@ class Game(models.Model):
     def is_completed(self):
         """
         Returns True if the game is successfully completed.
-        This checks if all cells are filled correctly.
+        This checks if all hidden cells of the layout are filled correctly.
         """
-        cells = Cell.objects.filter(game=self)
+        from .utils import get_game_layout
+
+        # One query: the numbers of the player's items, compared with the layout's solution
+        layout = get_game_layout(self)
+        moves = dict(Cell.objects.filter(game=self).values_list("index", "selected_item__number"))
+        return all(moves.get(index) == layout.board[index // 9][index % 9] for index in layout.hidden_cells)
+
+
+JOB_STATUS_CHOICES = [
+    ('pending', 'Pending'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+    ('superseded', 'Superseded'),  # The player started another game while the job was queued or running
+]
+
+
+class GameCreationJob(models.Model):
+    """
+    A game generated on the worker pool while the player waits on the "preparing" page (see gameplay.jobs).
 
-        for cell in cells:
-            if not cell.selected_item or not cell.is_correct():
-                return False
+    The job lives in the database, so any server process can answer the player's status polls.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    player = models.ForeignKey(User, on_delete=models.CASCADE)
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default='pending')
+    # The created game, once the job is ready; not a foreign key, so deleting a game costs no extra query
+    game_id = models.UUIDField(null=True, blank=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
 
-        return True
+    class Meta:
+        indexes = [models.Index(fields=["player", "status"]), models.Index(fields=["queued_at"])]
+
+    def __str__(self):
+        return f"Game creation job {self.id} ({self.difficulty}, {self.status})"
+
+
+class DailyChallenge(models.Model):
+    """
+    The puzzle of the day for one difficulty, shared by all players.
+
+    The seed and the puzzle are stored and copied to every challenge game (see gameplay.daily),
+    so starting a challenge game needs no generation work.
+    """
+    date = models.DateField()  # Day the challenge is played on
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    seed = models.BigIntegerField()  # Seed of the (solvable) layout
+    catalog_version = models.CharField(max_length=16)  # Item catalog the seed was applied to
+    givens = models.CharField(max_length=81, blank=True, default="")  # Visible digits, 0 = hidden cell
+    solution = models.CharField(max_length=81, blank=True, default="")  # The full board
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # One puzzle per difficulty per day; a catalog change adds a new one, so results never mix two puzzles
+        unique_together = ("date", "difficulty", "catalog_version")
+
+    def __str__(self):
+        return f"Daily challenge {self.date} ({self.difficulty})"
+
+
+class DailyChallengeStart(models.Model):
+    """
+    A player's first start of a daily challenge. Their time is measured from it,
+    so restarting the challenge (a new game on the same puzzle) does not reset the clock.
+    """
+    challenge = models.ForeignKey(DailyChallenge, on_delete=models.CASCADE, related_name="starts")
+    player = models.ForeignKey(User, on_delete=models.CASCADE)
+    started_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("challenge", "player")  # Only the first start counts
+
+    def __str__(self):
+        return f"{self.player.username} started {self.challenge}"
+
+
+class DailyChallengeResult(models.Model):
+    """
+    A player's first completion of a daily challenge; the daily leaderboard is built from these rows.
+    """
+    challenge = models.ForeignKey(DailyChallenge, on_delete=models.CASCADE, related_name="results")
+    player = models.ForeignKey(User, on_delete=models.CASCADE)
+    seconds = models.FloatField()  # Time from the player's first start (DailyChallengeStart) to completion
+    completed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("challenge", "player")  # Only the first completion counts
+        indexes = [models.Index(fields=["challenge", "seconds"])]  # Leaderboard order
+
+    def __str__(self):
+        return f"{self.player.username} – {self.challenge} in {self.seconds:.1f} s"
+
+
+class BankPuzzle(models.Model):
+    """
+    A pre-generated puzzle with exactly one solution, built offline by the build_puzzle_bank command
+    (see gameplay.bank). Grids are stored row by row as 81 digits.
+    """
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    givens = models.CharField(max_length=81, unique=True)  # Visible digits, 0 = hidden cell
+    solution = models.CharField(max_length=81)  # The full board
+    seed = models.BigIntegerField()  # Generation seed; a resumed build skips the chunks whose seeds are stored
+    rating = models.PositiveSmallIntegerField(null=True, blank=True)  # Hardest technique needed (gameplay.rating)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["difficulty", "seed"])]
+
+    def __str__(self):
+        return f"Bank puzzle {self.pk} ({self.difficulty}, seed {self.seed})"
 
 
 class Cell(models.Model):
     """
-    Model for defining cells and where they belong.
+    Model for the player's moves.
 
-    This model stores cells with their columns, rows, and identification of their valid/invalid status.
-    It also stores the player's current selection.
-    The selected item and correct item will enable validation of the sudoku game state and the current selection state.
+    A row exists only for a hidden cell the player has filled: it stores the cell's index
+    (row * 9 + column) and the selected item. Removing the item deletes the row. The correct
+    items and the prefilled cells come from the game's layout (see gameplay.utils.get_board).
     """
     game = models.ForeignKey(Game, on_delete=models.CASCADE) # ForeignKey to the Game model
-    row = models.IntegerField()  # Row index (0–8)
-    column = models.IntegerField()  # Column index (0–8)
-    correct_item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="correct_cells")   # The correct item for the sudoku cell
-    selected_item = models.ForeignKey(Item, on_delete=models.SET_NULL, null=True, blank=True, related_name="selected_cells")  # The item selected by the player
-    prefilled = models.BooleanField(default=False) # Whether the cell is prefilled (part of the puzzle or not)
+    index = models.PositiveSmallIntegerField()  # Cell index (row * 9 + column, 0–80)
+    selected_item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="selected_cells")  # The item selected by the player
 
-    def __str__(self):
-        return f"Cell ({self.row}, {self.column})"
+    class Meta:
+        unique_together = ("game", "index")  # One move per cell
 
-    def is_correct(self):
-        """
-        Will return true if the user selected the correct cell
-        """
-        return (
-                self.selected_item is not None and
-                self.correct_item is not None and
-                self.selected_item.number == self.correct_item.number
-        )
+    def __str__(self):
+        return f"Cell ({self.index // 9}, {self.index % 9})"
 
 class Intro(models.Model):
     """
@@ -0,0 +1,167 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from main.metrics import registry
+from .cache import remember_active_game
+from .models import Game
+from .utils import GameCreationError, create_game_for_player
+from .workers import closes_connection, get_pool
+
+logger = logging.getLogger(__name__)
+
+# In-flight pre-generations as (player id, difficulty), so a player never has two running at once
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def get_prefetch_settings():
+    """
+    Returns (enabled, reservation lifetime in seconds, worker threads) from settings.
+    """
+    return (
+        getattr(settings, "GAME_PREFETCH", False),
+        getattr(settings, "GAME_PREFETCH_TTL", 600),
+        getattr(settings, "GAME_PREFETCH_WORKERS", 2),
+    )
+
+
+def get_executor():
+    """
+    Returns the process-wide thread pool building reserved games (created on first use).
+    """
+    return get_pool("prefetch", get_prefetch_settings()[2])
+
+
+def reservation_cutoff(ttl):
+    """
+    Returns the creation time before which a reserved game has expired.
+    """
+    return timezone.now() - timedelta(seconds=ttl)
+
+
+def predict_difficulty(progress):
+    """
+    The difficulty the player most likely starts next: the story tier they are in.
+    """
+    if progress.count("easy") < 20:
+        return "easy"
+    if progress.count("medium") < 20:
+        return "medium"
+    return "hard"
+
+
+def schedule_prefetch(player_id, difficulty):
+    """
+    Starts building a reserved game for the player on a background thread,
+    unless one for this difficulty is already reserved or being built.
+
+    Returns:
+        bool: True if a build was scheduled.
+    """
+    enabled, ttl, _ = get_prefetch_settings()
+    if not enabled:
+        return False
+
+    # The reservation lives in the database, so every server process sees it
+    reserved = Game.objects.filter(player_id=player_id, reserved=True, difficulty=difficulty,
+                                   created_at__gte=reservation_cutoff(ttl))
+    if reserved.exists():
+        return False
+
+    task = (player_id, difficulty)
+    with _in_flight_lock:
+        if task in _in_flight:
+            return False
+        _in_flight.add(task)
+    get_executor().submit(build_reserved_game, player_id, difficulty)
+    return True
+
+
+@closes_connection
+def build_reserved_game(player_id, difficulty):
+    """
+    Background task: replaces the player's reservation with a newly generated reserved game.
+    """
+    ttl = get_prefetch_settings()[1]
+    try:
+        expire_reservations(ttl)
+        player = User.objects.get(pk=player_id)
+        # At most one reservation per player: a new prediction replaces the old one
+        Game.objects.filter(player=player, reserved=True).delete()
+        create_game_for_player(player, difficulty=difficulty, reserved=True)
+        registry.inc("game_prefetch_built_total", difficulty=difficulty,
+                     help_text="Games pre-generated in the background")
+    except (User.DoesNotExist, GameCreationError):
+        logger.warning("Could not pre-generate a %s game for player %s", difficulty, player_id)
+    except Exception:
+        logger.exception("Pre-generating a %s game for player %s failed", difficulty, player_id)
+    finally:
+        with _in_flight_lock:
+            _in_flight.discard((player_id, difficulty))
+
+
+def claim_reserved_game(player, difficulty):
+    """
+    Hands the player's reserved game over as their active game, if one for this difficulty is ready.
+
+    The reservation is looked up in the database, so a game pre-generated by another server
+    process is claimed too. The claim is a single conditional UPDATE, so a reservation is
+    claimed at most once and never after it expired; the player's expired reservations are
+    deleted on the way. Its start time is reset so the game is timed from now.
+    Hits and misses are counted in game_prefetch_total on /metrics.
+
+    Returns:
+        Game | None: The claimed game, or None on a miss.
+    """
+    enabled, ttl, _ = get_prefetch_settings()
+    if not enabled:
+        return None
+
+    expire_reservations(ttl, player=player)
+    game_id = (
+        Game.objects.filter(player=player, reserved=True, difficulty=difficulty,
+                            created_at__gte=reservation_cutoff(ttl))
+        .values_list("id", flat=True)
+        .first()
+    )
+    claimed = 0
+    if game_id is not None:
+        claimed = Game.objects.filter(id=game_id, reserved=True, created_at__gte=reservation_cutoff(ttl)).update(
+            reserved=False, created_at=timezone.now()
+        )
+
+    registry.inc("game_prefetch_total", result="hit" if claimed else "miss", difficulty=difficulty,
+                 help_text="start_new_game calls served by a reserved game (hit) or generating one (miss)")
+    if not claimed:
+        return None
+
+    game = Game.objects.get(id=game_id)
+    remember_active_game(player.pk, game.id)
+    return game
+
+
+def expire_reservations(ttl=None, player=None):
+    """
+    Deletes reserved games older than the reservation lifetime (only `player`'s when given).
+
+    Runs before every background build and on every claim; the expire_reservations
+    command sweeps the reservations of players who stopped playing.
+
+    Returns:
+        int: Number of expired reservations.
+    """
+    ttl = get_prefetch_settings()[1] if ttl is None else ttl
+    expired = Game.objects.filter(reserved=True, created_at__lt=reservation_cutoff(ttl))
+    if player is not None:
+        expired = expired.filter(player=player)
+    _, deleted = expired.delete()
+    count = deleted.get(Game._meta.label, 0)
+    if count:
+        registry.inc("game_prefetch_expired_total", count,
+                     help_text="Reserved games deleted unclaimed after GAME_PREFETCH_TTL")
+    return count
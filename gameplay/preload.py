@@ -0,0 +1,81 @@
+from django.templatetags.static import static
+from django.utils.text import slugify
+
+from gameplay.sprites import get_sprite_manifest
+from main.templatetags.static_images import static_srcset
+
+# Session key holding the assets already hinted to the browser for the current game
+PRELOADED_ASSETS_SESSION_KEY = "preloaded_assets"
+
+# Display width of the room image in game.html (the sizes of its <picture>)
+ROOM_IMAGE_SIZES = "260px"
+
+
+def image_hint(name, sizes=""):
+    """
+    Returns the prefetch hint of a static image: the original file as href and, when sizes is given,
+    the srcset of the first format the image's <picture> offers, so the browser fetches the variant it will display.
+    """
+    srcset = ""
+    if sizes:
+        srcset = next(filter(None, (static_srcset(name, image_format) for image_format in ("avif", "webp"))), "")
+    return {"href": static(name), "srcset": srcset, "sizes": sizes if srcset else ""}
+
+
+def get_neighbor_assets(block_items, neighbor_rooms, item_groups):
+    """
+    Returns prefetch hints for the images the player is likely to need after moving to a neighbouring room.
+
+    Args:
+        block_items (dict): block index → {number → item id} of the game's layout.
+        neighbor_rooms (dict): direction → {"index": block index, "name": room name} (as built in game_view).
+        item_groups (dict): item id → group_id for the items of the game.
+
+    Returns:
+        list[dict]: Room images first, then item icons, without duplicates (see image_hint).
+    """
+    hints = []
+    for neighbor in neighbor_rooms.values():
+        hints.append(image_hint(f"rooms/{slugify(neighbor['name'])}.png", ROOM_IMAGE_SIZES))
+
+    # Item icons come from the sprite atlas already loaded by this page when it is built
+    sprite_groups = set(get_sprite_manifest().get("groups", ()))
+    for neighbor in neighbor_rooms.values():
+        for item_id in block_items.get(str(neighbor["index"]), {}).values():
+            group_id = item_groups.get(item_id)
+            if group_id and group_id not in sprite_groups:
+                hints.append(image_hint(f"items/{group_id}.png"))
+
+    return list({hint["href"]: hint for hint in hints}.values())
+
+
+def select_new_assets(request, game, hints):
+    """
+    Filters out assets already hinted in this game and remembers the rest in the session.
+
+    The browser keeps prefetched files in its cache, so each asset is hinted once per game;
+    the session is only written when something new is hinted (a handful of times per game).
+    """
+    sent = request.session.get(PRELOADED_ASSETS_SESSION_KEY)
+    if not sent or sent.get("game") != str(game.id):
+        sent = {"game": str(game.id), "urls": []}
+
+    known = set(sent["urls"])
+    new_hints = [hint for hint in hints if hint["href"] not in known]
+    if new_hints:
+        sent["urls"] = sent["urls"] + [hint["href"] for hint in new_hints]
+        request.session[PRELOADED_ASSETS_SESSION_KEY] = sent
+    return new_hints
+
+
+def link_header(hints):
+    """
+    Builds a Link header value with prefetch hints for images needed by the next navigation.
+    """
+    links = []
+    for hint in hints:
+        link = f"<{hint['href']}>; rel=prefetch; as=image"
+        if hint["srcset"]:
+            link += f'; imagesrcset="{hint["srcset"]}"; imagesizes="{hint["sizes"]}"'
+        links.append(link)
+    return ", ".join(links)
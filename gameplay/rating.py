@@ -0,0 +1,234 @@
+import hashlib
+from itertools import combinations
+
+from django.core.cache import cache
+
+from .cache import RATING_TIMEOUT, rating_key
+
+# Human solving techniques from easiest to hardest; a puzzle's rating is the
+# 1-based level of the hardest one it needs (see rate_puzzle)
+TECHNIQUES = (
+    "naked_single",
+    "hidden_single",
+    "locked_candidates",  # pointing and claiming
+    "naked_pair",
+    "hidden_pair",
+    "naked_triple",
+    "hidden_triple",
+    "x_wing",
+)
+
+# Rating of a puzzle the techniques can't finish: it needs guessing (or has several solutions)
+GUESSING = len(TECHNIQUES) + 1
+
+ALL_DIGITS = 0x3FE  # Bits 1–9
+
+ROWS = [[r * 9 + c for c in range(9)] for r in range(9)]
+COLUMNS = [[r * 9 + c for r in range(9)] for c in range(9)]
+BLOCKS = [[(b // 3 * 3 + i // 3) * 9 + b % 3 * 3 + i % 3 for i in range(9)] for b in range(9)]
+UNITS = ROWS + COLUMNS + BLOCKS
+PEERS = [
+    {peer for unit in UNITS if cell in unit for peer in unit if peer != cell}
+    for cell in range(81)
+]
+
+
+def rating_name(rating):
+    """
+    Returns the name of the technique a rating stands for.
+    """
+    return TECHNIQUES[rating - 1] if rating < GUESSING else "guessing"
+
+
+def canonical_form(givens):
+    """
+    Returns a representative of the puzzle that equal puzzles share up to relabelled digits
+    and transposition (which don't change the rating): of the puzzle and its transpose,
+    digits renumbered in order of first appearance, the smaller string.
+
+    Args:
+        givens (str): 81 digits row by row, 0 = empty.
+    """
+    def relabel(text):
+        labels = {"0": "0"}
+        return "".join(labels.setdefault(digit, str(len(labels))) for digit in text)
+
+    transposed = "".join(givens[c * 9 + r] for r in range(9) for c in range(9))
+    return min(relabel(givens), relabel(transposed))
+
+
+def puzzle_hash(givens):
+    """
+    Returns the hash ratings are cached under (see canonical_form).
+    """
+    return hashlib.sha256(canonical_form(givens).encode()).hexdigest()[:16]
+
+
+def get_rating(givens):
+    """
+    rate_puzzle with the result cached by canonical puzzle hash, so a puzzle
+    (or a relabelled copy of it) is only rated once.
+    """
+    key = rating_key(puzzle_hash(givens))
+    rating = cache.get(key)
+    if rating is None:
+        rating = rate_puzzle(givens)
+        cache.set(key, rating, RATING_TIMEOUT)
+    return rating
+
+
+def rate_puzzle(givens):
+    """
+    Solves a puzzle the way a person would and returns the level of the hardest technique needed.
+
+    Candidates are kept as a bitmask per cell. Every step applies the easiest technique
+    that makes progress, so harder techniques are only counted when nothing easier works.
+
+    Args:
+        givens (str): 81 digits row by row, 0 = empty.
+
+    Returns:
+        int: 1..len(TECHNIQUES) (see TECHNIQUES), or GUESSING if the techniques get stuck
+        (or the givens contradict each other).
+    """
+    grid = Candidates(givens)
+    if grid.broken:
+        return GUESSING
+
+    steps = [grid.naked_single, grid.hidden_single, grid.locked_candidates,
+             lambda: grid.naked_subset(2), lambda: grid.hidden_subset(2),
+             lambda: grid.naked_subset(3), lambda: grid.hidden_subset(3), grid.x_wing]
+    hardest = 1
+    while not grid.solved():
+        for level, step in enumerate(steps, start=1):
+            if step():
+                hardest = max(hardest, level)
+                break
+        else:
+            return GUESSING
+        if grid.broken:
+            return GUESSING
+    return hardest
+
+
+class Candidates:
+    """
+    Candidate bitmasks of a puzzle being solved by rate_puzzle; every technique
+    method returns True if it placed a digit or removed a candidate.
+    """
+
+    def __init__(self, givens):
+        self.values = [0] * 81
+        self.masks = [ALL_DIGITS] * 81
+        self.broken = False
+        for cell, digit in enumerate(givens):
+            if digit != "0":
+                self.place(cell, int(digit))
+
+    def solved(self):
+        return all(self.values)
+
+    def place(self, cell, digit):
+        bit = 1 << digit
+        if not self.masks[cell] & bit:
+            self.broken = True
+            return
+        self.values[cell] = digit
+        self.masks[cell] = 0
+        for peer in PEERS[cell]:
+            if self.values[peer] == digit:
+                self.broken = True
+            self.masks[peer] &= ~bit
+
+    def eliminate(self, cells, bits):
+        """
+        Removes the digits in `bits` from the candidates of `cells`.
+        """
+        changed = False
+        for cell in cells:
+            if self.masks[cell] & bits:
+                self.masks[cell] &= ~bits
+                changed = True
+                if not self.values[cell] and not self.masks[cell]:
+                    self.broken = True
+        return changed
+
+    def cells_with(self, unit, bit):
+        return [cell for cell in unit if self.masks[cell] & bit]
+
+    def naked_single(self):
+        for cell, mask in enumerate(self.masks):
+            if mask and not mask & (mask - 1):
+                self.place(cell, mask.bit_length() - 1)
+                return True
+        return False
+
+    def hidden_single(self):
+        for unit in UNITS:
+            for digit in range(1, 10):
+                cells = self.cells_with(unit, 1 << digit)
+                if len(cells) == 1:
+                    self.place(cells[0], digit)
+                    return True
+        return False
+
+    def locked_candidates(self):
+        # Pointing: a digit confined to one line within a block leaves the rest of the line;
+        # claiming: a digit confined to one block within a line leaves the rest of the block
+        for units, others in ((BLOCKS, ROWS + COLUMNS), (ROWS + COLUMNS, BLOCKS)):
+            for unit in units:
+                for digit in range(1, 10):
+                    bit = 1 << digit
+                    cells = self.cells_with(unit, bit)
+                    if len(cells) < 2:
+                        continue
+                    for other in others:
+                        if other is not unit and all(cell in other for cell in cells):
+                            if self.eliminate([cell for cell in other if cell not in cells], bit):
+                                return True
+        return False
+
+    def naked_subset(self, size):
+        # `size` cells of a unit sharing only `size` candidates: those digits leave the other cells
+        for unit in UNITS:
+            open_cells = [cell for cell in unit if self.masks[cell]]
+            for subset in combinations(open_cells, size):
+                bits = 0
+                for cell in subset:
+                    bits |= self.masks[cell]
+                if bin(bits).count("1") == size:
+                    if self.eliminate([cell for cell in open_cells if cell not in subset], bits):
+                        return True
+        return False
+
+    def hidden_subset(self, size):
+        # `size` digits of a unit confined to `size` cells: the other candidates leave those cells
+        for unit in UNITS:
+            places = {digit: self.cells_with(unit, 1 << digit) for digit in range(1, 10)}
+            digits = [digit for digit, cells in places.items() if len(cells) >= 2]
+            for subset in combinations(digits, size):
+                cells = {cell for digit in subset for cell in places[digit]}
+                if len(cells) == size:
+                    keep = sum(1 << digit for digit in subset)
+                    if self.eliminate(cells, ALL_DIGITS & ~keep):
+                        return True
+        return False
+
+    def x_wing(self):
+        # A digit with the same two places in two rows (columns) leaves the rest of those columns (rows)
+        for lines, crossing in ((ROWS, COLUMNS), (COLUMNS, ROWS)):
+            for digit in range(1, 10):
+                bit = 1 << digit
+                pairs = {}
+                for index, line in enumerate(lines):
+                    cells = self.cells_with(line, bit)
+                    if len(cells) == 2:
+                        positions = tuple(line.index(cell) for cell in cells)
+                        pairs.setdefault(positions, []).append(index)
+                for positions, indexes in pairs.items():
+                    for first, second in combinations(indexes, 2):
+                        cells = [cell for position in positions for cell in crossing[position]
+                                 if cell not in lines[first] and cell not in lines[second]]
+                        if self.eliminate(cells, bit):
+                            return True
+        return False
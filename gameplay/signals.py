@@ -0,0 +1,53 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import (remember_active_game, forget_active_game, store_progress_summary, reset_progress_summary,
+                    forget_catalog_version)
+from .models import Game, Item, PlayerStoryProgress, Room
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, created, **kwargs):
+    """
+    Keeps the cached active game id in sync when a game is started or completed.
+    """
+    if created and not instance.completed and not instance.reserved:
+        remember_active_game(instance.player_id, instance.id)
+    elif instance.completed:
+        forget_active_game(instance.player_id)
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    """
+    Invalidates the cached active game id when a game is removed
+    (new game started, finished game cleaned up, or old games swept).
+    """
+    forget_active_game(instance.player_id)
+
+
+@receiver(post_save, sender=PlayerStoryProgress)
+def progress_saved(sender, instance, **kwargs):
+    """
+    Write-through: every unlock refreshes the cached progress summary.
+    """
+    store_progress_summary(instance)
+
+
+@receiver(post_delete, sender=PlayerStoryProgress)
+def progress_deleted(sender, instance, **kwargs):
+    """
+    Write-through: a progress reset leaves an empty cached summary behind.
+    """
+    reset_progress_summary(instance.player_id)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def catalog_changed(sender, **kwargs):
+    """
+    A changed room or item invalidates the cached catalog version (seeds only rebuild a game on its own catalog).
+    """
+    forget_catalog_version()
@@ -0,0 +1,24 @@
+from main.images import load_manifest
+
+# Manifest written by `manage.py build_item_sprites` (inside static/optimized/)
+SPRITE_MANIFEST = "sprites.json"
+
+# Display size of item icons in CSS pixels (.item-icon)
+ICON_SIZE = 48
+
+
+def get_sprite_manifest():
+    """
+    Returns the item sprite manifest, or {} when the atlas was not built.
+
+    Format:
+        {"css": <static path of the stylesheet>, "image": ..., "image_2x": ..., "groups": [group_id, ...]}
+    """
+    return load_manifest(SPRITE_MANIFEST)
+
+
+def css_string(value):
+    """
+    Quotes a value for use inside a CSS attribute selector (group_ids contain spaces and diacritics).
+    """
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ") + '"'
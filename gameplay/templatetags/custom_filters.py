@@ -1,4 +1,8 @@
 from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from gameplay.sprites import get_sprite_manifest
 
 register = template.Library()
 
@@ -7,4 +11,34 @@ def get_item(dictionary, key):
     """
     Filter for custom dictionary return in template
     """
-    return dictionary.get(key)
\ No newline at end of file
+    return dictionary.get(key)
+
+
+@register.simple_tag
+def item_sprite_css():
+    """
+    Renders the <link> for the item sprite stylesheet (nothing if the atlas was not built).
+    """
+    manifest = get_sprite_manifest()
+    if not manifest:
+        return ""
+    return format_html('<link rel="stylesheet" href="{}">', static(manifest["css"]))
+
+
+@register.simple_tag
+def item_icon(group_id, name, css_class=""):
+    """
+    Renders an item icon.
+
+    Uses the sprite atlas built by `manage.py build_item_sprites` when the group is in it,
+    so a whole board needs a single image request; falls back to the single icon file.
+    """
+    if group_id in get_sprite_manifest().get("groups", ()):
+        return format_html(
+            '<span class="item-sprite item-icon {}" data-group="{}" role="img" aria-label="{}"></span>',
+            css_class, group_id, name,
+        )
+    return format_html(
+        '<img src="{}" alt="{}" class="item-icon {}">',
+        static(f"items/{group_id}.png"), name, css_class,
+    )
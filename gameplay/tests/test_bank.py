@@ -0,0 +1,87 @@
+import itertools
+from concurrent.futures import Future
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from gameplay.bank import build_bank, generate_chunk, make_unique_puzzle, store_puzzles
+from gameplay.benchmarks import parse_puzzle
+from gameplay.models import BankPuzzle
+from gameplay.rating import rate_puzzle
+from gameplay.utils import VISIBLE_CELLS, count_solutions
+
+
+class InlineExecutor:
+    """
+    Runs submitted chunks immediately, in the test process.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def submit(self, fn, *args):
+        self.chunks.append(args[2])
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, cancel_futures=False):
+        pass
+
+
+class PuzzleBankTests(TestCase):
+
+    def use_inline_executor(self):
+        executor = InlineExecutor()
+        patcher = patch("gameplay.bank.get_executor", return_value=executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return executor
+
+    # Test that a generated puzzle has the difficulty's visible cells, exactly one solution and a rating in its band
+    def test_make_unique_puzzle(self):
+        seed = next(seed for seed in itertools.count() if make_unique_puzzle(seed, "medium"))
+        givens, solution, rating = make_unique_puzzle(seed, "medium")
+        self.assertEqual(81 - givens.count("0"), VISIBLE_CELLS["medium"])
+        self.assertEqual(count_solutions(parse_puzzle(givens)), 1)
+        self.assertTrue(all(g in ("0", s) for g, s in zip(givens, solution)))
+        self.assertEqual(rating, rate_puzzle(givens))
+        self.assertEqual(rating, 2)  # medium: hidden singles
+        self.assertEqual(make_unique_puzzle(seed, "medium"), (givens, solution, rating))
+
+    # Test that a chunk covers its own seed range
+    def test_chunk_seeds(self):
+        seeds = [seed for seed, _, _, _ in generate_chunk("easy", 1000, 2, chunk_size=5)]
+        self.assertTrue(seeds)
+        self.assertLessEqual(set(seeds), set(range(1010, 1015)))
+
+    # Test that puzzles already in the bank are skipped
+    def test_store_skips_duplicates(self):
+        puzzle = (1, *make_unique_puzzle(1, "easy"))
+        self.assertEqual(store_puzzles("easy", [puzzle]), (1, 0))
+        self.assertEqual(store_puzzles("easy", [puzzle, puzzle, (2, *make_unique_puzzle(2, "easy"))]), (1, 2))
+        self.assertEqual(BankPuzzle.objects.count(), 2)
+
+    # Test that the build stops at the target and a resumed build skips the stored chunks
+    def test_build_and_resume(self):
+        executor = self.use_inline_executor()
+        result = build_bank("easy", 12, workers=1, seed=100, chunk_size=5)
+        self.assertEqual((result.stored, result.inserted), (12, 12))
+        self.assertEqual(executor.chunks[:4], [0, 1, 2, 3])  # Two chunks per worker in flight
+        self.assertEqual(BankPuzzle.objects.filter(difficulty="easy").count(), 12)
+        stored_chunks = {(seed - 100) // 5 for seed in BankPuzzle.objects.values_list("seed", flat=True)}
+
+        executor.chunks.clear()
+        result = build_bank("easy", 20, workers=1, seed=100, chunk_size=5)
+        self.assertEqual((result.stored, result.inserted), (20, 8))
+        self.assertFalse(stored_chunks & set(executor.chunks))
+
+    # Test the command on a real process pool
+    def test_command(self):
+        out = StringIO()
+        call_command("build_puzzle_bank", "--count", "3", "--difficulty", "easy", "--workers", "2",
+                     "--chunk-size", "2", stdout=out)
+        self.assertEqual(BankPuzzle.objects.filter(difficulty="easy").count(), 3)
+        self.assertIn("easy: 3 puzzles in the bank", out.getvalue())
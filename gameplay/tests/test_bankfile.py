@@ -0,0 +1,107 @@
+import itertools
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from gameplay.bank import make_unique_puzzle, store_puzzles
+from gameplay.bankfile import HEADER, RECORD_SIZE, PuzzleBankFile, get_bank_file, write_bank_file
+from gameplay.utils import create_game_for_player, generate_layout, get_catalog_version, get_game_layout
+from main.metrics import registry
+
+
+def make_puzzles(difficulty, count):
+    """
+    Returns `count` (difficulty, givens, solution, rating) tuples from the first seeds that produce a puzzle.
+    """
+    puzzles = (make_unique_puzzle(seed, difficulty) for seed in itertools.count())
+    return [(difficulty, *puzzle) for puzzle in itertools.islice(filter(None, puzzles), count)]
+
+
+class PuzzleBankFileTests(TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "bank.bin"
+        bank_file = self.settings(PUZZLE_BANK_FILE=self.path)
+        bank_file.enable()
+        self.addCleanup(bank_file.disable)
+        self.puzzles = make_puzzles("easy", 3) + make_puzzles("hard", 2)
+
+    # Test that records are fixed-size, grouped by difficulty and decode to the stored puzzles
+    def test_round_trip(self):
+        counts = write_bank_file(self.path, reversed(self.puzzles))
+        self.assertEqual(counts, {"easy": 3, "medium": 0, "hard": 2})
+        self.assertEqual(self.path.stat().st_size, HEADER.size + 5 * RECORD_SIZE)
+
+        bank = PuzzleBankFile(self.path)
+        self.addCleanup(bank.close)
+        self.assertEqual((bank.count("easy"), bank.count("medium"), bank.count("hard")), (3, 0, 2))
+        _, givens, solution, _ = self.puzzles[3]
+        board, hidden = bank.read("hard", 1)  # written in reverse order
+        self.assertEqual("".join(str(n) for row in board for n in row), solution)
+        self.assertEqual(hidden, {i for i, given in enumerate(givens) if given == "0"})
+        with self.assertRaises(IndexError):
+            bank.read("easy", 3)
+
+    # Test that a file that is not a bank is rejected and then ignored by game creation
+    def test_invalid_file(self):
+        self.path.write_bytes(b"not a bank" * 10)
+        with self.assertRaises(ValueError):
+            PuzzleBankFile(self.path)
+        with self.assertLogs("gameplay.bankfile", "ERROR"):
+            self.assertIsNone(get_bank_file())
+
+    # Test that games take their board from the bank and need no generation or solvability check
+    def test_game_from_bank(self):
+        write_bank_file(self.path, self.puzzles)
+        user = User.objects.create_user(username="player")
+        with patch("gameplay.utils.generate_sudoku") as mock_generate, \
+                patch("gameplay.utils.is_sudoku_solvable") as mock_solvable:
+            game = create_game_for_player(user, difficulty="hard", seed=5)
+        mock_generate.assert_not_called()
+        mock_solvable.assert_not_called()
+
+        layout, in_band = generate_layout(5, "hard")
+        givens = [given for _, given, _, _ in self.puzzles[3:]]
+        self.assertIn(game.givens, givens)
+        self.assertTrue(in_band)
+        self.assertEqual(get_game_layout(game), layout)
+        self.assertEqual(registry.get_counter("game_creation_boards_total", source="bank", difficulty="hard"), 2)
+
+        # A difficulty missing from the bank is still generated
+        create_game_for_player(user, difficulty="medium", seed=0)
+        self.assertEqual(registry.get_counter("game_creation_boards_total", source="generated",
+                                              difficulty="medium"), 1)
+
+    # Test that a replaced bank file is mapped again and leaves existing games playable
+    def test_replaced_file(self):
+        user = User.objects.create_user(username="player")
+        without_bank = get_catalog_version()
+        game = create_game_for_player(user, difficulty="easy", seed=1)
+        layout = get_game_layout(game)
+        write_bank_file(self.path, self.puzzles[:1])
+        first = get_bank_file()
+
+        write_bank_file(self.path, self.puzzles)
+        self.assertIsNot(get_bank_file(), first)
+        self.assertEqual(get_bank_file().count("easy"), 3)
+        self.assertNotEqual(get_bank_file().digest, first.digest)
+        self.assertEqual(get_catalog_version(), without_bank)
+        self.assertEqual(get_game_layout(game), layout)
+
+    # Test that the command exports the bank table
+    def test_export_command(self):
+        store_puzzles("easy", [(seed, *puzzle[1:]) for seed, puzzle in enumerate(self.puzzles[:3])])
+        out = StringIO()
+        call_command("export_puzzle_bank", stdout=out)
+        self.assertEqual(get_bank_file().count("easy"), 3)
+        self.assertIn("easy   3 puzzles", out.getvalue())
@@ -0,0 +1,156 @@
+import json
+import random
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from gameplay.benchmarks import (
+    HARD_PUZZLES,
+    build_corpus,
+    compare_results,
+    corpus_digest,
+    make_puzzle,
+    parse_puzzle,
+    resolve_baseline,
+    run_benchmark,
+    run_suite,
+)
+from gameplay.utils import VISIBLE_CELLS, generate_sudoku, has_solution
+
+
+class CorpusTests(SimpleTestCase):
+    # Test that the same seed builds the same corpus and another seed a different one
+    def test_corpus_is_reproducible(self):
+        first = build_corpus(seed=1, boards=5, puzzles=3)
+        second = build_corpus(seed=1, boards=5, puzzles=3)
+        self.assertEqual(first, second)
+        self.assertNotEqual(corpus_digest(first), corpus_digest(build_corpus(seed=2, boards=5, puzzles=3)))
+
+    # Test that building the corpus does not disturb the global random generator
+    def test_global_random_state_is_restored(self):
+        random.seed(7)
+        expected = random.random()
+        random.seed(7)
+        build_corpus(seed=1, boards=2, puzzles=2)
+        self.assertEqual(random.random(), expected)
+
+    # Test that puzzles keep as many givens as the difficulty shows
+    def test_puzzles_match_difficulty_givens(self):
+        corpus = build_corpus(seed=1, boards=2, puzzles=2)
+        for difficulty, puzzles in corpus["puzzles"].items():
+            for puzzle in puzzles:
+                givens = sum(1 for row in puzzle for value in row if value)
+                self.assertEqual(givens, VISIBLE_CELLS[difficulty])
+
+    # Test that make_puzzle only keeps values of the solved board
+    def test_make_puzzle_keeps_board_values(self):
+        board = generate_sudoku()
+        puzzle = make_puzzle(board, 30, random.Random(3))
+        for r in range(9):
+            for c in range(9):
+                self.assertIn(puzzle[r][c], (0, board[r][c]))
+
+    # Test that the known-hard puzzles are well-formed and solvable
+    def test_hard_puzzles_are_valid(self):
+        grid = parse_puzzle(HARD_PUZZLES["ai_escargot"])
+        self.assertTrue(has_solution(grid))
+        for givens in HARD_PUZZLES.values():
+            self.assertEqual(len(givens), 81)
+
+
+class RunBenchmarkTests(SimpleTestCase):
+    # Test that a benchmark reports every metric and prepares each case before the call
+    def test_reports_metrics(self):
+        seen = []
+        result = run_benchmark(seen.append, [1, 2, 3], prepare=lambda case: case * 10)
+        self.assertEqual(result["ops"], 3)
+        self.assertEqual(seen[:3], [10, 20, 30])
+        for key in ("ops_per_sec", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "peak_kib"):
+            self.assertIn(key, result)
+        self.assertGreater(result["ops_per_sec"], 0)
+
+    # Test that the solver benchmarks do not solve the corpus puzzles in place
+    def test_suite_leaves_corpus_untouched(self):
+        corpus = build_corpus(seed=1, boards=3, puzzles=2)
+        before = json.dumps(corpus["puzzles"])
+        results = run_suite(corpus, only="[easy]")
+        self.assertEqual(list(results), ["has_solution[easy]", "count_solutions[easy]", "rate_puzzle[easy]"])
+        self.assertEqual(json.dumps(corpus["puzzles"]), before)
+
+
+class CompareResultsTests(SimpleTestCase):
+    # Test that slower throughput, higher latency and more memory count as regressions
+    def test_detects_regressions(self):
+        baseline = {"solve": {"ops_per_sec": 100.0, "p95_ms": 10.0, "peak_kib": 8.0}}
+        current = {"solve": {"ops_per_sec": 80.0, "p95_ms": 10.5, "peak_kib": 4.0}}
+        rows = {row["metric"]: row for row in compare_results(baseline, current, threshold=0.1)}
+        self.assertTrue(rows["ops_per_sec"]["regression"])
+        self.assertFalse(rows["p95_ms"]["regression"])
+        self.assertFalse(rows["peak_kib"]["regression"])
+        self.assertAlmostEqual(rows["ops_per_sec"]["change"], -0.2)
+
+    # Test that benchmarks missing on one side are skipped
+    def test_skips_unmatched_benchmarks(self):
+        rows = compare_results({"a": {"ops_per_sec": 1.0}}, {"b": {"ops_per_sec": 1.0}})
+        self.assertEqual(rows, [])
+
+
+class BenchGeneratorCommandTests(TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        settings_override = override_settings(BENCHMARK_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("bench_generator", "--boards", "5", "--puzzles", "2", *args, stdout=out)
+        return out.getvalue()
+
+    # Test that bare baseline names resolve into BENCHMARK_DIR
+    def test_resolve_baseline(self):
+        self.assertEqual(resolve_baseline("main"), self.directory / "main.json")
+        self.assertEqual(resolve_baseline("/tmp/run.json"), Path("/tmp/run.json"))
+
+    # Test that --save writes a baseline that --compare diffs against
+    def test_save_and_compare(self):
+        output = self.run_command("--only", "generate_sudoku", "--save", "baseline")
+        data = json.loads((self.directory / "baseline.json").read_text())
+        self.assertIn("generate_sudoku", data["results"])
+        self.assertIn("generate_sudoku", output)
+
+        output = self.run_command("--only", "generate_sudoku", "--compare", "baseline", "--threshold", "1000")
+        self.assertIn("0 regression(s)", output)
+        self.assertNotIn("Corpora differ", output)
+
+    # Test that the room benchmarks run against the fixtures
+    def test_room_benchmarks(self):
+        output = self.run_command("--only", "rooms")
+        self.assertIn("select_valid_rooms", output)
+        output = self.run_command("--only", "block_items")
+        self.assertIn("build_block_items", output)
+
+    # Test that --fail-on-regression turns a regression into an error
+    def test_fail_on_regression(self):
+        baseline = {"corpus": "x", "results": {"solve": {"ops_per_sec": 100.0}}}
+        current = {"corpus": "x", "results": {"solve": {"ops_per_sec": 50.0}}}
+        (self.directory / "old.json").write_text(json.dumps(baseline))
+        (self.directory / "new.json").write_text(json.dumps(current))
+
+        output = self.run_command("--compare", "old", "--against", "new")
+        self.assertIn("REGRESSION", output)
+        with self.assertRaises(CommandError):
+            self.run_command("--compare", "old", "--against", "new", "--fail-on-regression")
+
+    # Test that a missing baseline is reported
+    def test_missing_baseline(self):
+        with self.assertRaises(CommandError):
+            self.run_command("--compare", "nope", "--against", "nope")
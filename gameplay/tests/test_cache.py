@@ -0,0 +1,144 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User, AnonymousUser
+from django.urls import reverse
+from gameplay.cache import (active_game_key, get_active_game, load_active_game_id, load_progress_summary,
+                            shared_timeout, NO_ACTIVE_GAME, ProgressSummary)
+from gameplay.models import Game, Intro, Memory, PlayerStoryProgress
+from gameplay.utils import try_unlock_memory
+from main.context_processors import existing_game
+
+
+class ActiveGameCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.factory = RequestFactory()
+
+    def make_request(self):
+        request = self.factory.get("/")
+        request.user = self.user
+        return request
+
+    # Test that the lookup hits the database only once and is then served from the cache
+    def test_active_game_id_is_cached(self):
+        game = Game.objects.create(player=self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(load_active_game_id(self.user.pk), game.id)
+
+    # Test that "no active game" is cached as well
+    def test_missing_game_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(load_active_game_id(self.user.pk))
+        with self.assertNumQueries(0):
+            self.assertIsNone(load_active_game_id(self.user.pk))
+
+    # Test that the value is shared between the context processor and the view within one request
+    def test_lookup_is_memoized_per_request(self):
+        request = self.make_request()
+        with self.assertNumQueries(1):
+            existing_game(request)
+            get_active_game(request)
+            get_active_game(request)
+
+    # Test that completing a game invalidates the cached id
+    def test_completion_invalidates_cache(self):
+        game = Game.objects.create(player=self.user)
+        self.assertEqual(load_active_game_id(self.user.pk), game.id)
+
+        game.completed = True
+        game.save()
+        self.assertIsNone(load_active_game_id(self.user.pk))
+
+    # Test that deleting a game (new game started, or sweeping) invalidates the cached id
+    def test_deletion_invalidates_cache(self):
+        game = Game.objects.create(player=self.user)
+        self.assertEqual(load_active_game_id(self.user.pk), game.id)
+
+        Game.objects.filter(player=self.user).delete()
+        self.assertIsNone(load_active_game_id(self.user.pk))
+
+    # Test that anonymous users get no active game and no query is made
+    def test_anonymous_user_has_no_active_game(self):
+        request = self.factory.get("/")
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_active_game(request))
+
+
+class ProgressSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="pass")
+
+    # Test the derived values of a summary
+    def test_summary_counts_and_flags(self):
+        summary = ProgressSummary([1, 2], [21], [])
+        self.assertEqual(summary.counts, {"easy": 2, "medium": 1, "hard": 0})
+        self.assertEqual(summary.total, 3)
+        self.assertTrue(summary.has_any)
+        self.assertEqual(summary.unlocked("easy"), {1, 2})
+        self.assertFalse(ProgressSummary().has_any)
+
+    # Test that a player without a progress row gets an empty summary that is cached
+    def test_missing_progress_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(load_progress_summary(self.user.pk).total, 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(load_progress_summary(self.user.pk).total, 0)
+
+    # Test that unlocking a memory updates the cached summary without a reload
+    def test_unlock_writes_through(self):
+        Memory.objects.create(difficulty="easy", order=1, text="m", transition="t")
+        game = Game.objects.create(player=self.user, difficulty="easy")
+        self.assertFalse(load_progress_summary(self.user.pk).has_any)
+
+        try_unlock_memory(game)
+
+        with self.assertNumQueries(0):
+            summary = load_progress_summary(self.user.pk)
+        self.assertEqual(summary.unlocked_easy, [1])
+
+    # Test that resetting progress leaves an empty summary behind
+    def test_reset_writes_through(self):
+        PlayerStoryProgress.objects.create(player=self.user, unlocked_easy=[1, 2])
+        self.assertEqual(load_progress_summary(self.user.pk).total, 2)
+
+        self.client.force_login(self.user)
+        self.client.get(reverse("reset_progress"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(load_progress_summary(self.user.pk).total, 0)
+
+    # Test that the game selection page makes no progress query once the summary is cached
+    def test_game_selection_uses_cached_summary(self):
+        Intro.objects.create(order=0, text="Intro")
+        PlayerStoryProgress.objects.create(player=self.user, unlocked_easy=[1])
+        load_progress_summary(self.user.pk)
+
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("game_selection"))
+        self.assertFalse(response.context["play_intro"])
+        self.assertFalse(any("gameplay_playerstoryprogress" in q["sql"] for q in ctx.captured_queries))
+
+
+class SharedTimeoutTests(TestCase):
+    # Test that entries of a per-process cache are kept briefly and a shared cache keeps the full timeout
+    def test_local_cache_caps_timeouts(self):
+        user = User.objects.create_user(username="tester", password="pass")
+        with self.settings(LOCAL_CACHE_TIMEOUT=30):
+            self.assertEqual(shared_timeout(60 * 60), 30)
+            self.assertEqual(shared_timeout(None), 30)
+            self.assertEqual(shared_timeout(10), 10)
+            with patch("gameplay.cache.cache.set") as mock_set:
+                load_active_game_id(user.pk)
+            mock_set.assert_called_once_with(active_game_key(user.pk), NO_ACTIVE_GAME, 30)
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                             "LOCATION": "redis://localhost:6379"}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(shared_timeout(60 * 60), 60 * 60)
+            self.assertIsNone(shared_timeout(None))
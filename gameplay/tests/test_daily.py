@@ -0,0 +1,165 @@
+import datetime
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from gameplay.daily import (add_to_leaderboard, find_daily_challenge, generation_lock_key, get_daily_challenge,
+                            get_daily_leaderboard, get_player_rank, record_daily_result, start_daily_game)
+from gameplay.models import Cell, DailyChallenge, DailyChallengeResult, DailyChallengeStart, Game, Item, Room
+from gameplay.utils import get_catalog_version, get_game_layout
+from gameplay.views import complete_game
+from main.metrics import registry
+from main.testing import QueryBudgetMixin
+
+
+class DailyChallengeTests(QueryBudgetMixin, TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.alice = User.objects.create_user(username="alice", password="pass")
+        self.bob = User.objects.create_user(username="bob", password="pass")
+
+    # Test that the day's challenge is generated once and then served from the cache
+    def test_challenge_generated_once(self):
+        first = get_daily_challenge("easy")
+        with self.assertNumQueries(0):
+            second = get_daily_challenge("easy")
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(DailyChallenge.objects.count(), 1)
+        self.assertEqual(registry.get_counter("daily_challenge_generated_total", difficulty="easy"), 1)
+
+    # Test that the seed depends on the day and difficulty and is stable across cache loss
+    def test_seed_per_day_and_difficulty(self):
+        today = timezone.localdate()
+        easy = get_daily_challenge("easy", today)
+        self.assertNotEqual(easy.seed, get_daily_challenge("easy", today + datetime.timedelta(days=1)).seed)
+        self.assertNotEqual(easy.seed, get_daily_challenge("medium", today).seed)
+
+        DailyChallenge.objects.all().delete()
+        cache.clear()
+        self.assertEqual(get_daily_challenge("easy", today).seed, easy.seed)
+
+    # Test that a request finding the generation lock taken waits for the other request's row
+    def test_waits_for_concurrent_generation(self):
+        today = timezone.localdate()
+        cache.add(generation_lock_key(today, "easy"), 1)
+        other = {}
+
+        def generated_elsewhere(seconds):
+            other["challenge"] = DailyChallenge.objects.create(
+                date=today, difficulty="easy", seed=99, catalog_version=get_catalog_version())
+
+        with patch("gameplay.daily.time.sleep", side_effect=generated_elsewhere), \
+                patch("gameplay.daily.find_solvable_seed") as mock_find:
+            challenge = get_daily_challenge("easy")
+
+        mock_find.assert_not_called()
+        self.assertEqual(challenge.pk, other["challenge"].pk)
+
+    # Test that a catalog change adds a new challenge and the old results stay with the old puzzle
+    def test_catalog_change_regenerates(self):
+        game = start_daily_game(self.alice, "easy")
+        challenge = game.challenge
+        record_daily_result(game, 60.0)
+        Item.objects.create(name="New item", number=1, group_id="new", room=Room.objects.create(name="New room"))
+
+        regenerated = get_daily_challenge("easy")
+        self.assertNotEqual(regenerated.pk, challenge.pk)
+        self.assertNotEqual(regenerated.catalog_version, challenge.catalog_version)
+        self.assertEqual(find_daily_challenge("easy").pk, regenerated.pk)
+        self.assertEqual(get_daily_leaderboard(regenerated), [])
+        self.assertEqual(DailyChallenge.objects.get(pk=challenge.pk).results.count(), 1)
+
+    # Test that all players get the same board and a challenge game needs no generation
+    def test_players_share_the_layout(self):
+        first = start_daily_game(self.alice, "easy")
+        with patch("gameplay.utils.generate_sudoku") as mock_generate:
+            with self.assertQueryBudget(4):  # savepoint, start, game, release
+                second = start_daily_game(self.bob, "easy")
+        mock_generate.assert_not_called()
+
+        self.assertEqual((second.seed, second.catalog_version), (first.seed, first.catalog_version))
+        self.assertEqual(get_game_layout(second), get_game_layout(first))
+        self.assertFalse(Cell.objects.exists())
+        self.assertEqual(second.challenge_id, first.challenge_id)
+        self.assertEqual(registry.get_counter("daily_challenge_games_total", difficulty="easy"), 2)
+
+    # Test that only the first completion counts and the cached leaderboard is updated incrementally
+    def test_results_and_leaderboard(self):
+        game = start_daily_game(self.alice, "easy")
+        challenge = game.challenge
+        self.assertEqual(get_daily_leaderboard(challenge), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNotNone(record_daily_result(game, 120.0))
+        self.assertIsNone(record_daily_result(game, 60.0))
+
+        bob_game = start_daily_game(self.bob, "easy")
+        with self.captureOnCommitCallbacks(execute=True):
+            record_daily_result(bob_game, 90.0)
+
+        with self.assertNumQueries(0):
+            entries = get_daily_leaderboard(challenge)
+        self.assertEqual(entries, [{"player": "bob", "seconds": 90.0}, {"player": "alice", "seconds": 120.0}])
+        self.assertEqual(get_player_rank(challenge, self.alice), (2, 120.0))
+        self.assertIsNone(get_player_rank(challenge, User.objects.create_user(username="carol")))
+
+    # Test that the cached leaderboard keeps only the configured number of fastest entries, once per player
+    def test_leaderboard_is_trimmed(self):
+        challenge = get_daily_challenge("easy")
+        get_daily_leaderboard(challenge)
+        with self.settings(DAILY_LEADERBOARD_SIZE=2):
+            for name, seconds in (("a", 30.0), ("b", 10.0), ("c", 20.0), ("b", 10.0)):
+                add_to_leaderboard(challenge.pk, name, seconds)
+            self.assertEqual([entry["player"] for entry in get_daily_leaderboard(challenge)], ["b", "c"])
+
+    # Test that completing a challenge game records the time since the player's first start, even after a restart
+    def test_complete_game_records_result(self):
+        start_daily_game(self.alice, "easy")
+        DailyChallengeStart.objects.update(started_at=timezone.now() - datetime.timedelta(seconds=75))
+        Game.objects.filter(player=self.alice).delete()
+        game = start_daily_game(self.alice, "easy")  # restarted: the clock keeps running
+        self.assertEqual(DailyChallengeStart.objects.count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_game(game.id, self.alice.pk)
+
+        result = DailyChallengeResult.objects.get()
+        self.assertEqual(result.player, self.alice)
+        self.assertAlmostEqual(result.seconds, 75, delta=5)
+        self.assertEqual(get_daily_leaderboard(game.challenge)[0]["player"], "alice")
+
+    # Test the start and leaderboard views
+    def test_views(self):
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("start_daily_challenge") + "?difficulty=easy")
+        game = Game.objects.get(player=self.alice)
+        self.assertRedirects(response, reverse("game_view", args=[game.id]), fetch_redirect_response=False)
+        self.assertIsNotNone(game.challenge_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            record_daily_result(game, 42.0)
+        response = self.client.get(reverse("daily_leaderboard") + "?difficulty=easy")
+        self.assertContains(response, "alice")
+        self.assertEqual(response.context["player_rank"], (1, 42.0))
+
+        response = self.client.get(reverse("daily_leaderboard") + "?difficulty=hard")
+        self.assertEqual(response.context["entries"], [])
+
+    # Test that the command pre-generates every difficulty
+    @patch("gameplay.daily.layout_is_solvable", return_value=True)
+    def test_command_pregenerates(self, mock_solvable):
+        out = StringIO()
+        call_command("daily_challenge", "--date", "2025-06-01", "--days", "2", stdout=out)
+        self.assertEqual(DailyChallenge.objects.count(), 6)
+        self.assertIn("2025-06-02 hard", out.getvalue())
+
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escapejs
+
+from gameplay.jobs import (FAILED, JOB_TIMEOUT, PENDING, READY, SUPERSEDED, enqueue_game_creation, get_job,
+                           run_game_creation)
+from gameplay.models import Game, GameCreationJob
+from gameplay.utils import GameCreationError
+from main.metrics import registry
+
+
+class InlineExecutor:
+    """
+    Runs submitted tasks immediately, inside the test transaction.
+    """
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class IdleExecutor:
+    """
+    Accepts tasks without running them, so jobs stay pending.
+    """
+
+    def submit(self, fn, *args):
+        pass
+
+
+class AsyncGameCreationTests(TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.user = User.objects.create_user(username="player", password="pass")
+        self.client.force_login(self.user)
+        # conftest creates games in the request for every test; this one turns the worker pool back on
+        enabled = self.settings(ASYNC_GAME_CREATION=["hard"])
+        enabled.enable()
+        self.addCleanup(enabled.disable)
+        patcher = patch("gameplay.workers.connection")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use_executor(self, executor):
+        patcher = patch("gameplay.jobs.get_executor", return_value=executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    # Test that a hard game is generated off the request thread and the preparing page redirects to it
+    def test_hard_game_is_created_on_the_pool(self):
+        self.use_executor(IdleExecutor())
+        with patch("gameplay.views.create_game_for_player") as mock_create:
+            response = self.client.get(reverse("start_new_game") + "?difficulty=hard")
+        mock_create.assert_not_called()
+
+        job_id = response.url.rstrip("/").rsplit("/", 1)[-1]
+        self.assertRedirects(response, reverse("game_preparing", args=[job_id]), fetch_redirect_response=False)
+        response = self.client.get(response.url)
+        self.assertContains(response, escapejs(reverse("game_creation_status", args=[job_id])))
+        self.assertContains(response, "const pollInterval = 500;")
+        self.assertEqual(self.client.get(reverse("game_creation_status", args=[job_id])).json(), {"status": PENDING})
+
+    # Test that a finished job points the status poll and the preparing page at the game
+    def test_ready_job_redirects_to_game(self):
+        self.use_executor(InlineExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        game = Game.objects.get(player=self.user)
+        self.assertEqual(game.difficulty, "hard")
+
+        data = self.client.get(reverse("game_creation_status", args=[job_id])).json()
+        self.assertEqual(data, {"status": READY, "redirect_url": reverse("game_view", args=[game.id])})
+        response = self.client.get(reverse("game_preparing", args=[job_id]))
+        self.assertRedirects(response, reverse("game_view", args=[game.id]), fetch_redirect_response=False)
+        self.assertEqual(registry.get_counter("game_creation_jobs_total", status=READY, difficulty="hard"), 1)
+
+    # Test that a failed generation sends the player back to the game selection
+    def test_failed_job(self):
+        self.use_executor(InlineExecutor())
+        with patch("gameplay.jobs.create_game_for_player", side_effect=GameCreationError):
+            job_id = enqueue_game_creation(self.user.pk, "hard")
+
+        data = self.client.get(reverse("game_creation_status", args=[job_id])).json()
+        self.assertEqual(data, {"status": FAILED, "redirect_url": reverse("game_selection")})
+
+    # Test that JSON clients get a 202 with the status URL
+    def test_json_client_gets_202(self):
+        self.use_executor(IdleExecutor())
+        response = self.client.get(reverse("start_new_game") + "?difficulty=hard", HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(response.json()["status_url"], reverse("game_creation_status", args=[job_id]))
+
+    # Test that other difficulties are still created in the request
+    def test_easy_game_is_created_in_the_request(self):
+        response = self.client.get(reverse("start_new_game") + "?difficulty=easy")
+        game = Game.objects.get(player=self.user)
+        self.assertRedirects(response, reverse("game_view", args=[game.id]), fetch_redirect_response=False)
+
+    # Test that another player's job is not visible
+    def test_job_belongs_to_the_player(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        other = User.objects.create_user(username="other", password="pass")
+        self.assertIsNone(get_job(job_id, other.pk))
+
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse("game_creation_status", args=[job_id])).status_code, 404)
+        response = self.client.get(reverse("game_preparing", args=[job_id]))
+        self.assertRedirects(response, reverse("game_selection"), fetch_redirect_response=False)
+
+    # Test that a second start supersedes the queued job and leaves one unfinished game
+    def test_newer_start_supersedes_job(self):
+        self.use_executor(IdleExecutor())
+        first = enqueue_game_creation(self.user.pk, "hard")
+        second = enqueue_game_creation(self.user.pk, "hard")
+        run_game_creation(second, self.user.pk, "hard")
+        run_game_creation(first, self.user.pk, "hard")
+
+        game = Game.objects.get(player=self.user)
+        self.assertEqual(get_job(second, self.user.pk).game_id, game.id)
+        self.assertEqual(get_job(first, self.user.pk).status, SUPERSEDED)
+        self.assertEqual(self.client.get(reverse("game_creation_status", args=[first])).json()["redirect_url"],
+                         reverse("game_selection"))
+
+    # Test that a game started in the request is not replaced by a job that was still queued
+    def test_request_start_supersedes_job(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        self.client.get(reverse("start_new_game") + "?difficulty=easy")
+        run_game_creation(job_id, self.user.pk, "hard")
+        self.assertEqual(get_job(job_id, self.user.pk).status, SUPERSEDED)
+        self.assertEqual(list(Game.objects.filter(player=self.user).values_list("difficulty", flat=True)), ["easy"])
+
+    # Test that the newest job replaces the player's older unfinished game when it finishes
+    def test_finished_job_replaces_unfinished_games(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        Game.objects.create(player=self.user, difficulty="easy")  # e.g. left over by a racing request
+        run_game_creation(job_id, self.user.pk, "hard")
+        self.assertEqual(list(Game.objects.filter(player=self.user).values_list("difficulty", flat=True)), ["hard"])
+
+    # Test that the status poll answers right away with one query, even while the job is pending
+    def test_status_poll_does_not_wait(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        self.client.get(reverse("game_creation_status", args=[job_id]))  # session and user
+        with patch("time.sleep") as mock_sleep, self.assertNumQueries(3):
+            data = self.client.get(reverse("game_creation_status", args=[job_id])).json()
+        self.assertEqual(data, {"status": PENDING})
+        mock_sleep.assert_not_called()
+
+    # Test that the job state is kept in the database, so it survives a cleared cache
+    def test_job_lives_in_the_database(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        cache.clear()
+        run_game_creation(job_id, self.user.pk, "hard")
+        self.assertEqual(GameCreationJob.objects.get(id=job_id).status, READY)
+
+    # Test that expired jobs are not answered and are swept by the next start
+    def test_expired_job(self):
+        self.use_executor(IdleExecutor())
+        job_id = enqueue_game_creation(self.user.pk, "hard")
+        GameCreationJob.objects.update(queued_at=timezone.now() - timedelta(seconds=JOB_TIMEOUT + 1))
+        self.assertIsNone(get_job(job_id, self.user.pk))
+        enqueue_game_creation(self.user.pk, "hard")
+        self.assertFalse(GameCreationJob.objects.filter(id=job_id).exists())
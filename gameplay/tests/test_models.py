@@ -1,6 +1,8 @@
 from django.test import TestCase
 from gameplay.models import Room, Item, Game, Cell, Intro, Memory, DifficultyTransition, PlayerStoryProgress,SequenceFrame
+from gameplay.utils import BoardCell, GameLayout
 from django.contrib.auth.models import User
+from unittest.mock import patch
 import uuid
 
 class RoomModelTest(TestCase):
@@ -59,8 +61,7 @@ class GameModelTest(TestCase):
         self.assertIsInstance(game.id, uuid.UUID)
         self.assertFalse(game.completed)
         self.assertEqual(game.difficulty, 'easy')
-        self.assertEqual(game.block_rooms, [])
-        self.assertEqual(game.block_items, {})
+        self.assertIsNone(game.seed)
 
     def test_game_can_be_marked_completed(self):
         """Completed field should reflect game completion"""
@@ -73,29 +74,32 @@ class GameCompletionTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='tester', password='test123')
         self.room = Room.objects.create(name="TestRoom")
-        self.item = Item.objects.create(name="Key", number=1, room=self.room, group_id="key")
+        self.key = Item.objects.create(name="Key", number=1, room=self.room, group_id="key")
+        self.lamp = Item.objects.create(name="Lamp", number=5, room=self.room, group_id="lamp")
         self.game = Game.objects.create(player=self.user)
 
+        # Only cells (0, 0) = 1 and (1, 1) = 5 are hidden
+        board = [[(i * 3 + i // 3 + j) % 9 + 1 for j in range(9)] for i in range(9)]
+        layout = GameLayout(board, [], {}, {0, 10})
+        patcher = patch("gameplay.utils.get_game_layout", return_value=layout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_is_completed_returns_true_if_all_cells_correct(self):
-        """Game is completed when all cells are filled and correct"""
-        for i in range(3):
-            cell = Cell.objects.create(game=self.game, row=i, column=i,
-                                       correct_item=self.item, selected_item=self.item)
-            cell.is_correct = lambda: True  # simulate correctness
-            cell.save()
+        """Game is completed when all hidden cells are filled and correct"""
+        Cell.objects.create(game=self.game, index=0, selected_item=self.key)
+        Cell.objects.create(game=self.game, index=10, selected_item=self.lamp)
         self.assertTrue(self.game.is_completed())
 
     def test_is_completed_returns_false_if_any_cell_missing_item(self):
-        """Game is not completed if any cell has no selected_item"""
-        Cell.objects.create(game=self.game, row=0, column=0,
-                            correct_item=self.item, selected_item=None)
+        """Game is not completed if any hidden cell has no move"""
+        Cell.objects.create(game=self.game, index=0, selected_item=self.key)
         self.assertFalse(self.game.is_completed())
 
     def test_is_completed_returns_false_if_any_cell_incorrect(self):
         """Game is not completed if any cell is incorrect"""
-        wrong_item = Item.objects.create(name="Wrong", number=9, room=self.room, group_id="wrong")
-        Cell.objects.create(game=self.game, row=0, column=0,
-                            correct_item=self.item, selected_item=wrong_item)
+        Cell.objects.create(game=self.game, index=0, selected_item=self.key)
+        Cell.objects.create(game=self.game, index=10, selected_item=self.key)
         self.assertFalse(self.game.is_completed())
 
 class CellModelTest(TestCase):
@@ -109,29 +113,22 @@ class CellModelTest(TestCase):
 
     def test_cell_str_returns_coordinates(self):
         """__str__ should return (row, column) of the cell"""
-        cell = Cell.objects.create(game=self.game, row=2, column=7,
-                                   correct_item=self.correct_item)
+        cell = Cell.objects.create(game=self.game, index=25, selected_item=self.correct_item)
         self.assertEqual(str(cell), "Cell (2, 7)")
 
     def test_is_correct_returns_true_for_matching_items(self):
         """is_correct returns True when selected_item and correct_item have the same number"""
-        cell = Cell.objects.create(game=self.game, row=1, column=1,
-                                   correct_item=self.correct_item,
-                                   selected_item=self.correct_item)
+        cell = BoardCell(10, 1, 1, self.correct_item, self.correct_item, False)
         self.assertTrue(cell.is_correct())
 
     def test_is_correct_returns_false_for_different_items(self):
         """is_correct returns False when selected_item and correct_item differ in number"""
-        cell = Cell.objects.create(game=self.game, row=3, column=3,
-                                   correct_item=self.correct_item,
-                                   selected_item=self.wrong_item)
+        cell = BoardCell(30, 3, 3, self.correct_item, self.wrong_item, False)
         self.assertFalse(cell.is_correct())
 
     def test_is_correct_returns_false_when_selected_item_is_none(self):
         """is_correct returns False when selected_item is None"""
-        cell = Cell.objects.create(game=self.game, row=0, column=0,
-                                   correct_item=self.correct_item,
-                                   selected_item=None)
+        cell = BoardCell(0, 0, 0, self.correct_item, None, False)
         self.assertFalse(cell.is_correct())
 
 class IntroModelTest(TestCase):
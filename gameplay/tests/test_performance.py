@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from gameplay.models import Cell, Game, Memory, PlayerStoryProgress
+from gameplay.utils import create_game_for_player, get_board
+from main.testing import QueryBudgetMixin
+from score.models import PlayerScore
+
+
+class GameplayQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Query and time budgets of the gameplay views on the real item and story data,
+    for a player with the whole story unlocked.
+
+    A failing budget prints the executed SQL; raise a budget only together with the reason.
+    """
+    fixtures = ["items.json", "story.json", "sequence_frames.json"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="tester", password="test123")
+        orders = {
+            difficulty: list(Memory.objects.filter(difficulty=difficulty).values_list("order", flat=True))
+            for difficulty in ("easy", "medium", "hard")
+        }
+        PlayerStoryProgress.objects.create(
+            player=cls.user,
+            unlocked_easy=orders["easy"], unlocked_medium=orders["medium"], unlocked_hard=orders["hard"],
+        )
+        PlayerScore.objects.create(user=cls.user, total_completed_games=60, unlocked_memories=60)
+
+    def setUp(self):
+        self.client.login(username="tester", password="test123")
+        self.game = create_game_for_player(self.user, difficulty="easy")
+
+    def solve_all_but_one(self):
+        """
+        Places the correct item into every hidden cell except one and returns that cell.
+        """
+        hidden = [cell for cell in get_board(self.game) if not cell.prefilled]
+        Cell.objects.bulk_create([Cell(game=self.game, index=cell.index, selected_item=cell.correct_item)
+                                  for cell in hidden[1:]])
+        return hidden[0]
+
+    # Test the cost of creating a game (generation, game row, solvability check; no cells are stored)
+    def test_create_game_budget(self):
+        # A fixed seed whose puzzle is rated in the band: a random one may be retried (one more attempt's queries)
+        with self.assertQueryBudget(6, max_seconds=2.0):
+            create_game_for_player(self.user, difficulty="hard", seed=0)
+
+    # Test the cost of starting a new game through the view
+    def test_start_new_game_budget(self):
+        with self.assertQueryBudget(15, max_seconds=2.0):
+            response = self.client.get(reverse("start_new_game") + "?difficulty=medium")
+        self.assertEqual(response.status_code, 302)
+
+    # Test the cost of the game page for the centre room (four neighbours)
+    def test_game_view_budget(self):
+        with self.assertQueryBudget(9, max_seconds=1.0):
+            response = self.client.get(reverse("game_block", args=[self.game.id, 4]))
+        self.assertEqual(response.status_code, 200)
+
+    # Test the cost of placing an item that does not finish the game
+    def test_place_item_budget(self):
+        cell = next(cell for cell in get_board(self.game) if not cell.prefilled)
+        with self.assertQueryBudget(6, max_seconds=1.0):
+            response = self.client.post(reverse("place_item", args=[self.game.id, cell.index]), {"number": 1},
+                                        content_type="application/json")
+        self.assertEqual(response.json()["status"], "ok")
+
+    # Test the cost of the final move (memory unlock, score update, game deletion)
+    def test_place_item_completing_game_budget(self):
+        cell = self.solve_all_but_one()
+        number = cell.correct_item.number
+        with self.assertQueryBudget(16, max_seconds=1.0):
+            response = self.client.post(reverse("place_item", args=[self.game.id, cell.index]), {"number": number},
+                                        content_type="application/json")
+        self.assertEqual(response.json()["status"], "completed")
+        self.assertFalse(Game.objects.filter(id=self.game.id).exists())
+
+    # Test the cost of the story page with all 60 memories unlocked
+    def test_story_so_far_budget(self):
+        with self.assertQueryBudget(7, max_seconds=1.0):
+            response = self.client.get(reverse("story_so_far"))
+        self.assertEqual(len(response.context["unlocked_hard"]), 20)
+
+    # Test the cost of the game selection page
+    def test_game_selection_budget(self):
+        with self.assertQueryBudget(5, max_seconds=1.0):
+            response = self.client.get(reverse("game_selection"))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from gameplay.cache import ProgressSummary, load_active_game_id
+from gameplay.models import Cell, Game
+from gameplay.prefetch import _in_flight, claim_reserved_game, expire_reservations, predict_difficulty, schedule_prefetch
+from gameplay.utils import get_game_layout
+from main.metrics import registry
+
+
+class InlineExecutor:
+    """
+    Runs submitted tasks immediately, inside the test transaction.
+    """
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class PrefetchTests(TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.user = User.objects.create_user(username="player", password="pass")
+        self.client.force_login(self.user)
+        # conftest turns pre-generation off for every test; this one turns it back on
+        enabled = self.settings(GAME_PREFETCH=True, GAME_PREFETCH_TTL=600)
+        enabled.enable()
+        self.addCleanup(enabled.disable)
+        # Build reserved games synchronously, and keep the test connection open
+        for patcher in (patch("gameplay.prefetch.get_executor", return_value=InlineExecutor()),
+                        patch("gameplay.workers.connection")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    # Test that the likely difficulty follows the story tier
+    def test_predict_difficulty(self):
+        self.assertEqual(predict_difficulty(ProgressSummary()), "easy")
+        self.assertEqual(predict_difficulty(ProgressSummary(unlocked_easy=range(20))), "medium")
+        self.assertEqual(predict_difficulty(ProgressSummary(unlocked_easy=range(20), unlocked_medium=range(20))), "hard")
+
+    # Test that game_selection builds a reserved game that is not the player's active game
+    def test_game_selection_reserves_a_game(self):
+        response = self.client.get(reverse("game_selection"))
+        self.assertIsNone(response.context["existing_game"])
+
+        reserved = Game.objects.get(player=self.user)
+        self.assertTrue(reserved.reserved)
+        self.assertEqual(reserved.difficulty, "easy")
+        self.assertIsNotNone(reserved.seed)
+        self.assertIsNone(load_active_game_id(self.user.pk))
+        self.assertEqual(registry.get_counter("game_prefetch_built_total", difficulty="easy"), 1)
+
+        # The reserved game can't be opened before it is claimed
+        response = self.client.get(reverse("game_view", args=[reserved.id]))
+        self.assertRedirects(response, reverse("main_page"), fetch_redirect_response=False)
+        index = min(get_game_layout(reserved).hidden_cells)
+        response = self.client.post(reverse("place_item", args=[reserved.id, index]), {"number": 1},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)  # not found, reported by the view's error handler
+        self.assertFalse(Cell.objects.exists())
+
+    # Test that start_new_game claims the reserved game instead of generating one
+    def test_start_new_game_claims_reservation(self):
+        self.assertTrue(schedule_prefetch(self.user.pk, "easy"))
+        reserved = Game.objects.get(player=self.user)
+        Game.objects.filter(id=reserved.id).update(created_at=timezone.now() - timedelta(seconds=300))
+
+        with patch("gameplay.views.create_game_for_player") as mock_create:
+            response = self.client.get(reverse("start_new_game") + "?difficulty=easy")
+        mock_create.assert_not_called()
+
+        self.assertRedirects(response, reverse("game_view", args=[reserved.id]), fetch_redirect_response=False)
+        claimed = Game.objects.get(id=reserved.id)
+        self.assertFalse(claimed.reserved)
+        self.assertLess(timezone.now() - claimed.created_at, timedelta(seconds=60))  # timed from the claim
+        self.assertEqual(load_active_game_id(self.user.pk), reserved.id)
+        self.assertEqual(registry.get_counter("game_prefetch_total", result="hit", difficulty="easy"), 1)
+
+    # Test that a reservation for another difficulty is a miss and a game is generated
+    def test_other_difficulty_is_a_miss(self):
+        schedule_prefetch(self.user.pk, "easy")
+        response = self.client.get(reverse("start_new_game") + "?difficulty=medium")
+
+        game = Game.objects.get(player=self.user, reserved=False)
+        self.assertEqual(game.difficulty, "medium")
+        self.assertRedirects(response, reverse("game_view", args=[game.id]), fetch_redirect_response=False)
+        self.assertEqual(registry.get_counter("game_prefetch_total", result="miss", difficulty="medium"), 1)
+
+    # Test that an expired reservation is neither claimed nor kept
+    def test_expired_reservation(self):
+        schedule_prefetch(self.user.pk, "easy")
+        reserved = Game.objects.get(player=self.user)
+        Game.objects.filter(id=reserved.id).update(created_at=timezone.now() - timedelta(seconds=601))
+
+        self.assertIsNone(claim_reserved_game(self.user, "easy"))  # deletes it on the way
+        self.assertEqual(expire_reservations(), 0)
+        self.assertFalse(Game.objects.exists())
+        self.assertFalse(Cell.objects.exists())
+        self.assertEqual(registry.get_counter("game_prefetch_expired_total"), 1)
+
+    # Test that a player gets at most one reservation and no duplicate builds
+    def test_one_reservation_per_player(self):
+        self.assertTrue(schedule_prefetch(self.user.pk, "easy"))
+        self.assertFalse(schedule_prefetch(self.user.pk, "easy"))  # already reserved
+
+        self.assertTrue(schedule_prefetch(self.user.pk, "medium"))  # a new prediction replaces it
+        self.assertEqual(list(Game.objects.values_list("difficulty", flat=True)), ["medium"])
+
+        _in_flight.add((self.user.pk, "hard"))
+        self.addCleanup(_in_flight.discard, (self.user.pk, "hard"))
+        self.assertFalse(schedule_prefetch(self.user.pk, "hard"))  # already being built
+
+    # Test that nothing is scheduled or claimed when pre-generation is off
+    @override_settings(GAME_PREFETCH=False)
+    def test_disabled(self):
+        self.assertFalse(schedule_prefetch(self.user.pk, "easy"))
+        self.assertIsNone(claim_reserved_game(self.user, "easy"))
+        self.assertFalse(Game.objects.exists())
+
+    # Test that a reservation is claimed once, also by a process that did not build it (empty cache)
+    def test_claim_from_database(self):
+        schedule_prefetch(self.user.pk, "easy")
+        cache.clear()
+        self.assertIsNotNone(claim_reserved_game(self.user, "easy"))
+        self.assertIsNone(claim_reserved_game(self.user, "easy"))
+
+    # Test that the claim path and the command delete expired reservations
+    def test_expired_reservations_are_swept(self):
+        other = User.objects.create_user(username="other")
+        schedule_prefetch(self.user.pk, "easy")
+        schedule_prefetch(other.pk, "easy")
+        Game.objects.update(created_at=timezone.now() - timedelta(seconds=601))
+
+        self.assertIsNone(claim_reserved_game(self.user, "medium"))
+        self.assertEqual(list(Game.objects.values_list("player", flat=True)), [other.pk])
+
+        out = StringIO()
+        call_command("expire_reservations", stdout=out)
+        self.assertFalse(Game.objects.exists())
+        self.assertIn("1 expired reservations deleted", out.getvalue())
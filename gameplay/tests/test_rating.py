@@ -0,0 +1,110 @@
+import random
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from gameplay.benchmarks import HARD_PUZZLES
+from gameplay.rating import (ALL_DIGITS, GUESSING, Candidates, canonical_form, get_rating, puzzle_hash, rate_puzzle,
+                             rating_name)
+from gameplay.utils import count_solutions, dig_rated_puzzle, generate_sudoku
+from main.metrics import registry
+
+# Solvable with naked singles alone
+SINGLES_PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+
+
+def empty_candidates():
+    return Candidates("0" * 81)
+
+
+def without(candidates, cells, digit):
+    for cell in cells:
+        candidates.masks[cell] &= ~(1 << digit)
+
+
+class RatingTests(TestCase):
+
+    # Test that the rating is the hardest technique needed
+    def test_rate_puzzle(self):
+        self.assertEqual(rate_puzzle(SINGLES_PUZZLE), 1)
+        self.assertEqual(rating_name(rate_puzzle(SINGLES_PUZZLE)), "naked_single")
+        self.assertEqual(rate_puzzle(HARD_PUZZLES["ai_escargot"]), GUESSING)
+        self.assertEqual(rating_name(GUESSING), "guessing")
+        self.assertEqual(rate_puzzle("11" + "0" * 79), GUESSING)  # contradictory givens
+
+    # Test pointing: a digit confined to one row of a block leaves the rest of the row
+    def test_locked_candidates(self):
+        grid = empty_candidates()
+        without(grid, [2, 9, 10, 11, 18, 19, 20], 1)
+        self.assertTrue(grid.locked_candidates())
+        self.assertFalse(any(grid.masks[cell] & 2 for cell in range(3, 9)))
+        self.assertTrue(grid.masks[0] & 2)
+
+    # Test that two cells sharing two candidates remove them from the rest of the row
+    def test_naked_pair(self):
+        grid = empty_candidates()
+        grid.masks[0] = grid.masks[1] = (1 << 1) | (1 << 2)
+        self.assertTrue(grid.naked_subset(2))
+        self.assertEqual(grid.masks[5] & ((1 << 1) | (1 << 2)), 0)
+
+    # Test that two digits confined to two cells of a row keep only those digits there
+    def test_hidden_pair(self):
+        grid = empty_candidates()
+        for digit in (3, 4):
+            without(grid, range(2, 9), digit)
+        self.assertTrue(grid.hidden_subset(2))
+        self.assertEqual(grid.masks[0], (1 << 3) | (1 << 4))
+
+    # Test that a digit in the same two columns of two rows leaves the rest of those columns
+    def test_x_wing(self):
+        grid = empty_candidates()
+        for row in (0, 4):
+            without(grid, [row * 9 + c for c in range(9) if c not in (1, 7)], 5)
+        self.assertTrue(grid.x_wing())
+        self.assertFalse(grid.masks[2 * 9 + 1] & (1 << 5))
+        self.assertFalse(grid.masks[8 * 9 + 7] & (1 << 5))
+        self.assertEqual(grid.masks[4 * 9 + 1], ALL_DIGITS)
+
+    # Test that relabelled and transposed copies share a canonical form and a cached rating
+    def test_cached_by_canonical_hash(self):
+        relabelled = SINGLES_PUZZLE.translate(str.maketrans("123456789", "987654321"))
+        transposed = "".join(SINGLES_PUZZLE[c * 9 + r] for r in range(9) for c in range(9))
+        self.assertEqual(canonical_form(relabelled), canonical_form(SINGLES_PUZZLE))
+        self.assertEqual(puzzle_hash(transposed), puzzle_hash(SINGLES_PUZZLE))
+
+        with patch("gameplay.rating.rate_puzzle", wraps=rate_puzzle) as mock_rate:
+            ratings = {get_rating(givens) for givens in (SINGLES_PUZZLE, relabelled, transposed)}
+        self.assertEqual(ratings, {1})
+        mock_rate.assert_called_once()
+
+
+class RatedGenerationTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def givens(self, board, hidden):
+        return "".join("0" if i in hidden else str(board[i // 9][i % 9]) for i in range(81))
+
+    # Test that the dug puzzle has one solution and a rating in the difficulty's band
+    def test_puzzle_in_band(self):
+        board = generate_sudoku(random.Random(3))
+        hidden, rating = dig_rated_puzzle(board, "medium", random.Random(3))
+        self.assertEqual(len(hidden), 51)
+        self.assertEqual(rating, 2)
+        self.assertEqual(rate_puzzle(self.givens(board, hidden)), rating)
+        grid = [[0 if r * 9 + c in hidden else board[r][c] for c in range(9)] for r in range(9)]
+        self.assertEqual(count_solutions(grid), 1)
+        self.assertEqual(registry.get_counter("puzzle_rating_total", result="in_band", difficulty="medium"), 1)
+
+    # Test that the attempt budget is kept and the closest puzzle is returned when the band is out of reach
+    def test_attempt_budget(self):
+        board = generate_sudoku(random.Random(3))
+        with self.settings(DIFFICULTY_RATINGS={"easy": (8, 8)}, RATING_ATTEMPTS=3), \
+                patch("gameplay.utils.get_rating", wraps=get_rating) as mock_rating:
+            hidden, rating = dig_rated_puzzle(board, "easy", random.Random(3))
+        self.assertEqual(mock_rating.call_count, 3)
+        self.assertNotEqual(rating, 8)
+        self.assertEqual(registry.get_counter("puzzle_rating_total", result="closest", difficulty="easy"), 1)
+        self.assertEqual(registry.get_histogram("puzzle_rating_attempts", difficulty="easy").sum, 3)
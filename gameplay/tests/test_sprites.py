@@ -0,0 +1,76 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from gameplay.sprites import css_string
+
+
+class BuildItemSpritesTests(SimpleTestCase):
+    def setUp(self):
+        # Scratch static/ directory with three 48px item icons
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = Path(self.tmp.name)
+        (self.static_dir / "items").mkdir()
+        for name, color in (("Hrnek", "red"), ("Maska na spaní", "green"), ("Kniha", "blue")):
+            Image.new("RGBA", (48, 48), color).save(self.static_dir / "items" / f"{name}.png")
+
+        self.settings_override = override_settings(OPTIMIZED_STATIC_SOURCE=self.static_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def build(self):
+        call_command("build_item_sprites", stdout=StringIO())
+        return json.loads((self.static_dir / "optimized" / "sprites.json").read_text(encoding="utf-8"))
+
+    def render(self, source):
+        return Template("{% load custom_filters %}" + source).render(Context())
+
+    # Test that all icons are packed into one atlas with one CSS offset per group_id
+    def test_packs_icons_into_one_atlas(self):
+        manifest = self.build()
+        self.assertEqual(sorted(manifest["groups"]), ["Hrnek", "Kniha", "Maska na spaní"])
+        self.assertIsNone(manifest["image_2x"])  # 48px sources, nothing to gain from 2x
+
+        with Image.open(self.static_dir / manifest["image"]) as atlas:
+            self.assertEqual(atlas.size, (96, 96))  # 2x2 grid of 48px cells
+
+        css = (self.static_dir / manifest["css"]).read_text(encoding="utf-8")
+        self.assertIn('.item-sprite[data-group="Maska na spaní"]', css)
+        self.assertIn("background-position: -48px 0px;", css)
+
+    # Test that a 2x atlas is added when the icons are large enough
+    def test_builds_2x_atlas_for_large_icons(self):
+        Image.new("RGBA", (96, 96), "white").save(self.static_dir / "items" / "Hrnek.png")
+        manifest = self.build()
+
+        with Image.open(self.static_dir / manifest["image_2x"]) as atlas:
+            self.assertEqual(atlas.size, (192, 192))
+        css = (self.static_dir / manifest["css"]).read_text(encoding="utf-8")
+        self.assertIn("min-resolution: 2dppx", css)
+
+    # Test that the template tag renders a sprite element for packed groups
+    def test_item_icon_uses_sprite(self):
+        self.build()
+        html = self.render('{% item_icon "Kniha" "Kniha" "icon-correct" %}')
+        self.assertIn('class="item-sprite item-icon icon-correct"', html)
+        self.assertIn('data-group="Kniha"', html)
+        self.assertIn("<link", self.render("{% item_sprite_css %}"))
+
+    # Test that the tag falls back to the single icon file without an atlas
+    def test_item_icon_falls_back_to_image(self):
+        html = self.render('{% item_icon "Kniha" "Kniha" %}')
+        self.assertIn('<img src="/static/items/Kniha.png"', html)
+        self.assertEqual(self.render("{% item_sprite_css %}"), "")
+
+    # Test CSS string quoting of group ids
+    def test_css_string_escapes_quotes(self):
+        self.assertEqual(css_string('a"b'), '"a\\"b"')
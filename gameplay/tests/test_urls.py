@@ -21,9 +21,10 @@ class GameplayURLTests(SimpleTestCase):
         url = reverse('game_block', args=[fake_uuid, 0])
         self.assertEqual(resolve(url).func, views.game_view)
 
-    # Test that the 'place_item' URL with an item ID maps to the place_item view
+    # Test that the 'place_item' URL with a game UUID and cell index maps to the place_item view
     def test_place_item_url(self):
-        url = reverse('place_item', args=[1])
+        fake_uuid = "123e4567-e89b-12d3-a456-426614174000"
+        url = reverse('place_item', args=[fake_uuid, 1])
         self.assertEqual(resolve(url).func, views.place_item)
 
     # Test that the 'story_so_far' URL maps to the story_so_far view
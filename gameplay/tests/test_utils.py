@@ -1,10 +1,18 @@
 from django.test import TestCase
 from gameplay.utils import (generate_sudoku, assign_items_to_board, get_valid_item_groups, build_number_to_item_mapping,
-                            create_game_for_player, select_valid_rooms, build_block_items, fill_cells, has_solution,
-                            try_unlock_memory, get_sequence_for_trigger)
+                            GameCreationError, create_game_for_player, select_valid_rooms, build_block_items, has_solution,
+                            try_unlock_memory, get_sequence_for_trigger, generate_layout, get_game_layout,
+                            get_catalog_version, count_solutions, get_board, is_sudoku_solvable)
+import random
+from io import StringIO
 from unittest.mock import patch, MagicMock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from gameplay.models import Item, Room, Cell, User, Game, PlayerStoryProgress, Memory
 from django.contrib.auth import get_user_model
+from main.metrics import registry
+from gameplay.cache import load_active_game_id
 
 
 class GenerateSudokuTests(TestCase):
@@ -197,12 +205,62 @@ class CreateGameTests(TestCase):
         self.assertEqual(game.player, self.user)
         self.assertEqual(game.difficulty, "medium")
 
-        # Ensure that 9 block_rooms and 9 block_items were assigned (standard 9 blocks in Sudoku)
-        self.assertEqual(len(game.block_rooms), 9)
-        self.assertEqual(len(game.block_items), 9)
+        # Ensure that the layout has 9 rooms and 9 block item mappings (standard 9 blocks in Sudoku)
+        layout = get_game_layout(game)
+        self.assertEqual(len(layout.block_rooms), 9)
+        self.assertEqual(len(layout.block_items), 9)
 
-        # Confirm that 81 cells were created (standard 9x9 Sudoku grid)
-        self.assertEqual(Cell.objects.filter(game=game).count(), 81)
+        # Confirm that no cells were stored: the player has made no moves yet
+        self.assertFalse(Cell.objects.filter(game=game).exists())
+
+    # Test that every creation stage is timed and the result is counted in the metrics registry
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_create_game_records_stage_metrics(self, mock_solver):
+        registry.reset()
+        create_game_for_player(self.user, difficulty="easy")
+
+        for stage in ("generate_sudoku", "select_valid_rooms", "build_block_items",
+                      "game_insert", "is_sudoku_solvable"):
+            self.assertEqual(registry.get_histogram("game_creation_stage_seconds", stage=stage).count, 1)
+        self.assertEqual(registry.get_counter("game_creation_total", result="solvable", difficulty="easy"), 1)
+        self.assertEqual(registry.get_histogram("game_creation_seconds", difficulty="easy").count, 1)
+        registry.reset()
+
+    # Test that an unsolvable board is rolled back and generation is retried
+    @patch("gameplay.utils.is_sudoku_solvable", side_effect=[False, True])
+    def test_create_game_retries_unsolvable_board(self, mock_solver):
+        registry.reset()
+        game = create_game_for_player(self.user, difficulty="hard", seed=0)  # seeds 0 and 1 are rated in the band
+
+        # Only the successful attempt is left in the database
+        self.assertEqual(Game.objects.get(), game)
+        self.assertEqual(registry.get_counter("game_creation_total", result="unsolvable", difficulty="hard"), 1)
+        self.assertEqual(registry.get_counter("game_creation_retries_total", difficulty="hard"), 1)
+        self.assertEqual(registry.get_histogram("game_creation_attempts", difficulty="hard").sum, 2)
+        registry.reset()
+
+    # Test that creation gives up after the attempt limit without leaving rows behind
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=False)
+    def test_create_game_fails_after_attempts(self, mock_solver):
+        registry.reset()
+        with self.assertLogs("gameplay.utils", "ERROR"):
+            with self.assertRaises(GameCreationError):
+                create_game_for_player(self.user, difficulty="easy", attempts=3)
+
+        self.assertEqual(mock_solver.call_count, 3)
+        self.assertFalse(Game.objects.exists())
+        self.assertFalse(Cell.objects.exists())
+        self.assertIsNone(load_active_game_id(self.user.pk))
+        self.assertEqual(registry.get_counter("game_creation_failures_total", difficulty="easy"), 1)
+        registry.reset()
+
+    # Test that no new attempt is started once the time budget is spent
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=False)
+    def test_create_game_respects_time_budget(self, mock_solver):
+        with self.assertLogs("gameplay.utils", "ERROR"):
+            with self.assertRaises(GameCreationError):
+                create_game_for_player(self.user, attempts=10, time_budget=0)
+        self.assertEqual(mock_solver.call_count, 1)
 
 
 class SelectValidRoomsTests(TestCase):
@@ -327,58 +385,59 @@ class BuildBlockItemsTests(TestCase):
             build_block_items(room)
 
 
-class FillCellsTests(TestCase):
-    def setUp(self):
-        # Create a test user
-        User = get_user_model()
-        self.user = User.objects.create_user(username="testuser", password="test")
-
-        # Create a test room and 9 unique items with numbers 1–9
-        self.room = Room.objects.create(name="Room 1")
-        self.items = []
-        for i in range(1, 10):
-            item = Item.objects.create(
-                name=f"Item {i}",
-                group_id=f"group_{i}",
-                number=i,
-                room=self.room
-            )
-            self.items.append(item)
-
-        # Create a new game object assigned to the test user
-        self.game = Game.objects.create(player=self.user, difficulty="easy")  # 🔧 corrected
-
-        # Create a valid 9x9 Sudoku board using a known formula (ensures a correct puzzle)
-        self.board = [[(i * 3 + i // 3 + j) % 9 + 1 for j in range(9)] for i in range(9)]
+class GetBoardTests(TestCase):
+    fixtures = ["items.json"]
 
-        # Prepare block_items: a mapping from block index (as string) to number → item ID
-        # All 9 blocks use the same 9 items for simplicity
-        self.block_items = {
-            str(i): {n: self.items[n - 1].id for n in range(1, 10)}
-            for i in range(9)
-        }
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="testuser", password="test")
+        self.game = create_game_for_player(self.user, difficulty="medium", seed=42)
+        self.layout = get_game_layout(self.game)
+        self.hidden = sorted(self.layout.hidden_cells)
 
-    # Test that fill_cells() correctly creates all 81 cells with proper items and prefill logic
-    def test_cells_are_created_correctly(self):
-        # Fill the board for the given game
-        fill_cells(self.game, self.board, self.block_items, difficulty='medium')
+    # Test that the board is rebuilt from the layout: correct items, prefilled cells and no moves yet
+    def test_board_from_layout(self):
+        cells = get_board(self.game)
 
-        # Fetch all cells for the game
-        cells = Cell.objects.filter(game=self.game)
+        self.assertEqual(len(cells), 81)
+        for cell in cells:
+            self.assertEqual(cell.index, cell.row * 9 + cell.column)
+            self.assertEqual(cell.correct_item.number, self.layout.board[cell.row][cell.column])
+            self.assertEqual(cell.prefilled, cell.index not in self.layout.hidden_cells)
+            # A prefilled cell shows its correct item, a hidden cell is empty
+            self.assertEqual(cell.selected_item, cell.correct_item if cell.prefilled else None)
+
+    # Test that the player's moves are shown in their cells and moves on prefilled cells are ignored
+    def test_board_with_moves(self):
+        right, wrong = self.hidden[:2]
+        cells = get_board(self.game)
+        wrong_item = next(cell.correct_item for cell in cells
+                          if cell.correct_item.number != cells[wrong].correct_item.number)
+        prefilled = next(cell for cell in cells if cell.prefilled)
+        Cell.objects.create(game=self.game, index=right, selected_item=cells[right].correct_item)
+        Cell.objects.create(game=self.game, index=wrong, selected_item=wrong_item)
+        Cell.objects.create(game=self.game, index=prefilled.index, selected_item=wrong_item)
+
+        cells = get_board(self.game)
+        self.assertTrue(cells[right].is_correct())
+        self.assertEqual(cells[wrong].selected_item, wrong_item)
+        self.assertFalse(cells[wrong].is_correct())
+        self.assertEqual(cells[prefilled.index].selected_item, prefilled.correct_item)
+
+    # Test that the solvability check combines the prefilled cells with the player's moves
+    def test_is_sudoku_solvable_with_moves(self):
+        self.assertTrue(is_sudoku_solvable(self.game))
+
+        # A number repeated in a row makes the board unsolvable
+        cells = get_board(self.game)
+        index = self.hidden[0]
+        row_numbers = {cells[index // 9 * 9 + c].correct_item.number for c in range(9)
+                       if index // 9 * 9 + c not in self.layout.hidden_cells}
+        block_item = next(item_id for number, item_id in self.layout.block_items[str(index // 27 * 3 + index % 9 // 3)].items()
+                          if number in row_numbers)
+        Cell.objects.create(game=self.game, index=index, selected_item_id=block_item)
+        self.assertFalse(is_sudoku_solvable(self.game))
 
-        # There should be exactly 81 cells in a 9x9 board
-        self.assertEqual(cells.count(), 81)
 
-        # Each cell's correct_item should match the board number at that row/column
-        for cell in cells:
-            self.assertEqual(cell.correct_item.number, self.board[cell.row][cell.column])
-            self.assertEqual(cell.correct_item.id, cell.correct_item.id)  # sanity check
-            # Either the cell is prefilled or not filled at all yet
-            self.assertTrue(cell.prefilled or cell.selected_item is None)
-
-        # Check that the number of prefilled cells is around 30 for 'medium' difficulty
-        prefilled_count = cells.filter(prefilled=True).count()
-        self.assertTrue(25 <= prefilled_count <= 35)  # Allowing for randomness
 class HasSolutionTests(TestCase):
 
     # Test that a valid, solvable Sudoku board returns True
@@ -413,6 +472,27 @@ class HasSolutionTests(TestCase):
         # This board is unsolvable due to an invalid duplicate → should return False
         self.assertFalse(has_solution(board))
 
+
+class CountSolutionsTests(TestCase):
+
+    # Test that a puzzle with one solution is counted once and the grid is left unchanged
+    def test_unique_puzzle(self):
+        givens = "100007090030020008009600500005300900010080002600004000300000010040000007007000300"
+        grid = [[int(givens[r * 9 + c]) for c in range(9)] for r in range(9)]
+        self.assertEqual(count_solutions(grid), 1)
+        self.assertEqual("".join(str(n) for row in grid for n in row), givens)
+
+    # Test that counting stops at the limit and repeated givens have no solution
+    def test_limit_and_contradiction(self):
+        board = generate_sudoku(random.Random(1))
+        board[4] = [0] * 9  # The columns still determine the row
+        self.assertEqual(count_solutions(board), 1)
+        self.assertEqual(count_solutions([[0] * 9 for _ in range(9)], limit=5), 5)
+
+        board = generate_sudoku(random.Random(1))
+        board[0][0] = board[0][1]
+        self.assertEqual(count_solutions(board), 0)
+
 # Test class for checking if the current state of a game board is solvable
 # Uses Cell objects filled with selected items to simulate player input
 
@@ -567,3 +647,120 @@ class GetSequenceForTriggerTests(TestCase):
         PlayerStoryProgress.objects.create(player=self.user, unlocked_easy=[0, 1])
         result = get_sequence_for_trigger("complete", self.user)
         self.assertIsNone(result)
+
+
+class SeededGenerationTests(TestCase):
+    fixtures = ["items.json"]
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="seeded", password="pass")
+
+    # Test that the same rng seed generates the same board
+    def test_generate_sudoku_is_reproducible(self):
+        self.assertEqual(generate_sudoku(random.Random(5)), generate_sudoku(random.Random(5)))
+        self.assertNotEqual(generate_sudoku(random.Random(5)), generate_sudoku(random.Random(6)))
+
+    # Test that a seed always produces the same layout
+    def test_generate_layout_is_reproducible(self):
+        first, _ = generate_layout(123, "hard")
+        self.assertEqual(first, generate_layout(123, "hard")[0])
+        self.assertEqual(len(first.hidden_cells), 81 - 24)
+        self.assertNotEqual(first, generate_layout(124, "hard")[0])
+
+    # Test that the seed and puzzle stored on a game rebuild the layout it was created from
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_game_is_rebuilt_from_seed(self, mock_solver):
+        game = create_game_for_player(self.user, difficulty="medium", seed=42)
+        created = get_game_layout(game)  # cached by build_game
+        game.refresh_from_db()
+        self.assertEqual(game.seed, 42)
+        self.assertEqual(game.catalog_version, get_catalog_version())
+        self.assertEqual(game.givens.count("0"), 81 - 30)
+        self.assertEqual(created, generate_layout(42, "medium")[0])
+
+        cache.clear()
+        with patch("gameplay.utils.pick_board") as mock_pick, \
+                patch("gameplay.utils.dig_rated_puzzle") as mock_dig:
+            self.assertEqual(get_game_layout(game), created)
+        mock_pick.assert_not_called()
+        mock_dig.assert_not_called()
+
+    # Test that retries with a given seed continue with the following seeds
+    @patch("gameplay.utils.is_sudoku_solvable", side_effect=[False, True])
+    def test_retry_uses_next_seed(self, mock_solver):
+        game = create_game_for_player(self.user, seed=42)
+        self.assertEqual(game.seed, 43)
+
+    # Test that a puzzle rated outside the band is retried and only the last attempt takes the closest one
+    def test_out_of_band_puzzle_is_retried(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        with self.settings(DIFFICULTY_RATINGS={"easy": (8, 8)}, RATING_ATTEMPTS=1):
+            game = create_game_for_player(self.user, difficulty="easy", attempts=3, seed=10)
+            self.assertEqual(game.seed, 12)
+            self.assertFalse(generate_layout(12, "easy")[1])
+        self.assertEqual(registry.get_counter("game_creation_total", result="out_of_band", difficulty="easy"), 2)
+        self.assertEqual(Game.objects.count(), 1)
+
+    # Test that without rating retries (a request) the first solvable board is kept, closest to the band
+    def test_out_of_band_puzzle_is_kept_without_rating_retries(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        with self.settings(DIFFICULTY_RATINGS={"easy": (8, 8)}, RATING_ATTEMPTS=1):
+            game = create_game_for_player(self.user, difficulty="easy", attempts=3, seed=10, retry_rating=False)
+        self.assertEqual(game.seed, 10)
+        self.assertEqual(registry.get_counter("game_creation_total", result="out_of_band", difficulty="easy"), 0)
+
+    # Test that a new room changes the catalog version even without items, since it changes the room shuffle
+    def test_new_room_changes_catalog_version(self):
+        version = get_catalog_version()
+        Room.objects.create(name="Empty room")
+        self.assertNotEqual(get_catalog_version(), version)
+
+    # Test that new rating settings only change new games: existing games keep their stored puzzle
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_rating_settings_keep_existing_games(self, mock_solver):
+        game = create_game_for_player(self.user, seed=42)
+        layout = get_game_layout(game)
+        cache.clear()
+        with self.settings(RATING_ATTEMPTS=3, DIFFICULTY_RATINGS={"easy": (1, 2), "medium": (2, 2), "hard": (3, 8)}):
+            self.assertEqual(get_catalog_version(), game.catalog_version)
+            self.assertEqual(get_game_layout(game), layout)
+
+    # Test that the blocks drawn from the seed are cached
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_layout_is_cached(self, mock_solver):
+        game = create_game_for_player(self.user)
+        cache.clear()
+        get_game_layout(game)
+        with patch("gameplay.utils.generate_blocks") as mock_generate:
+            get_game_layout(game)
+        mock_generate.assert_not_called()
+
+    # Test that changing an item changes the catalog version and refuses to rebuild older games
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_catalog_change_invalidates_seed(self, mock_solver):
+        game = create_game_for_player(self.user)
+        item = Item.objects.first()
+        item.group_id = "renamed"
+        item.save()
+
+        self.assertNotEqual(get_catalog_version(), game.catalog_version)
+        with self.assertRaises(ValueError):
+            get_game_layout(game)
+
+    # Test that replay_game checks the player's moves against the layout rebuilt from the seed
+    @patch("gameplay.utils.is_sudoku_solvable", return_value=True)
+    def test_replay_game_command(self, mock_solver):
+        game = create_game_for_player(self.user, seed=7)
+        layout = get_game_layout(game)
+        hidden = min(layout.hidden_cells)
+        Cell.objects.create(game=game, index=hidden, selected_item_id=layout.block_items[str(hidden // 27 * 3 + hidden % 9 // 3)][1])
+        out = StringIO()
+        call_command("replay_game", str(game.id), stdout=out)
+        self.assertIn("moves fit the layout", out.getvalue())
+
+        prefilled = min(set(range(81)) - layout.hidden_cells)
+        Cell.objects.create(game=game, index=prefilled, selected_item_id=Item.objects.first().id)
+        with self.assertRaises(CommandError):
+            call_command("replay_game", str(game.id), stdout=StringIO())
@@ -1,12 +1,23 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
-from gameplay.utils import create_game_for_player
+from unittest.mock import patch
+from gameplay.utils import GameCreationError, create_game_for_player, get_board, get_game_layout
 from gameplay.views import get_neighbors, load_image_map
 from django.apps import apps
 from score.models import PlayerScore
 from gameplay.models import Game, Cell, Item, Room, Intro, DifficultyTransition, SequenceFrame, Memory, PlayerStoryProgress
 
+def create_rooms():
+    """
+    Creates 9 rooms, each with 9 unique items (numbers 1–9), enough to create a game.
+    """
+    for i in range(9):
+        room = Room.objects.create(name=f"Room {i}")
+        for n in range(9):
+            Item.objects.create(name=f"Item {i}-{n}", number=n + 1, room=room, group_id=f"group_{n}")
+
+
 class StartNewGameViewTest(TestCase):
 
     def setUp(self):
@@ -15,15 +26,7 @@ class StartNewGameViewTest(TestCase):
         self.client.login(username="tester", password="test123")
 
         # Set up 9 valid rooms, each with 9 unique items (numbers 1–9 with distinct group_ids)
-        for i in range(9):
-            room = Room.objects.create(name=f"Room {i}")
-            for n in range(9):
-                Item.objects.create(
-                    name=f"Item {i}-{n}",
-                    number=n + 1,
-                    room=room,
-                    group_id=f"group_{n}"
-                )
+        create_rooms()
 
     # Test that sending a GET request with a difficulty parameter creates a new game and redirects
     def test_get_creates_new_game_and_redirects(self):
@@ -47,6 +50,12 @@ class StartNewGameViewTest(TestCase):
         game = Game.objects.first()
         self.assertEqual(game.difficulty, "easy")
 
+    # Test that a failed game creation sends the player back to the selection instead of crashing
+    @patch("gameplay.views.create_game_for_player", side_effect=GameCreationError)
+    def test_failed_creation_redirects_to_selection(self, mock_create):
+        response = self.client.get(reverse("start_new_game"))
+        self.assertRedirects(response, reverse("game_selection"))
+
 
 class GameViewTest(TestCase):
 
@@ -58,15 +67,7 @@ class GameViewTest(TestCase):
 
         # Prepare valid data to allow a game to be created:
         # 9 rooms, each with 9 unique items (numbers 1–9)
-        for i in range(9):
-            room = Room.objects.create(name=f"Room {i}")
-            for n in range(9):
-                Item.objects.create(
-                    name=f"Item {i}-{n}",
-                    number=n + 1,
-                    room=room,
-                    group_id=f"group_{n}"
-                )
+        create_rooms()
 
         # Create a valid game for the current user using real creation logic
         self.game = create_game_for_player(self.user, difficulty="easy")
@@ -109,6 +110,28 @@ class GameViewTest(TestCase):
         # Access to a foreign game should be denied → redirect to home or 404
         self.assertEqual(response.status_code, 302)
 
+    # Test that the grid shows the prefilled cells and the player's moves
+    def test_view_shows_moves(self):
+        hidden = min(get_game_layout(self.game).hidden_cells)
+        item = get_board(self.game)[hidden].correct_item
+        Cell.objects.create(game=self.game, index=hidden, selected_item=item)
+
+        response = self.client.get(reverse("game_block", args=[self.game.id, hidden // 27 * 3 + hidden % 9 // 3]))
+        cells = response.context["cells"]
+        self.assertEqual(len(cells), 81)
+        self.assertEqual(cells[hidden].selected_item, item)
+        self.assertEqual(sum(cell.prefilled for cell in cells), 36)
+        self.assertContains(response, f"placeItem({hidden}, {item.number})")
+
+    # Test that a game whose board can't be rebuilt after a catalog change is replaced by a new one
+    def test_catalog_change_restarts_game(self):
+        Item.objects.filter(name="Item 0-0").update(group_id="renamed")
+        Item.objects.first().save()  # signals invalidate the cached catalog version
+
+        response = self.client.get(reverse("game_view", args=[self.game.id]))
+        self.assertRedirects(response, reverse("start_new_game") + "?difficulty=easy", fetch_redirect_response=False)
+        self.assertFalse(Game.objects.filter(id=self.game.id).exists())
+
     # Test that anonymous users are redirected to the login page when trying to access the game view
     def test_anonymous_user_redirected_to_login(self):
         self.client.logout()
@@ -119,6 +142,55 @@ class GameViewTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn("/login", response.url)
 
+    # Test that neighbouring rooms' images are hinted via Link header and <link> tags
+    def test_neighbor_assets_are_prefetched(self):
+        url = reverse("game_view", args=[self.game.id])
+        response = self.client.get(url)
+
+        neighbor_names = [n["name"] for n in response.context["neighbors"].values()]
+        self.assertIn("rel=prefetch", response["Link"])
+        for name in neighbor_names:
+            room_image = f"/static/rooms/room-{name.split()[-1]}.png"
+            self.assertIn(f"<{room_image}>", response["Link"])
+            self.assertContains(response, f'<link rel="prefetch" href="{room_image}" as="image">')
+
+    # Test that room hints carry the srcset and sizes of the room's <picture>, so the displayed variant is prefetched
+    def test_neighbor_room_hints_match_picture_variants(self):
+        def variants(name, image_format="webp"):
+            if image_format != "webp" or not name.startswith("rooms/"):
+                return []
+            stem = name[len("rooms/"):-len(".png")]
+            return [{"width": w, "path": f"optimized/rooms/{stem}-{w}.webp"} for w in (520, 260)]
+
+        with patch("main.templatetags.static_images.get_variants", side_effect=variants):
+            response = self.client.get(reverse("game_view", args=[self.game.id]))
+
+        for name in [n["name"] for n in response.context["neighbors"].values()]:
+            slug = f"room-{name.split()[-1]}"
+            srcset = f"/static/optimized/rooms/{slug}-520.webp 520w, /static/optimized/rooms/{slug}-260.webp 260w"
+            self.assertIn(f'</static/rooms/{slug}.png>; rel=prefetch; as=image; imagesrcset="{srcset}"; imagesizes="260px"',
+                          response["Link"])
+            self.assertContains(response, f'<link rel="prefetch" href="/static/rooms/{slug}.png" as="image" '
+                                          f'imagesrcset="{srcset}" imagesizes="260px">')
+        current = f"room-{response.context['room_name'].split()[-1]}"
+        self.assertContains(response, f'<source type="image/webp" srcset="/static/optimized/rooms/{current}-520.webp 520w, '
+                                      f'/static/optimized/rooms/{current}-260.webp 260w" sizes="260px">')
+
+    # Test that assets already hinted in this game are not sent again
+    def test_prefetch_hints_are_sent_once_per_game(self):
+        first = self.client.get(reverse("game_view", args=[self.game.id]))
+        again = self.client.get(reverse("game_view", args=[self.game.id]))
+        self.assertTrue(first.has_header("Link"))
+        self.assertFalse(again.has_header("Link"))
+        self.assertEqual(again.context["preload_assets"], [])
+
+        # Moving to another block only hints what was not offered before
+        moved = self.client.get(reverse("game_block", args=[self.game.id, 8]))
+        first_urls = {asset["href"] for asset in first.context["preload_assets"]}
+        self.assertTrue(moved.context["preload_assets"])
+        for asset in moved.context["preload_assets"]:
+            self.assertNotIn(asset["href"], first_urls)
+
 
 
 class PlaceItemViewTest(TestCase):
@@ -128,38 +200,46 @@ class PlaceItemViewTest(TestCase):
         self.user = User.objects.create_user(username="testuser", password="password")
         self.client.login(username="testuser", password="password")
 
-        # Create a game instance for the user
-        self.game = Game.objects.create(player=self.user, completed=False)
+        # Create a game for the user; its first hidden cell and that cell's correct item
+        create_rooms()
+        self.game = create_game_for_player(self.user, difficulty="easy", seed=1)
+        self.layout = get_game_layout(self.game)
+        self.index = min(self.layout.hidden_cells)
+        self.item = get_board(self.game)[self.index].correct_item
 
-        # Create a room and an item to be used as the correct item in a cell
-        room = Room.objects.create(name="Test Room")
-        self.item = Item.objects.create(name="Test Item", room=room, number=1)
+        # Store the URL for the place_item view
+        self.url = reverse("place_item", args=[self.game.id, self.index])
 
-        # Create a cell in the game with the correct item assigned
-        self.cell = Cell.objects.create(
-            game=self.game,
-            row=0,
-            column=0,
-            correct_item=self.item
-        )
+    def post(self, url, number):
+        return self.client.post(url, {"number": number}, content_type="application/json")
 
-        # Store the URL for the place_item view
-        self.url = reverse("place_item", args=[self.cell.id])
+    # Test that a valid item number is placed into the cell as the block's item, and placing it again removes it
+    def test_place_item_valid(self):
+        response = self.post(self.url, self.item.number)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Cell.objects.get(game=self.game, index=self.index).selected_item, self.item)
 
-    # Test that a valid item number can be placed into the cell (currently commented out)
-    # def test_place_item_valid(self):
-    #     response = self.client.post(self.url, {"number": 1})
-    #     self.assertEqual(response.status_code, 200)
-    #
-    #     # Reload cell from database and check if the correct item was set
-    #     self.cell.refresh_from_db()
-    #     self.assertEqual(self.cell.selected_item.number, 1)
+        self.post(self.url, self.item.number)
+        self.assertFalse(Cell.objects.exists())
+
+    # Test that -1 removes the item from the cell
+    def test_remove_item(self):
+        self.post(self.url, self.item.number)
+        self.post(self.url, -1)
+        self.assertFalse(Cell.objects.exists())
 
     # Test that posting an invalid item number (e.g., 999) returns a 400 Bad Request
     def test_place_item_invalid_input(self):
         response = self.client.post(self.url, {"number": 999})  # 999 assumed to not exist
         self.assertEqual(response.status_code, 400)
-        self.assertIsNone(self.cell.selected_item)
+        self.assertFalse(Cell.objects.exists())
+
+    # Test that a prefilled cell doesn't take items
+    def test_place_item_on_prefilled_cell(self):
+        prefilled = min(set(range(81)) - self.layout.hidden_cells)
+        response = self.post(reverse("place_item", args=[self.game.id, prefilled]), 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Cell.objects.exists())
 
     # Test that a user who is not authenticated cannot place an item
     def test_place_item_unauthorized(self):
@@ -395,40 +475,14 @@ class AutoFillTests(TestCase):
         self.user = User.objects.create_user(username="testuser", password="testpassword")
         self.client.force_login(self.user)
 
-        # Create a room before adding items (required by Item)
-        self.room = Room.objects.create(name="Test Room")  # 💥 Must come first!
-
-        # Create two items with distinct numbers and group IDs
-        self.item1 = Item.objects.create(name="Item 1", group_id="a", number=1, room=self.room)
-        self.item2 = Item.objects.create(name="Item 2", group_id="b", number=2, room=self.room)
-
-        # Create a new game for the user
-        self.game = Game.objects.create(player=self.user, difficulty="easy")
-
-        # Create two cells in the game with correct items assigned (but not prefilled)
-        self.cell1 = Cell.objects.create(
-            game=self.game,
-            row=0,
-            column=0,
-            prefilled=False,
-            correct_item=self.item1,
-        )
-        self.cell2 = Cell.objects.create(
-            game=self.game,
-            row=0,
-            column=1,
-            prefilled=False,
-            correct_item=self.item2,
-        )
-
-        # Editable test cell that should be autofilled
-        self.editable_cell = Cell.objects.create(
-            game=self.game,
-            row=0,
-            column=0,
-            prefilled=False,
-            correct_item=self.item1,
-        )
+        # Create a new game for the user with one wrong move
+        create_rooms()
+        self.game = create_game_for_player(self.user, difficulty="easy", seed=1)
+        cells = get_board(self.game)
+        self.hidden = [cell for cell in cells if not cell.prefilled]
+        wrong_item = next(cell.correct_item for cell in cells
+                          if cell.correct_item.number != self.hidden[0].correct_item.number)
+        Cell.objects.create(game=self.game, index=self.hidden[0].index, selected_item=wrong_item)
 
     def test_autofill_sets_correct_items(self):
         """
@@ -437,13 +491,15 @@ class AutoFillTests(TestCase):
         url = reverse("auto_fill", args=[self.game.id])
         response = self.client.get(url)
 
-        # Reload the cell to check if it has been updated
-        self.editable_cell.refresh_from_db()
-        self.assertEqual(self.editable_cell.selected_item, self.item1)
+        # Every hidden cell holds its correct item, including the one that was wrong
+        moves = dict(Cell.objects.filter(game=self.game).values_list("index", "selected_item"))
+        self.assertEqual(moves, {cell.index: cell.correct_item.id for cell in self.hidden})
+        self.assertTrue(self.game.is_completed())
 
         # Confirm that the view redirected after autofill (status code 302)
         self.assertEqual(response.status_code, 302)
 
+
 class ResetProgressTests(TestCase):
     def setUp(self):
         # Create and log in a test user
@@ -1,10 +1,15 @@
 from django.urls import path
 from .views import (start_new_game, game_view, place_item, auto_fill, reset_progress, debug_add_memory,
-                    game_selection, manual_view, story_so_far)
+                    game_selection, manual_view, story_so_far, start_daily_challenge, daily_leaderboard,
+                    game_preparing, game_creation_status)
 urlpatterns = [
     path('start/', start_new_game, name='start_new_game'),
+    path('preparing/<uuid:job_id>/', game_preparing, name='game_preparing'),
+    path('preparing/<uuid:job_id>/status/', game_creation_status, name='game_creation_status'),
+    path('daily/', start_daily_challenge, name='start_daily_challenge'),
+    path('daily/leaderboard/', daily_leaderboard, name='daily_leaderboard'),
     path('<uuid:game_id>/', game_view, name='game_view'),  # UUID instead of int
-    path('place/<int:cell_id>/', place_item, name='place_item'),
+    path('<uuid:game_id>/place/<int:cell_index>/', place_item, name='place_item'),
     path('<uuid:game_id>/block/<int:block_index>/', game_view, name='game_block'),  # URL pro block ID
     path("story/", story_so_far, name="story_so_far"),
     path("auto_fill/<uuid:game_id>/", auto_fill, name="auto_fill"),
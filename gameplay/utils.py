@@ -1,8 +1,48 @@
+import logging
 import random
+import time
+import hashlib
 from .models import Game, Cell, Item, Room, PlayerStoryProgress, Memory
-from collections import defaultdict
+from .bankfile import get_bank_file
+from .rating import GUESSING, get_rating
+from .cache import forget_active_game, layout_key, load_cached_catalog_version, store_catalog_version, LAYOUT_TIMEOUT
+from collections import defaultdict, namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from main.metrics import registry, timed
 
-def generate_sudoku():
+logger = logging.getLogger(__name__)
+
+
+# Prefilled (visible) cells per difficulty
+VISIBLE_CELLS = {'easy': 36, 'medium': 30, 'hard': 24}
+DEFAULT_VISIBLE_CELLS = 30
+
+# Ratings (gameplay.rating levels) a puzzle of each difficulty should have, unless settings.DIFFICULTY_RATINGS says otherwise
+DIFFICULTY_RATINGS = {'easy': (1, 1), 'medium': (2, 2), 'hard': (3, 8)}
+
+# Bumped whenever the same seed starts drawing different rooms or items; part of the catalog version
+LAYOUT_VERSION = 3
+
+# Everything generated for a game: the rooms and items of the blocks, drawn from the seed on the
+# item catalog, and the puzzle (board and hidden cells), stored on the game (see get_game_layout)
+GameLayout = namedtuple("GameLayout", ["board", "block_rooms", "block_items", "hidden_cells"])
+
+
+class GameCreationError(Exception):
+    """
+    Raised when no solvable game could be generated within the attempt count and time budget.
+    """
+
+
+class UnsolvableBoardError(Exception):
+    """
+    Raised inside a creation attempt to roll back a board that failed the solvability check.
+    """
+
+def generate_sudoku(rng=random):
     """
     Generates a fully valid, randomized 9x9 Sudoku board as a nested list.
 
@@ -10,6 +50,9 @@ def generate_sudoku():
     then it applies randomized shuffling of rows, columns, and digits to create variability
     while maintaining the structure.
 
+    Args:
+        rng (random.Random): Source of randomness; a seeded instance makes the board reproducible.
+
     Returns:
         A 9x9 list of integers (1–9) representing a completed Sudoku board.
     """
@@ -30,7 +73,7 @@ def generate_sudoku():
         Shuffles a sequence randomly and returns a new shuffled list.
         Used for randomizing rows, columns, and digits.
         """
-        return random.sample(s, len(s))
+        return rng.sample(s, len(s))
 
     # Randomly shuffle the groups and their internal order (rows and columns by block)
     rows = [g * base + r for g in shuffle(range(base)) for r in shuffle(range(base))]
@@ -156,59 +199,173 @@ def build_number_to_item_mapping(selected_group_ids, group_map):
     return number_to_item
 
 
-def create_game_for_player(player, difficulty='easy'):
+def create_game_for_player(player, difficulty='easy', attempts=None, time_budget=None, seed=None, reserved=False,
+                           retry_rating=True):
     """
     Creates a new Sudoku-based item game for the given player.
 
-    - Generates a valid Sudoku number grid (1–9).
-    - Selects 9 valid rooms, each representing a Sudoku block with unique item groups.
-    - Creates a Game object and assigns room-to-block mappings.
-    - Converts the numeric Sudoku into an item-based board using the selected rooms.
-    - Fills the game with Cell objects based on the logic and saves the setup.
+    Generation is retried when the board fails the solvability check or (with `retry_rating`)
+    its puzzle's rating misses the difficulty's band. Every attempt writes in its own
+    transaction, so a failed attempt leaves no Game or Cell rows behind. Retries stop after
+    `attempts` tries or once `time_budget` seconds have passed (settings.GAME_CREATION_ATTEMPTS /
+    GAME_CREATION_TIME_BUDGET); the last attempt is the last resort that accepts the puzzle
+    closest to the band. Attempts per game, retries and failures are reported on /metrics.
+
+    Digging another board for the band costs about as much as the first one, so requests
+    pass retry_rating=False and take the closest puzzle of their first board; the background
+    prefetch and the worker pool keep retrying.
+
+    Every attempt draws from its own seed, stored on the game (see generate_layout).
+    Without a seed each attempt gets a fresh random one; with a seed the attempts use
+    seed, seed + 1, ..., so the same seed always yields the same game.
 
     Args:
         player (User): The player for whom the game is being created.
         difficulty (str): Game difficulty ('easy', 'medium', 'hard').
+        attempts (int): Maximum number of generation attempts.
+        time_budget (float): Seconds after which no new attempt is started.
+        seed (int): Seed of the first attempt (random when omitted).
+        reserved (bool): Create the game in the reserved state (background pre-generation).
+        retry_rating (bool): Retry puzzles rated outside the difficulty's band with the next seed.
 
     Returns:
-        Game: A fully initialized and solvable Game object, or None if unsolvable.
+        Game: A fully initialized and solvable Game object.
+
+    Raises:
+        GameCreationError: If no attempt produced a solvable game.
     """
-    # Generate a full valid Sudoku grid with numbers 1–9
-    board = generate_sudoku()
+    attempts = attempts or getattr(settings, "GAME_CREATION_ATTEMPTS", 5)
+    time_budget = time_budget if time_budget is not None else getattr(settings, "GAME_CREATION_TIME_BUDGET", 2.0)
+    start = time.perf_counter()
+
+    for attempt in range(1, attempts + 1):
+        attempt_seed = new_seed() if seed is None else seed + attempt - 1
+        last_resort = attempt == attempts or time.perf_counter() - start >= time_budget
+        try:
+            game = build_game(player, difficulty, attempt_seed, reserved,
+                              last_resort=last_resort or not retry_rating)
+        except UnsolvableBoardError:
+            # The rows are gone, but the post_save signal already cached the game as active
+            if not reserved:
+                forget_active_game(player.pk)
+            registry.inc("game_creation_retries_total", difficulty=difficulty,
+                         help_text="Game creation attempts rolled back and retried")
+            if last_resort:
+                break
+            continue
 
-    # Select 9 valid Room objects to represent each Sudoku block
-    # Each room must contain 9 unique items with distinct group_ids
-    selected_rooms = select_valid_rooms()
+        registry.observe("game_creation_attempts", attempt, buckets=(1, 2, 3, 5, 10), difficulty=difficulty,
+                         help_text="Attempts needed to create a solvable game")
+        return game
 
+    registry.inc("game_creation_failures_total", difficulty=difficulty,
+                 help_text="Game creations that ran out of attempts or time")
+    logger.error("No solvable %s game after %d attempts (%.2f s)", difficulty, attempt, time.perf_counter() - start)
+    raise GameCreationError(f"Could not create a solvable {difficulty} game in {attempt} attempts.")
 
-    # Create a new Game instance with the selected rooms and difficulty
-    game = Game.objects.create(
-        player=player,
-        difficulty=difficulty,
-        block_rooms=[room.id for room in selected_rooms], # maps blocks 0–8 to Room IDs
-        block_items={} # will be filled next
-    )
 
+def build_game(player, difficulty='easy', seed=None, reserved=False, last_resort=False):
+    """
+    One game creation attempt.
+
+    All random choices are drawn from random.Random(seed) in the order of generate_layout.
+    The rooms and items come first, so the seed and catalog version are enough to draw them
+    again; the puzzle is stored on the game (see get_game_layout).
+
+    - Selects 9 valid rooms, each representing a Sudoku block with unique item groups.
+    - Generates a valid Sudoku number grid (1–9) and digs the puzzle out of it.
+    - Creates a Game object with the seed and the puzzle (no cells: moves are added as they are made).
+    - Times every stage and counts solvability results (game_creation_* metrics on /metrics).
+
+    With a bank file (settings.PUZZLE_BANK_FILE) the board and hidden cells are a
+    puzzle picked from the bank, which needs no solvability check. Otherwise the
+    hidden cells are dug out of the board until the difficulty's rating band is hit
+    (see choose_hidden_cells); a puzzle outside the band fails the attempt, unless it
+    is the `last_resort` and the closest puzzle is taken.
+
+    The board is generated outside of any transaction, so the write lock is only held for
+    the insert and the solvability check, whose transaction is rolled back by the
+    UnsolvableBoardError raised for an unsolvable board.
+
+    Returns:
+        Game: The created, solvable game.
+
+    Raises:
+        UnsolvableBoardError: If the resulting board is not solvable or (unless `last_resort`)
+            its rating is outside the difficulty's band.
+    """
+    start = time.perf_counter()
+    seed = new_seed() if seed is None else seed
+    rng = random.Random(seed)
+
+    # Select 9 valid Room objects to represent each Sudoku block
+    # Each room must contain 9 unique items with distinct group_ids
+    with stage_timer("select_valid_rooms"):
+        selected_rooms = select_valid_rooms(rng)
 
     # Create a mapping of block index → 9 items from corresponding room
-    block_items = {
-        str(index): build_block_items(room)
-        for index, room in enumerate(selected_rooms)
-    }
+    with stage_timer("build_block_items"):
+        block_items = {
+            str(index): build_block_items(room, rng)
+            for index, room in enumerate(selected_rooms)
+        }
+
+    # Generate a full valid Sudoku grid with numbers 1–9 (or pick a puzzle from the bank file)
+    with stage_timer("generate_sudoku"):
+        board, hidden_cells = pick_board(difficulty, rng)
+    from_bank = hidden_cells is not None
+
+    # Choose the hidden cells: a puzzle with one solution, rated for the difficulty
+    in_band = True
+    if hidden_cells is None:
+        with stage_timer("rate_puzzle"):
+            hidden_cells, in_band = choose_hidden_cells(board, difficulty, rng)
+
+    # A puzzle outside the rating band is retried with the next seed (checked before any row is written)
+    if not in_band and not last_resort:
+        registry.inc("game_creation_total", result="out_of_band", difficulty=difficulty,
+                     help_text="Games generated, by solvability check result")
+        raise UnsolvableBoardError(f"Generated {difficulty} puzzle is rated outside the difficulty's band.")
+
+    # Create a new Game instance with its seed and puzzle; the blocks are cached for the first page view
+    layout = GameLayout(board, [room.id for room in selected_rooms], block_items, hidden_cells)
+    givens, solution = encode_puzzle(layout)
+    with transaction.atomic():
+        with stage_timer("game_insert"):
+            game = Game.objects.create(
+                player=player,
+                difficulty=difficulty,
+                seed=seed,
+                catalog_version=get_catalog_version(),
+                givens=givens,
+                solution=solution,
+                reserved=reserved,
+            )
+        cache.set(layout_key(seed, game.catalog_version), (layout.block_rooms, block_items), LAYOUT_TIMEOUT)
 
-    # Assign the item mapping to the game and save it
-    game.block_items = block_items
-    game.save()
+        # Keep the game only if the resulting board is solvable (bank puzzles were checked when the bank was built)
+        with stage_timer("is_sudoku_solvable"):
+            solvable = from_bank or is_sudoku_solvable(game)
 
-    # Fill the board with Cell objects based on the Sudoku structure and item mapping
-    fill_cells(game, board, block_items, difficulty)
-    # Return the game only if the resulting board is solvable
-    if is_sudoku_solvable(game):
-        return game
+        result = "solvable" if solvable else "unsolvable"
+        registry.inc("game_creation_total", result=result, difficulty=difficulty,
+                     help_text="Games generated, by solvability check result")
+        registry.observe("game_creation_seconds", time.perf_counter() - start, difficulty=difficulty,
+                         help_text="Time of one create_game_for_player attempt")
+        if not solvable:
+            raise UnsolvableBoardError(f"Generated {difficulty} board is not solvable.")
+    return game
 
 
+def stage_timer(stage):
+    """
+    Times one stage of create_game_for_player into the game_creation_stage_seconds histogram (/metrics).
+    """
+    return timed("game_creation_stage_seconds", stage=stage,
+                 help_text="Time per create_game_for_player stage")
+
 
-def select_valid_rooms():
+def select_valid_rooms(rng=random):
     """
     Selects 9 rooms from the database to be used as Sudoku blocks.
 
@@ -216,6 +373,10 @@ def select_valid_rooms():
     and all items must have unique group_ids (no repetition of meaning).
 
     The rooms are shuffled before selection to ensure randomness in gameplay.
+    Rooms and items are loaded in id order, so a seeded rng always picks the same rooms.
+
+    Args:
+        rng (random.Random): Source of randomness.
 
     Returns:
         list[Room]: A list of 9 Room objects with valid unique group_id items.
@@ -224,10 +385,10 @@ def select_valid_rooms():
         ValueError: If fewer than 9 valid rooms are found.
     """
     # Load all rooms from the database and prefetch related items for efficiency
-    rooms = list(Room.objects.prefetch_related('items').all())
+    rooms = list(Room.objects.prefetch_related(Prefetch('items', queryset=Item.objects.order_by('id'))).order_by('id'))
 
     # Shuffle rooms to ensure random selection
-    random.shuffle(rooms)
+    rng.shuffle(rooms)
 
     selected = []
     # Iterate through shuffled rooms
@@ -246,7 +407,7 @@ def select_valid_rooms():
     raise ValueError("Cannot find 9 rooms with 9 unique group_ids.")
 
 
-def build_block_items(room):
+def build_block_items(room, rng=random):
     """
     Builds a mapping from numbers 1–9 to item IDs from a given room.
 
@@ -257,6 +418,7 @@ def build_block_items(room):
 
     Args:
         room (Room): The Room object containing items to choose from.
+        rng (random.Random): Source of randomness.
 
     Returns:
         dict[int, int]: A mapping {1: item_id, 2: item_id, ..., 9: item_id}
@@ -283,7 +445,7 @@ def build_block_items(room):
 
     # Convert the group mapping to a list and shuffle it to randomize selection
     group_list = list(group_map.items())
-    random.shuffle(group_list)
+    rng.shuffle(group_list)
 
     # Try to assign each number 1–9 to an item from a unique group
     for number in range(1, 10):
@@ -309,61 +471,287 @@ def build_block_items(room):
     return number_to_item
 
 
-def fill_cells(game, board, block_items, difficulty='easy'):
+def pick_board(difficulty='easy', rng=random):
+    """
+    Returns the solution board of a new game and its hidden cells.
+
+    With a bank file holding puzzles of this difficulty, a random record is read from it
+    (one draw from rng, O(1)); otherwise a board is generated and the hidden cells are
+    left to pick_hidden_cells (None).
+
+    Returns:
+        tuple[list[list[int]], set[int] | None]: The 9x9 board and the hidden cell indexes.
     """
-    Creates 81 Cell objects for the given Game based on a Sudoku board and block-item mapping.
+    bank = get_bank_file()
+    if bank is not None and bank.count(difficulty):
+        registry.inc("game_creation_boards_total", source="bank", difficulty=difficulty,
+                     help_text="Game boards read from the puzzle bank file or generated")
+        return bank.read(difficulty, rng.randrange(bank.count(difficulty)))
 
-    Depending on the difficulty, a number of cells will be prefilled (visible to the player).
-    The rest will be hidden and must be discovered during gameplay.
+    registry.inc("game_creation_boards_total", source="generated", difficulty=difficulty,
+                 help_text="Game boards read from the puzzle bank file or generated")
+    return generate_sudoku(rng), None
 
-    Each cell is assigned:
-    - its position (row, column),
-    - the correct item (based on the number),
-    - and optionally a prefilled item (if visible from the start).
 
-    Args:
-        game (Game): The Game instance to associate the cells with.
-        board (list[list[int]]): A 9x9 grid of numbers 1–9 representing the solution.
-        block_items (dict[str, dict[int, int]]): Mapping of block index to {number → item_id}.
-        difficulty (str): Difficulty level ('easy', 'medium', 'hard').
-    """
-    # Set how many cells will be visible at the start, based on difficulty
-    if difficulty == 'easy':
-        visible_count = 36
-    elif difficulty == 'medium':
-        visible_count = 30
-    elif difficulty == 'hard':
-        visible_count = 24
-    else:
-        visible_count = 30  # default fallback
+def get_rating_settings():
+    """
+    Returns ({difficulty: (lowest, highest) rating}, rating attempts per board) from settings.
+    """
+    return (
+        getattr(settings, "DIFFICULTY_RATINGS", DIFFICULTY_RATINGS),
+        getattr(settings, "RATING_ATTEMPTS", 10),
+    )
 
-    # Randomly choose which of the 81 cells will be hidden
-    hidden_cells = set(random.sample(range(81), 81 - visible_count))
 
-    # Create Cell objects for each position in the grid
-    for r in range(9):
-        for c in range(9):
-            number = board[r][c]
-
-            # Determine which 3x3 block the cell belongs to
-            grid_index = (r // 3) * 3 + (c // 3)
-
-            # Get the correct item ID for this number in this block
-            item_id = block_items[str(grid_index)][number]
-            item = Item.objects.get(id=item_id)
-
-            # Determine if the cell should be prefilled (visible at start)
-            is_prefilled = (r * 9 + c) not in hidden_cells
-
-            # Create and save the cell in the database
-            Cell.objects.create(
-                game=game,
-                row=r,
-                column=c,
-                correct_item=item,
-                selected_item=item if is_prefilled else None,
-                prefilled=is_prefilled
-            )
+def dig_puzzle(board, visible, rng=random):
+    """
+    Empties cells of a solved board in a random order, keeping a cell emptied only while
+    the puzzle still has exactly one solution, until `visible` cells are left.
+
+    Returns:
+        set[int] | None: The hidden cell indexes, or None if the board ran out of
+        removable cells first.
+    """
+    grid = [row[:] for row in board]
+    hidden = set()
+    for index in rng.sample(range(81), 81):
+        if 81 - len(hidden) == visible:
+            break
+        r, c = divmod(index, 9)
+        grid[r][c] = 0
+        if count_solutions(grid) == 1:
+            hidden.add(index)
+        else:
+            grid[r][c] = board[r][c]
+    return hidden if 81 - len(hidden) == visible else None
+
+
+def dig_rated_puzzle(board, difficulty='easy', rng=random):
+    """
+    Digs puzzles out of the board (dig_puzzle) until one is rated within the difficulty's
+    band (settings.DIFFICULTY_RATINGS), at most settings.RATING_ATTEMPTS times.
+
+    Ratings are cached by puzzle (gameplay.rating.get_rating), so rebuilding a layout
+    from its seed rates nothing again.
+
+    Returns:
+        tuple[set[int], int] | None: Hidden cells and rating of the first puzzle in the band,
+        else of the one closest to it; None if no attempt produced a puzzle.
+    """
+    bands, attempts = get_rating_settings()
+    low, high = bands.get(difficulty, (1, GUESSING))
+    visible = VISIBLE_CELLS.get(difficulty, DEFAULT_VISIBLE_CELLS)
+
+    best = None
+    for attempt in range(1, attempts + 1):
+        hidden = dig_puzzle(board, visible, rng)
+        if hidden is None:
+            continue
+        givens = "".join("0" if r * 9 + c in hidden else str(board[r][c]) for r in range(9) for c in range(9))
+        rating = get_rating(givens)
+        distance = max(low - rating, rating - high, 0)
+        if best is None or distance < best[0]:
+            best = (distance, hidden, rating)
+        if not distance:
+            break
+
+    registry.observe("puzzle_rating_attempts", attempt, buckets=(1, 2, 3, 5, 10, 20), difficulty=difficulty,
+                     help_text="Puzzles dug and rated per board")
+    result = "none" if best is None else "in_band" if not best[0] else "closest"
+    registry.inc("puzzle_rating_total", result=result, difficulty=difficulty,
+                 help_text="Rated puzzle searches by outcome: in the difficulty's band, closest to it, or no puzzle")
+    return None if best is None else best[1:]
+
+
+def choose_hidden_cells(board, difficulty='easy', rng=random):
+    """
+    Hidden cells of a new game: a rated puzzle from dig_rated_puzzle, or random cells
+    (pick_hidden_cells) if digging found none.
+
+    Returns:
+        tuple[set[int], bool]: The hidden cell indexes and whether the puzzle is rated within the band.
+    """
+    rated = dig_rated_puzzle(board, difficulty, rng)
+    if rated is None:
+        return pick_hidden_cells(difficulty, rng), False
+    hidden, rating = rated
+    return hidden, in_rating_band(rating, difficulty)
+
+
+def in_rating_band(rating, difficulty='easy'):
+    """
+    True if a puzzle rating lies within the difficulty's band (settings.DIFFICULTY_RATINGS).
+    """
+    low, high = get_rating_settings()[0].get(difficulty, (1, GUESSING))
+    return low <= rating <= high
+
+
+def pick_hidden_cells(difficulty='easy', rng=random):
+    """
+    Chooses which cells (index row * 9 + column) start hidden; the number of visible cells depends on the difficulty.
+    """
+    visible_count = VISIBLE_CELLS.get(difficulty, DEFAULT_VISIBLE_CELLS)
+    return set(rng.sample(range(81), 81 - visible_count))
+
+
+def new_seed():
+    """
+    Returns a fresh seed for a game (fits the signed 64-bit Game.seed column).
+    """
+    return random.SystemRandom().getrandbits(63)
+
+
+def get_catalog_version():
+    """
+    Returns a short hash of the rooms (ids, in the order select_valid_rooms shuffles them) and
+    items a layout is built from.
+
+    A seed only draws the same blocks on the same catalog; the version is stored on every game.
+    Cached until an Item or Room changes (see signals). LAYOUT_VERSION, the version of the
+    generator itself, is part of it too. The puzzle is stored on the game, so a new bank file
+    or rating settings only change new games.
+    """
+    version = load_cached_catalog_version()
+    if version is None:
+        # select_valid_rooms shuffles every room, including rooms without items
+        room_ids = list(Room.objects.order_by('id').values_list('id', flat=True))
+        rows = Item.objects.order_by('id').values_list('id', 'room_id', 'number', 'group_id')
+        version = hashlib.sha256(repr((room_ids, list(rows))).encode()).hexdigest()[:12]
+        store_catalog_version(version)
+    return hashlib.sha256(f"{version}:{LAYOUT_VERSION}".encode()).hexdigest()[:12]
+
+
+def generate_blocks(rng=random):
+    """
+    Draws the rooms of the 9 blocks and their items, the first draws of every seed.
+
+    Returns:
+        tuple[list[int], dict]: block_rooms (room IDs) and block_items ({block: {number: item ID}}).
+    """
+    rooms = select_valid_rooms(rng)
+    return [room.id for room in rooms], {str(index): build_block_items(room, rng) for index, room in enumerate(rooms)}
+
+
+def generate_layout(seed, difficulty='easy'):
+    """
+    Generates everything build_game generates from a seed, without writing to the database.
+
+    Draws from random.Random(seed) in the same order as build_game: rooms, block items,
+    board, hidden cells (unless the board came from the bank file).
+
+    Returns:
+        tuple[GameLayout, bool]: The layout and whether its puzzle is rated within the difficulty's band.
+    """
+    rng = random.Random(seed)
+    block_rooms, block_items = generate_blocks(rng)
+    board, hidden_cells = pick_board(difficulty, rng)
+    in_band = True
+    if hidden_cells is None:
+        hidden_cells, in_band = choose_hidden_cells(board, difficulty, rng)
+    return GameLayout(board, block_rooms, block_items, hidden_cells), in_band
+
+
+def encode_puzzle(layout):
+    """
+    Returns the (givens, solution) of a layout as the 81-digit strings stored on Game and
+    DailyChallenge (0 = hidden cell in givens).
+    """
+    solution = "".join(str(number) for row in layout.board for number in row)
+    givens = "".join("0" if index in layout.hidden_cells else digit for index, digit in enumerate(solution))
+    return givens, solution
+
+
+def decode_puzzle(givens, solution):
+    """
+    Returns the 9x9 board and the hidden cell indexes of a stored puzzle (see encode_puzzle).
+    """
+    board = [[int(digit) for digit in solution[r * 9:r * 9 + 9]] for r in range(9)]
+    return board, {index for index, digit in enumerate(givens) if digit == "0"}
+
+
+def get_game_layout(game):
+    """
+    Returns the layout of a game: its stored puzzle and the blocks drawn from its seed (cached).
+
+    Works for any game or daily challenge (both store seed, catalog_version, givens and solution).
+
+    Raises:
+        ValueError: If the game has no seed or puzzle, or the rooms or items changed since it was created.
+    """
+    if game.seed is None or not game.solution:
+        raise ValueError(f"Game {game.pk} has no seed or puzzle.")
+    block_rooms, block_items = load_blocks(game.seed, game.catalog_version)
+    board, hidden_cells = decode_puzzle(game.givens, game.solution)
+    return GameLayout(board, block_rooms, block_items, hidden_cells)
+
+
+class BoardCell(namedtuple("BoardCell", ["index", "row", "column", "correct_item", "selected_item", "prefilled"])):
+    """
+    One of the 81 cells as the player sees it: the layout's correct item and the player's move
+    (the correct item itself for a prefilled cell).
+    """
+    __slots__ = ()
+
+    def is_correct(self):
+        """
+        Will return true if the user selected the correct item
+        """
+        return self.selected_item is not None and self.selected_item.number == self.correct_item.number
+
+
+def get_board(game, layout=None):
+    """
+    Returns the 81 cells of a game in row order, built from its layout and the player's moves.
+
+    Two queries: the moves and the items of the board. Moves on prefilled cells are ignored.
+
+    Raises:
+        ValueError: If the layout can't be rebuilt (see get_game_layout).
+    """
+    layout = layout or get_game_layout(game)
+    moves = dict(Cell.objects.filter(game=game).values_list("index", "selected_item_id"))
+    items = Item.objects.in_bulk({
+        item_id for mapping in layout.block_items.values() for item_id in mapping.values()
+    } | set(moves.values()))
+
+    cells = []
+    for index in range(81):
+        r, c = divmod(index, 9)
+        # The correct item is the item of the cell's number in the cell's 3x3 block
+        correct_item = items[layout.block_items[str((r // 3) * 3 + c // 3)][layout.board[r][c]]]
+        prefilled = index not in layout.hidden_cells
+        selected_item = correct_item if prefilled else items.get(moves.get(index))
+        cells.append(BoardCell(index, r, c, correct_item, selected_item, prefilled))
+    return cells
+
+
+def load_blocks(seed, catalog_version):
+    """
+    Returns generate_blocks for a seed from the cache, drawing the blocks again on a miss
+    (two queries, no board generation or digging).
+
+    Raises:
+        ValueError: If the seed belongs to a different catalog than the current one.
+    """
+    if catalog_version != get_catalog_version():
+        raise ValueError(f"Seed {seed} was generated from catalog {catalog_version}, "
+                         f"the current catalog is {get_catalog_version()}.")
+
+    key = layout_key(seed, catalog_version)
+    blocks = cache.get(key)
+    if blocks is None:
+        blocks = generate_blocks(random.Random(seed))
+        cache.set(key, blocks, LAYOUT_TIMEOUT)
+    return blocks
+
+
+def layout_is_solvable(layout):
+    """
+    The solvability check of is_sudoku_solvable, applied to a layout instead of stored cells.
+    """
+    grid = [[0 if r * 9 + c in layout.hidden_cells else layout.board[r][c] for c in range(9)] for r in range(9)]
+    return count_solutions(grid, limit=1) > 0
+
 
 # DEBUG ONLY – not used in production.
 # def print_sudoku_grid(game_id):
@@ -446,12 +834,87 @@ def has_solution(grid):
     return solve()
 
 
+def count_solutions(grid, limit=2):
+    """
+    Counts the solutions of a Sudoku grid, stopping as soon as `limit` are found.
+
+    count_solutions(grid) == 1 means the puzzle has exactly one solution. The used digits
+    of every row, column and block are kept as bitmasks and the search always branches on
+    the empty cell with the fewest candidates, so a uniqueness check stays in the
+    millisecond range where has_solution can take seconds.
+
+    Args:
+        grid (list[list[int]]): A 9x9 Sudoku grid, where empty cells are 0 (not modified).
+        limit (int): Stop counting at this many solutions.
+
+    Returns:
+        int: Number of solutions found, at most `limit` (0 for contradictory givens).
+    """
+    rows, cols, blocks = [0] * 9, [0] * 9, [0] * 9
+    empty = []
+    for r in range(9):
+        for c in range(9):
+            b = (r // 3) * 3 + c // 3
+            number = grid[r][c]
+            if not number:
+                empty.append((r, c, b))
+                continue
+            bit = 1 << number
+            if (rows[r] | cols[c] | blocks[b]) & bit:
+                return 0  # The givens already repeat a digit
+            rows[r] |= bit
+            cols[c] |= bit
+            blocks[b] |= bit
+
+    found = 0
+
+    def search():
+        nonlocal found
+        if not empty:
+            found += 1
+            return found >= limit
+
+        # Branch on the most constrained cell (bits 1–9 are the digits still possible)
+        best, best_mask, best_count = 0, 0, 10
+        for i, (r, c, b) in enumerate(empty):
+            mask = ~(rows[r] | cols[c] | blocks[b]) & 0x3FE
+            count = bin(mask).count("1")
+            if count < best_count:
+                best, best_mask, best_count = i, mask, count
+                if count <= 1:
+                    break
+        if not best_count:
+            return False
+
+        cell = empty[best]
+        empty[best] = empty[-1]
+        empty.pop()
+        r, c, b = cell
+        done = False
+        while best_mask and not done:
+            bit = best_mask & -best_mask
+            best_mask ^= bit
+            rows[r] |= bit
+            cols[c] |= bit
+            blocks[b] |= bit
+            done = search()
+            rows[r] ^= bit
+            cols[c] ^= bit
+            blocks[b] ^= bit
+        empty.append(cell)
+        empty[best], empty[-1] = empty[-1], empty[best]
+        return done
+
+    search()
+    return found
+
+
 def is_sudoku_solvable(game):
     """
     Checks whether the current state of the game board is solvable.
 
-    Builds a numeric grid from the player's selected items (ignoring empty cells),
-    then uses a backtracking Sudoku solver to verify that at least one valid solution exists.
+    Builds a numeric grid from the layout's prefilled cells and the player's moves (ignoring empty cells),
+    then uses a backtracking Sudoku solver (count_solutions) to verify that at least one valid solution exists.
 
     Args:
         game (Game): The game instance to check.
@@ -459,19 +922,18 @@ def is_sudoku_solvable(game):
     Returns:
         bool: True if the Sudoku is solvable, False otherwise.
     """
-    # Load all Cell objects for the given game
-    cells = Cell.objects.filter(game=game)
+    layout = get_game_layout(game)
 
-    # Create a blank 9x9 grid (filled with 0 = empty)
-    grid = [[0 for _ in range(9)] for _ in range(9)]
+    # Create a 9x9 grid from the prefilled cells (0 = empty)
+    grid = [[0 if r * 9 + c in layout.hidden_cells else layout.board[r][c] for c in range(9)] for r in range(9)]
 
-    # Fill in the grid with numbers from the player's selected items
-    for cell in cells:
-        if cell.selected_item:
-            grid[cell.row][cell.column] = cell.selected_item.number
+    # Fill in the grid with numbers from the player's moves
+    for index, number in Cell.objects.filter(game=game).values_list("index", "selected_item__number"):
+        if index in layout.hidden_cells:
+            grid[index // 9][index % 9] = number
 
-    # Use the backtracking solver to check if the grid has a valid solution
-    return has_solution(grid)
+    # Use the bitmask solver to check if the grid has a valid solution
+    return count_solutions(grid, limit=1) > 0
 
 def try_unlock_memory(game):
     """
@@ -551,28 +1013,23 @@ def get_sequence_for_trigger(trigger, player, memory=None):
     Returns:
         str | None: The name of the sequence to play, or None if no sequence should be triggered.
     """
-    from gameplay.models import PlayerStoryProgress
+    from gameplay.cache import load_progress_summary
 
-    # Get or create progress object for the player
-    progress, _ = PlayerStoryProgress.objects.get_or_create(player=player)
+    # Load the player's (cached) progress summary
+    progress = load_progress_summary(player.pk)
 
     # Handle the 'start' trigger → play intro only if player has no memories at all
     if trigger == "start":
-        total = (
-            len(progress.unlocked_easy)
-            + len(progress.unlocked_medium)
-            + len(progress.unlocked_hard)
-        )
-        if total == 0:
+        if not progress.has_any:
             return "intro"
 
     # Handle the 'complete' trigger → after player finishes a game
     if trigger == "complete":
-        if len(progress.unlocked_easy) == 20:
+        if progress.count("easy") == 20:
             return "easy_end"
-        if len(progress.unlocked_medium) == 20:
+        if progress.count("medium") == 20:
             return "medium_end"
-        if len(progress.unlocked_hard) == 20:
+        if progress.count("hard") == 20:
             return "hard_end"
         # If memory was just unlocked, play its sequence
         if memory:
@@ -1,11 +1,21 @@
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from .utils import create_game_for_player, get_sequence_for_trigger, try_unlock_memory
-from .models import Game, Cell, Item, Room, Intro, Memory, DifficultyTransition, SequenceFrame, PlayerStoryProgress
-from django.http import JsonResponse
+from .utils import (GameCreationError, create_game_for_player, get_board, get_game_layout, get_sequence_for_trigger,
+                    try_unlock_memory)
+from .preload import get_neighbor_assets, link_header, select_new_assets
+from .prefetch import claim_reserved_game, predict_difficulty, schedule_prefetch
+from .jobs import PENDING, READY, enqueue_game_creation, get_job, get_job_settings, is_async, supersede_jobs
+from .daily import (daily_time, find_daily_challenge, get_daily_leaderboard, get_player_rank, record_daily_result,
+                    start_daily_game)
+from .cache import get_active_game, load_progress_summary, reset_progress_summary, forget_progress_summary
+from .models import Game, Cell, Room, Intro, Memory, DifficultyTransition, SequenceFrame, PlayerStoryProgress
+from django.http import Http404, JsonResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from django.core.exceptions import ObjectDoesNotExist
 from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+from main.db import call_with_retry
 import json
 
 @login_required
@@ -13,15 +23,22 @@ def start_new_game(request):
     """
     Will remove all existing games and create new one with unique UUID.
     Now also supports difficulty from GET param (?difficulty=medium)
+
+    A game pre-generated in the background (see gameplay.prefetch) is claimed instead
+    of generating one when it matches the difficulty. Otherwise the difficulties in
+    settings.ASYNC_GAME_CREATION are generated on a worker pool (see gameplay.jobs):
+    the player gets the "preparing" page, or a 202 with the status URL for JSON clients.
     """
-    # Remove all unfinished games for this player
-    existing_games = Game.objects.filter(player=request.user, completed=False)
+    # Remove all unfinished games for this player (a reserved game is kept for the claim below);
+    # a creation job still running for an earlier start must not replace this game
+    supersede_jobs(request.user.pk)
+    existing_games = Game.objects.filter(player=request.user, completed=False, reserved=False)
     if existing_games.exists():
         existing_games.delete()
 
     # Check if this is the player's very first game
-    progress, _ = PlayerStoryProgress.objects.get_or_create(player=request.user)
-    if not progress.unlocked_easy and not progress.unlocked_medium and not progress.unlocked_hard:
+    progress = load_progress_summary(request.user.pk)
+    if not progress.has_any:
         request.session["play_intro"] = True
 
     # Read difficulty from query parameter (?difficulty=easy / medium / hard)
@@ -30,12 +47,110 @@ def start_new_game(request):
         difficulty = "easy"  # fallback
 
     # Create a new Game instance for the player using the selected difficulty
-    game = create_game_for_player(request.user, difficulty=difficulty)
+    # (retried within the configured attempt and time budget; an out-of-band rating is not retried in the request)
+    game = claim_reserved_game(request.user, difficulty)
+    if game is None and is_async(difficulty):
+        job_id = enqueue_game_creation(request.user.pk, difficulty)
+        if request.accepts("application/json") and not request.accepts("text/html"):
+            return JsonResponse({"job_id": job_id, "status_url": reverse('game_creation_status', args=[job_id])},
+                                status=202)
+        return redirect('game_preparing', job_id=job_id)
+    if game is None:
+        try:
+            game = create_game_for_player(request.user, difficulty=difficulty, retry_rating=False)
+        except GameCreationError:
+            return redirect('game_selection')
 
     # Redirect player to the game page (uses UUID for safety)
     return redirect('game_view', game_id=game.id)  # ✅ UUID instead of simple number ID
 
 
+@login_required
+def game_preparing(request, job_id):
+    """
+    Lightweight page shown while the player's game is generated on the worker pool;
+    its script polls game_creation_status every GAME_CREATION_POLL_INTERVAL seconds
+    and follows the returned redirect.
+    """
+    job = get_job(job_id, request.user.pk)
+    if job is None:
+        return redirect('game_selection')
+    if job.status == READY:
+        return redirect('game_view', game_id=job.game_id)
+
+    return render(request, "gameplay/preparing.html", {
+        "difficulty": job.difficulty,
+        "status_url": reverse('game_creation_status', args=[job_id]),
+        "poll_interval_ms": int(get_job_settings()[2] * 1000),
+    })
+
+
+@login_required
+def game_creation_status(request, job_id):
+    """
+    JSON state of a game creation job ({"status": pending / ready / failed / superseded, "redirect_url"}).
+
+    Answers right away (one query), so a poll never ties up a request thread; the client retries
+    while the job is pending.
+    """
+    job = get_job(job_id, request.user.pk)
+    if job is None:
+        raise Http404("Unknown game creation job")
+
+    data = {"status": job.status}
+    if job.status == READY:
+        data["redirect_url"] = reverse('game_view', args=[job.game_id])
+    elif job.status != PENDING:
+        data["redirect_url"] = reverse('game_selection')
+    return JsonResponse(data)
+
+
+@login_required
+def start_daily_challenge(request):
+    """
+    Starts today's daily challenge (?difficulty=easy / medium / hard).
+
+    Every player gets the same puzzle; it is generated once per day, so starting
+    a challenge game only copies the shared layout into the player's cells.
+    """
+    # Like start_new_game, a new game replaces the unfinished one and any pending creation job
+    supersede_jobs(request.user.pk)
+    Game.objects.filter(player=request.user, completed=False, reserved=False).delete()
+
+    difficulty = request.GET.get("difficulty", "easy").lower()
+    if difficulty not in ["easy", "medium", "hard"]:
+        difficulty = "easy"
+
+    try:
+        game = start_daily_game(request.user, difficulty)
+    except GameCreationError:
+        return redirect('game_selection')
+    return redirect('game_view', game_id=game.id)
+
+
+@login_required
+def daily_leaderboard(request):
+    """
+    Today's fastest completions of the daily challenge for one difficulty,
+    plus the logged-in player's own rank.
+    """
+    difficulty = request.GET.get("difficulty", "easy").lower()
+    if difficulty not in ["easy", "medium", "hard"]:
+        difficulty = "easy"
+
+    challenge = find_daily_challenge(difficulty)
+    entries = get_daily_leaderboard(challenge) if challenge else []
+    player_rank = get_player_rank(challenge, request.user) if challenge else None
+
+    return render(request, "gameplay/daily_leaderboard.html", {
+        "difficulty": difficulty,
+        "difficulties": ["easy", "medium", "hard"],
+        "date": timezone.localdate(),
+        "entries": entries,
+        "player_rank": player_rank,
+    })
+
+
 @login_required
 def game_view(request, game_id, block_index=0):
     """
@@ -51,16 +166,26 @@ def game_view(request, game_id, block_index=0):
 
     # Load the current game for the logged-in user
     try:
-        game = Game.objects.get(id=game_id, player=request.user)
+        game = Game.objects.get(id=game_id, player=request.user, reserved=False)
     except Game.DoesNotExist:
         return redirect('main_page')
 
     # (fallback) Should never happen due to get_object_or_404
     if not game:
-        game = create_game_for_player(request.user)
+        game = create_game_for_player(request.user, retry_rating=False)
+
+    # Rebuild the board from the game's puzzle, the blocks drawn from its seed (cached) and the player's moves
+    try:
+        layout = get_game_layout(game)
+    except ValueError:
+        # The rooms or items changed since the game was created (or it predates stored puzzles),
+        # so its blocks can't be drawn again: start a new one
+        game.delete()
+        start_view = 'start_daily_challenge' if game.challenge_id else 'start_new_game'
+        return redirect(f"{reverse(start_view)}?difficulty={game.difficulty}")
 
-    # Load all 81 cells ordered by row & column
-    cells = list(Cell.objects.filter(game=game).order_by('row', 'column'))
+    # All 81 cells in row order (with their items, the grid shows their numbers)
+    cells = get_board(game, layout)
 
     # Map of 3x3 blocks to their cell indexes
     block_mapping = {
@@ -77,39 +202,37 @@ def game_view(request, game_id, block_index=0):
     # Select the 9 cells from the requested block
     selected_block = [cells[i] for i in block_mapping[block_index]]
 
-    # Track which numbers are already used in the selected block
+    # Track which numbers are already used in the selected block (a prefilled cell shows its correct item)
     used_numbers = set()
     for cell in selected_block:
-        if cell.prefilled and cell.correct_item:
-            used_numbers.add(cell.correct_item.number)
-        elif cell.selected_item:
+        if cell.selected_item:
             used_numbers.add(cell.selected_item.number)
 
-    # Find the Room linked to this block
-    room_id = game.block_rooms[block_index]
-    room = Room.objects.get(id=room_id)
+    # Load the 9 rooms of this game at once and find the Room linked to this block
+    rooms = Room.objects.in_bulk(layout.block_rooms)
+    room = rooms[layout.block_rooms[block_index]]
 
-    # Load the items assigned to this block
-    item_ids = list(game.block_items[str(block_index)].values())  # JSONField keys are strings
-    items = list(Item.objects.filter(id__in=item_ids).order_by("number"))
+    # The items assigned to this block are the correct items of its cells (one per number)
+    items = sorted((cell.correct_item for cell in selected_block), key=lambda item: item.number)
 
-    # Collect all item IDs that have been selected or are correct
-    used_item_ids = Cell.objects.filter(game=game).values_list("correct_item", "selected_item")
-    used_item_ids = set(filter(None, [item_id for pair in used_item_ids for item_id in pair]))
-
-    # Build item name lookup by ID (for item hover tooltips)
-    item_names = {
-        item.id: item.name
-        for item in Item.objects.filter(id__in=used_item_ids)
-    }
+    # Build item name and group lookups by ID from the cells' correct and selected items
+    # (for item hover tooltips and asset hints)
+    item_names = {}
+    item_groups = {}
+    for cell in cells:
+        for used_item in (cell.correct_item, cell.selected_item):
+            if used_item is not None:
+                item_names[used_item.id] = used_item.name
+                item_groups[used_item.id] = used_item.group_id
 
     # Build number → item info map for selected block (used in rendering)
     block_item_names = {}
-    block_map = game.block_items[str(block_index)]
-    for number_str, item_id in block_map.items():
-        item = Item.objects.filter(id=item_id).first()
+    block_map = layout.block_items[str(block_index)]
+    items_by_id = {item.id: item for item in items}
+    for number, item_id in block_map.items():
+        item = items_by_id.get(item_id)
         if item:
-            block_item_names[int(number_str)] = {
+            block_item_names[number] = {
                 "group_id": item.group_id,
                 "name": item.name,
             }
@@ -120,15 +243,16 @@ def game_view(request, game_id, block_index=0):
 
     # Map neighboring block index to room name
     for direction, idx in neighbor_indexes.items():
-        room_id = game.block_rooms[idx]
-        room = Room.objects.get(id=room_id)
         neighbor_rooms[direction] = {
             "index": idx,
-            "name": room.name,
+            "name": rooms[layout.block_rooms[idx]].name,
         }
 
+    # Hint the neighbouring rooms' images and icons the browser has not been offered yet
+    preload_assets = select_new_assets(request, game, get_neighbor_assets(layout.block_items, neighbor_rooms, item_groups))
+
     # Render the template with all required data
-    return render(request, 'gameplay/game.html', {
+    response = render(request, 'gameplay/game.html', {
         'game': game,
         "in_game": True,
         'cells': cells,
@@ -143,35 +267,47 @@ def game_view(request, game_id, block_index=0):
         'used_numbers': used_numbers,
         'block_item_names': block_item_names,
         'range9': range(9),
-        'current_room': game.block_rooms[block_index],
+        'current_room': layout.block_rooms[block_index],
         'room_links': [
-            {'index': i, 'name': Room.objects.get(id=rid).name}
-            for i, rid in enumerate(game.block_rooms)
+            {'index': i, 'name': rooms[rid].name}
+            for i, rid in enumerate(layout.block_rooms)
         ],
+        'preload_assets': preload_assets,
 
     })
+    if preload_assets:
+        response["Link"] = link_header(preload_assets)
+    return response
 
 @csrf_exempt
 @login_required
-def place_item(request, cell_id):
+def place_item(request, game_id, cell_index):
     """
     Handles AJAX POST request when player places or removes an item in a cell.
 
+    The cell is addressed by its index (row * 9 + column); only hidden cells take items.
+
     - If number == -1 → item is removed from the cell
-    - If number in 1–9 → item from same room is placed into the cell
+    - If number in 1–9 → the block's item with that number is placed into the cell
     - If game becomes completed → unlocks memory, updates score, deletes game
     """
     # DEBUG not in production
-    # print(f"DEBUG: Received request - cell_id: {cell_id}")
+    # print(f"DEBUG: Received request - cell_index: {cell_index}")
 
     # Only accept POST requests
     if request.method == "POST":
         try:
-            # Validate and load the Cell
-            cell_id = int(cell_id)
-            cell = get_object_or_404(Cell, id=cell_id, game__player=request.user)
+            # Validate the cell against the game's layout
+            game = get_object_or_404(Game, id=game_id, player=request.user, reserved=False)
+            layout = get_game_layout(game)
+            if cell_index not in layout.hidden_cells:
+                raise ValueError(f"Cell {cell_index} is not a hidden cell.")
+            row, column = divmod(cell_index, 9)
+            block_map = layout.block_items[str((row // 3) * 3 + column // 3)]
+            selected_item_id = (Cell.objects.filter(game=game, index=cell_index)
+                                .values_list("selected_item_id", flat=True).first())
             # DEBUG not in production
-            # print(f"DEBUG: Loaded Cell - {cell}")
+            # print(f"DEBUG: Loaded Cell - {cell_index}: {selected_item_id}")
 
             # Parse JSON body to get selected number (1–9 or -1)
             data = json.loads(request.body)
@@ -181,50 +317,42 @@ def place_item(request, cell_id):
                 # Remove item from the cell
                 # DEBUG not in production
                 # print("DEBUG: Removing item from cell")
-                cell.selected_item = None
+                selected_item_id = None
             else:
-                # Select item from the same room by number
-                room = cell.correct_item.room
-                item = Item.objects.filter(room=room, number=number).first()
+                # Select the block's item by number
+                item_id = block_map.get(int(number))
 
-                if item:
+                if item_id:
                     # DEBUG not in production
                     # print(f"DEBUG: Loaded item by number {number} from room {room}")
-                    cell.selected_item = item if cell.selected_item != item else None
+                    selected_item_id = item_id if selected_item_id != item_id else None
                 else:
                     # DEBUG! remove pass for DEBUG!
                     # print(f"DEBUG: Item with number {number} not found in room {room}") #  remove pass for DEBUG
                     pass
-            # Save updated cell
-            cell.save()
+            # Save the move (retried when other players hold the write lock)
+            call_with_retry(save_move, game, cell_index, selected_item_id)
 
             # Check if the game is now completed
-            game = cell.game
             if game.is_completed():
                 # DEBUG not in production
                 # print("DEBUG: Game is finished")
-                game.completed = True
-                game.save()
 
-                # Try unlocking a new memory (if possible)
-                new_memory = try_unlock_memory(game)
+                # Unlock a memory, update the score and remove the game in one retryable transaction
+                new_memory = call_with_retry(complete_game, game.id, request.user.pk)
                 if new_memory:
                     request.session["just_unlocked_order"] = new_memory.order
                     # DEBUG not in production
                     # print(f"DEBUG: Unlocked memory: {new_memory}")
 
-                # Update scoreboard before deleting the game
-                from score.utils import update_score_for_game
-                update_score_for_game(game)
-
-                # Delete game after scoring and memory unlock
-                game.delete()
+                # The player will likely start another game: build it while they watch the story
+                schedule_prefetch(request.user.pk, predict_difficulty(load_progress_summary(request.user.pk)))
 
                 return JsonResponse({
                     "status": "completed",
                     "redirect_url": "/gameplay/story/"
                 })
-
+            return JsonResponse({"status": "ok"})
 
         except Exception as e:
             # DEBUG not in production
@@ -236,6 +364,59 @@ def place_item(request, cell_id):
     # print("DEBUG: Invalid request method")
     return JsonResponse({"status": "error"}, status=400)
 
+def save_move(game, index, selected_item_id):
+    """
+    Stores the player's item in a cell in one upsert, or deletes the move when the cell is emptied.
+    """
+    if selected_item_id is None:
+        Cell.objects.filter(game=game, index=index).delete()
+    else:
+        Cell.objects.bulk_create([Cell(game=game, index=index, selected_item_id=selected_item_id)],
+                                 update_conflicts=True, unique_fields=["game", "index"],
+                                 update_fields=["selected_item"])
+
+
+def complete_game(game_id, player_id):
+    """
+    Finishes a completed game in a single transaction:
+    marks it as completed, tries to unlock a memory, updates the score and deletes the game.
+
+    The game is loaded inside the transaction so that the whole unit can be retried
+    after lock contention. Cached progress written during a rolled-back attempt is dropped.
+
+    Args:
+        game_id (UUID): ID of the completed game.
+        player_id (int): ID of the player who completed it.
+
+    Returns:
+        Memory | None: The newly unlocked memory, if any.
+    """
+    from score.utils import update_score_for_game
+
+    try:
+        with transaction.atomic():
+            game = Game.objects.select_related("player").get(id=game_id)
+            game.completed = True
+            game.save()
+
+            # Daily challenge: the first completion enters the day's leaderboard
+            if game.challenge_id:
+                record_daily_result(game, daily_time(game))
+
+            # Try unlocking a new memory (if possible)
+            new_memory = try_unlock_memory(game)
+
+            # Update scoreboard before deleting the game
+            update_score_for_game(game, unlocked_memories=load_progress_summary(player_id).total)
+
+            # Delete game after scoring and memory unlock
+            game.delete()
+    except Exception:
+        forget_progress_summary(player_id)
+        raise
+    return new_memory
+
+
 def get_neighbors(index):
     """
     Given a block index (0–8), returns a dictionary of its neighboring block indexes.
@@ -290,11 +471,25 @@ def load_image_map(sequence_name: str) -> dict[int, str]:
     Returns:
         dict[int, str]: A dictionary {index: image_filename}.
     """
-    # Load all frames for the given sequence, ordered by index
-    frames = SequenceFrame.objects.filter(sequence=sequence_name).order_by("index")
+    return load_image_maps(sequence_name)[sequence_name]
+
+
+def load_image_maps(*sequence_names: str) -> dict[str, dict[int, str]]:
+    """
+    load_image_map for several sequences in one query.
+
+    Returns:
+        dict[str, dict[int, str]]: {sequence_name: {index: image_filename}}, empty for a sequence without frames.
+    """
+    image_maps = {name: {} for name in sequence_names}
+
+    # Load all frames of the given sequences, ordered by index
+    frames = SequenceFrame.objects.filter(sequence__in=sequence_names).order_by("sequence", "index")
 
-    # Build a dictionary {index: image_filename} for easy access in templates
-    return {frame.index: frame.image for frame in frames}
+    # Build a dictionary {index: image_filename} per sequence for easy access in templates
+    for frame in frames:
+        image_maps[frame.sequence][frame.index] = frame.image
+    return image_maps
 
 def story_so_far(request):
     """
@@ -307,75 +502,54 @@ def story_so_far(request):
     - Prepares both text and image frames for animated rendering
     """
     # --- Intro ---
-    # Load intro texts and images for the sequence "intro"
+    # Load intro texts and the images of every sequence (one query for all frames)
     intro = Intro.objects.order_by("order")
     intro_texts = list(intro.values_list("text", flat=True))
-    intro_images = load_image_map("intro")
+    image_maps = load_image_maps("intro", "easy_end", "medium_end", "hard_end", "memory")
+    intro_images = image_maps["intro"]
+
+    # All memories and transition texts, each loaded once and split by difficulty below
+    memories = list(Memory.objects.order_by("order"))
+    memory_texts = {
+        difficulty: [memory.text for memory in memories if memory.difficulty == difficulty]
+        for difficulty in ("easy", "medium", "hard")
+    }
+    transitions = dict(DifficultyTransition.objects.values_list("difficulty", "text"))
 
     # --- Easy ---
-    # Load texts for easy difficulty and the transition text for easy
-    easy_memories = Memory.objects.filter(difficulty="easy").order_by("order")
-    easy_texts = list(easy_memories.values_list("text", flat=True))
-    try:
-        # Fetch the transition text for easy difficulty
-        easy_transition = DifficultyTransition.objects.get(difficulty="easy")
-        easy_texts.append(easy_transition.text)
-    except ObjectDoesNotExist:
-        # If no transition found, add a placeholder text
-        easy_texts.append("[[MISSING EASY TRANSITION – story.json not loaded]")
-    easy_images = load_image_map("easy_end")
+    # Texts for easy difficulty and the transition text for easy
+    # (a placeholder text if no transition found)
+    easy_texts = memory_texts["easy"] + [
+        transitions.get("easy", "[[MISSING EASY TRANSITION – story.json not loaded]")
+    ]
+    easy_images = image_maps["easy_end"]
 
     # --- Medium ---
-    # Load texts for medium difficulty and the transition text for medium
-    medium_memories = Memory.objects.filter(difficulty="medium").order_by("order")
-    medium_texts = list(medium_memories.values_list("text", flat=True))
-    try:
-        # Fetch the transition text for medium difficulty
-        medium_transition = DifficultyTransition.objects.get(difficulty="medium")
-        medium_texts.append(medium_transition.text)
-    except ObjectDoesNotExist:
-        # If no transition found, add a placeholder text
-        medium_texts.append("[MISSING MEDIUM TRANSITION – story.json not loaded]")
-    medium_images = load_image_map("medium_end")
+    # Texts for medium difficulty and the transition text for medium
+    medium_texts = memory_texts["medium"] + [
+        transitions.get("medium", "[MISSING MEDIUM TRANSITION – story.json not loaded]")
+    ]
+    medium_images = image_maps["medium_end"]
 
     # --- Hard special case ---
-    # Get the texts for all difficulties (easy, medium, and hard) to combine them later
-    easy_only_texts = list(
-        Memory.objects.filter(difficulty="easy").order_by("order").values_list("text", flat=True)
-    )
-    medium_only_texts = list(
-        Memory.objects.filter(difficulty="medium").order_by("order").values_list("text", flat=True)
-    )
-    hard_only_texts = list(
-        Memory.objects.filter(difficulty="hard").order_by("order").values_list("text", flat=True)
-    )
-    try:
-        # Get the transition text for hard difficulty
-        hard_transition = DifficultyTransition.objects.get(difficulty="hard")
-        hard_only_texts.append(hard_transition.text)
-    except ObjectDoesNotExist:
-        # If no transition found, add a placeholder text
-        hard_only_texts.append("[MISSING HARD TRANSITION – story.json not loaded]")
-
-    # Combine texts from easy, medium, and hard difficulties for the final hard-end sequence
-    final_hard_texts = easy_only_texts + medium_only_texts + hard_only_texts
+    # Combine texts from easy, medium, and hard difficulties (and the hard transition) for the final hard-end sequence
+    hard_only_texts = memory_texts["hard"] + [
+        transitions.get("hard", "[MISSING HARD TRANSITION – story.json not loaded]")
+    ]
+    final_hard_texts = memory_texts["easy"] + memory_texts["medium"] + hard_only_texts
 
     # --- Images ---
-    # Load images for all difficulty levels (easy, medium, hard)
-    easy_only_images = load_image_map("easy_end")
-    medium_only_images = load_image_map("medium_end")
-    hard_only_images = load_image_map("hard_end")
-
-    # Combine images for final hard-end sequence
+    # Combine images of all difficulty levels (easy, medium, hard) for final hard-end sequence
+    hard_only_images = image_maps["hard_end"]
     final_hard_images = {}
     i = 0
     for j in range(20):
-        if j in easy_only_images:
-            final_hard_images[i] = easy_only_images[j]
+        if j in easy_images:
+            final_hard_images[i] = easy_images[j]
             i += 1
     for j in range(20):
-        if j in medium_only_images:
-            final_hard_images[i] = medium_only_images[j]
+        if j in medium_images:
+            final_hard_images[i] = medium_images[j]
             i += 1
     for j in range(len(hard_only_images)):
         final_hard_images[i] = hard_only_images[j]
@@ -383,26 +557,20 @@ def story_so_far(request):
 
 
     # --- Player progress ---
-    # Get or create the player's story progress (unlocked memories)
-    progress, _ = PlayerStoryProgress.objects.get_or_create(player=request.user)
-
-    unlocked_easy = Memory.objects.filter(
-        difficulty="easy", order__in=progress.unlocked_easy
-    ).order_by("order")
-    unlocked_medium = Memory.objects.filter(
-        difficulty="medium", order__in=progress.unlocked_medium
-    ).order_by("order")
-    unlocked_hard = Memory.objects.filter(
-        difficulty="hard", order__in=progress.unlocked_hard
-    ).order_by("order")
-
-    # --- Last game and just unlocked memory ---
-    # Check for the last completed game and whether a new memory was unlocked
-    game = Game.objects.filter(player=request.user, completed=True).order_by("-created_at").first()
-    just_unlocked = None
+    # Load the player's (cached) story progress summary (unlocked memories)
+    progress = load_progress_summary(request.user.pk)
+
+    unlocked_easy = [memory for memory in memories
+                     if memory.difficulty == "easy" and memory.order in progress.unlocked_easy]
+    unlocked_medium = [memory for memory in memories
+                       if memory.difficulty == "medium" and memory.order in progress.unlocked_medium]
+    unlocked_hard = [memory for memory in memories
+                     if memory.difficulty == "hard" and memory.order in progress.unlocked_hard]
+
+    # --- Just unlocked memory ---
+    # Check whether a new memory was unlocked by the last completed game
     order = request.session.pop("just_unlocked_order", None)
-    if order is not None:
-        just_unlocked = Memory.objects.filter(order=order).first()
+    just_unlocked = next((memory for memory in memories if memory.order == order), None)
 
     # If a memory was just unlocked, set it for display
     if just_unlocked:
@@ -410,7 +578,7 @@ def story_so_far(request):
             just_unlocked.text,
             just_unlocked.transition or "[MISSING TRANSITION]"
         ]
-        memory_images = load_image_map("memory")
+        memory_images = image_maps["memory"]
     else:
         memory = []
         memory_images = {}
@@ -454,12 +622,8 @@ def story_so_far(request):
         "hard_end": final_hard_images,
         "memory": memory_images,
     }
-    # Calculate total unlocked memories (easy + medium + hard)
-    total_unlocked = (
-        len(progress.unlocked_easy) +
-        len(progress.unlocked_medium) +
-        len(progress.unlocked_hard)
-    )
+    # Total unlocked memories (easy + medium + hard)
+    total_unlocked = progress.total
     # Render the story page with all the context data
     return render(request, "gameplay/story_so_far.html", {
         "unlocked_easy": unlocked_easy,
@@ -494,13 +658,11 @@ def auto_fill(request, game_id):
     # Load the game based on its ID and check if it's for the current player
     game = get_object_or_404(Game, id=game_id, player=request.user)
 
-    # Find all cells in this game that are not prefilled
-    cells = Cell.objects.filter(game=game, prefilled=False)
-    # For each empty cell, assign the correct item to the cell
-    for cell in cells:
-        # Set the selected item to the correct item for this cell
-        cell.selected_item = cell.correct_item
-        cell.save() # Save the updated cell
+    # Assign the correct item to every hidden cell (one upsert)
+    moves = [Cell(game=game, index=cell.index, selected_item=cell.correct_item)
+             for cell in get_board(game) if not cell.prefilled]
+    Cell.objects.bulk_create(moves, update_conflicts=True, unique_fields=["game", "index"],
+                             update_fields=["selected_item"])
 
     # Redirect the player to the first block (block_index=0)
     return redirect("game_block", game_id=game.id, block_index=0)
@@ -522,6 +684,7 @@ def reset_progress(request):
 
     # Smazání progressu
     PlayerStoryProgress.objects.filter(player=request.user).delete()
+    reset_progress_summary(request.user.pk)
 
     # Bezpečné získání nebo vytvoření PlayerScore
     player_score, _ = PlayerScore.objects.get_or_create(user=request.user)
@@ -603,8 +766,8 @@ def game_selection(request):
     Returns:
         HttpResponse: The rendered game selection page.
     """
-    # Check if the player has an active game (not completed)
-    existing_game = Game.objects.filter(player=request.user, completed=False).first()
+    # Check if the player has an active game (not completed), shared with the context processor
+    existing_game = get_active_game(request)
 
 
     # --- Intro ---
@@ -617,18 +780,18 @@ def game_selection(request):
     # Check if player has an active game (not completed)
     has_active_game = existing_game is not None
 
-    # Get or create the player's progress in terms of unlocked memories
-    progress, _ = PlayerStoryProgress.objects.get_or_create(player=request.user)
+    # Load the player's (cached) progress summary in terms of unlocked memories
+    progress = load_progress_summary(request.user.pk)
     # Check if player has any unlocked memory (easy, medium, or hard)
-    has_any_memory = (
-        progress.unlocked_easy or
-        progress.unlocked_medium or
-        progress.unlocked_hard
-    )
+    has_any_memory = progress.has_any
     # --- Intro condition ---
     # If there is no active game and no memories unlocked, the intro will be played
     play_intro = not has_active_game and not has_any_memory
 
+    # Without a game to continue the player will likely start one: build it in the background
+    if not has_active_game and request.user.is_authenticated:
+        schedule_prefetch(request.user.pk, predict_difficulty(progress))
+
     # Render the game section page with all the context data
     return render(request, 'gameplay/game_selection.html', {
         'progress': progress,  # For status
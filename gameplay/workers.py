@@ -0,0 +1,34 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+# Named process-wide thread pools, created on first use
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, max_workers):
+    """
+    Returns the thread pool `name`, creating it with `max_workers` threads on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"gameplay-{name}")
+        return pool
+
+
+def closes_connection(func):
+    """
+    Decorator for background tasks: worker threads get their own database connection,
+    which is closed after every task instead of being left open between tasks.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connection.close()
+    return wrapper
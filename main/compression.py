@@ -0,0 +1,72 @@
+import gzip
+import re
+
+# Extensions worth compressing (images, audio and fonts are compressed already)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".json", ".map", ".svg", ".html", ".txt", ".xml", ".ico", ".md"}
+
+# Content types the dynamic compression applies to
+COMPRESSIBLE_CONTENT_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+# Filenames containing a content hash, e.g. "items.7c467e4a1e.png" (safe to cache forever)
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{10,}\.[A-Za-z0-9]+$")
+
+# Precompressed siblings in order of preference: (Content-Encoding, file suffix)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+try:
+    import brotli
+except ImportError:  # optional dependency, .br files are skipped without it
+    brotli = None
+
+
+def is_compressible(path):
+    """
+    True if the static file type benefits from gzip/brotli.
+    """
+    return path.suffix.lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def is_hashed_name(name):
+    """
+    True if the filename carries a content hash and can be served as immutable.
+    """
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def gzip_bytes(data):
+    """
+    Compresses data with gzip at the highest level (mtime fixed for reproducible output).
+    """
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    """
+    Compresses data with brotli at the highest quality, or returns None without the brotli package.
+    """
+    if brotli is None:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def parse_accept_encoding(header):
+    """
+    Returns the set of content codings the client accepts (q=0 entries excluded).
+    """
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
@@ -1,7 +1,10 @@
-from gameplay.models import Game
+from gameplay.cache import get_active_game
 
 def existing_game(request):
+    """
+    Adds the player's unfinished game (if any) to every template context.
+    The lookup is cached per user and memoized on the request, see gameplay.cache.
+    """
     if request.user.is_authenticated:
-        existing_game = Game.objects.filter(player=request.user, completed=False).first()
-        return {'existing_game': existing_game}
-    return {}
\ No newline at end of file
+        return {'existing_game': get_active_game(request)}
+    return {}
@@ -0,0 +1,117 @@
+import functools
+import logging
+import random
+import sqlite3
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection as default_connection
+
+logger = logging.getLogger(__name__)
+
+# PRAGMAs applied to every new SQLite connection, overridable with settings.SQLITE_PRAGMAS;
+# busy_timeout is added from the database's OPTIONS["timeout"] (see get_sqlite_pragmas)
+DEFAULT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",       # readers no longer block the writer and vice versa
+    "synchronous": "NORMAL",     # safe with WAL, fsync only at checkpoints
+    "cache_size": -20000,        # ~20 MB page cache per connection (negative = KiB)
+    "mmap_size": 134217728,      # 128 MB memory-mapped reads
+}
+
+# Seconds the sqlite3 driver waits for a lock when OPTIONS has no "timeout"
+DEFAULT_SQLITE_TIMEOUT = 5
+
+# Error messages SQLite uses for lock contention
+LOCKED_MESSAGES = ("database is locked", "database table is locked")
+
+
+def get_sqlite_pragmas(settings_dict=None):
+    """
+    Returns the PRAGMAs to apply, with settings.SQLITE_PRAGMAS overriding the defaults.
+
+    busy_timeout follows the database's OPTIONS["timeout"] (the default database's unless
+    settings_dict is given), so the PRAGMA never shortens the lock wait set for the driver.
+    """
+    if settings_dict is None:
+        settings_dict = settings.DATABASES["default"]
+    timeout = settings_dict.get("OPTIONS", {}).get("timeout", DEFAULT_SQLITE_TIMEOUT)
+
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS, busy_timeout=int(timeout * 1000))
+    pragmas.update(getattr(settings, "SQLITE_PRAGMAS", {}))
+    return pragmas
+
+
+def apply_sqlite_pragmas(cursor, pragmas=None):
+    """
+    Executes the tuning PRAGMAs on an open SQLite cursor.
+
+    Works with both Django cursors and plain sqlite3 cursors (used by the benchmark).
+    A value of None skips the PRAGMA.
+    """
+    for name, value in (pragmas if pragmas is not None else get_sqlite_pragmas()).items():
+        if value is None:
+            continue
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    `connection_created` handler: tunes every new SQLite connection.
+
+    In-memory databases (tests) silently keep their own journal mode.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        apply_sqlite_pragmas(cursor, get_sqlite_pragmas(connection.settings_dict))
+
+
+def is_locked_error(error):
+    """
+    True if the OperationalError was caused by SQLite lock contention.
+    """
+    message = str(error).lower()
+    return any(text in message for text in LOCKED_MESSAGES)
+
+
+def call_with_retry(func, *args, attempts=None, base_delay=None, connection=None, **kwargs):
+    """
+    Calls func and retries it when SQLite reports lock contention.
+
+    Waits with exponential backoff and full jitter between attempts, so contending
+    writers don't wake up at the same moment. Inside an outer transaction the
+    error is re-raised immediately, since only the whole transaction can be retried.
+
+    Args:
+        func (callable): The write operation (should be a transaction of its own).
+        attempts (int): Maximum number of tries (settings.DB_RETRY_ATTEMPTS, default 5).
+        base_delay (float): First backoff step in seconds (settings.DB_RETRY_BASE_DELAY, default 0.05).
+        connection: Django connection used to detect an outer transaction.
+
+    Returns:
+        Whatever func returns.
+    """
+    attempts = attempts or getattr(settings, "DB_RETRY_ATTEMPTS", 5)
+    base_delay = base_delay if base_delay is not None else getattr(settings, "DB_RETRY_BASE_DELAY", 0.05)
+    connection = connection or default_connection
+
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except (OperationalError, sqlite3.OperationalError) as e:
+            if not is_locked_error(e) or attempt == attempts or getattr(connection, "in_atomic_block", False):
+                raise
+            delay = random.uniform(0, base_delay * 2 ** (attempt - 1))
+            logger.warning("Database locked, retrying %s in %.3fs (attempt %d/%d)",
+                           getattr(func, "__name__", func), delay, attempt, attempts)
+            time.sleep(delay)
+
+
+def retry_on_locked(func):
+    """
+    Decorator form of call_with_retry for write paths that see lock contention.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return call_with_retry(func, *args, **kwargs)
+    return wrapper
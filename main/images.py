@@ -0,0 +1,116 @@
+import fnmatch
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+# Display widths (CSS pixels, 2x variants included) for the optimized static images.
+# Each rule is (glob relative to static/, widths); the first matching rule wins.
+IMAGE_RULES = [
+    ("story/*", [1792, 1280, 640]),           # full-screen sequence backgrounds (background-size: cover)
+    ("rooms/*", [520, 260]),                  # .room-room-background, 260px wide
+    ("ui/clock_image.png", [520, 260]),       # .room-background, 260px wide
+    ("ui/mapa_bg.png", [600, 300]),           # .sudoku-background-img, 300px wide
+    ("ui/inventory_bg.png", [1024, 512]),     # .inventory-background-img, 175% of the inventory column
+    ("images/dark_house.jpg", [1920, 1280]),  # page background
+    ("images/*", [1280, 400]),                # landing page gallery (200px) and its enlarged view
+]
+
+# Images that get a tiny inline placeholder (shown until the full image has loaded)
+PLACEHOLDER_PATTERNS = ("story/*",)
+PLACEHOLDER_WIDTH = 24
+
+# Directory (inside static/) the optimized variants and the manifest are written to
+OPTIMIZED_DIR = "optimized"
+MANIFEST_NAME = "manifest.json"
+
+# Parsed manifest: path -> (mtime_ns, data); reloaded when the build command rewrites it
+_manifest_cache = {}
+_manifest_lock = threading.Lock()
+
+
+def get_static_source_dir():
+    """
+    Returns the project static/ directory the optimized variants live in.
+    """
+    return Path(getattr(settings, "OPTIMIZED_STATIC_SOURCE", Path(settings.BASE_DIR) / "static"))
+
+
+def get_manifest_path(name=MANIFEST_NAME):
+    """
+    Returns the path of a build manifest inside static/optimized/.
+    """
+    return get_static_source_dir() / OPTIMIZED_DIR / name
+
+
+def avif_supported():
+    """
+    True if the installed Pillow can encode AVIF.
+    """
+    from PIL import features
+    # Older Pillow releases don't know the module at all
+    return "avif" in features.modules and features.check_module("avif")
+
+
+def content_hash(data, length=10):
+    """
+    Short content hash used in the generated filenames.
+    """
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def load_manifest(name=MANIFEST_NAME):
+    """
+    Returns a build manifest from static/optimized/ ({} when the build command was not run).
+
+    The parsed file is cached and keyed by its modification time, so a lookup
+    costs a stat call.
+    """
+    path = get_manifest_path(name)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+
+    cached = _manifest_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with _manifest_lock:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        _manifest_cache[path] = (mtime, data)
+        return data
+
+
+def get_variants(name, image_format="webp"):
+    """
+    Returns the optimized variants of a static image, largest first.
+
+    Args:
+        name (str): Static path of the original image (e.g. 'story/Intro1.png').
+        image_format (str): 'webp' or 'avif'.
+
+    Returns:
+        list[dict]: [{"width": 1280, "path": "optimized/story/Intro1-1280.<hash>.webp"}, ...]
+    """
+    entry = load_manifest().get("images", {}).get(name)
+    if not entry:
+        return []
+    return entry["variants"].get(image_format, [])
+
+
+def wants_placeholder(name):
+    """
+    True if the static image gets an inline placeholder (see PLACEHOLDER_PATTERNS).
+    """
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in PLACEHOLDER_PATTERNS)
+
+
+def get_placeholder(name):
+    """
+    Returns the blurred placeholder of a static image as a data URI, or "" if it has none.
+    """
+    entry = load_manifest().get("images", {}).get(name)
+    return entry.get("placeholder", "") if entry else ""
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.db import apply_sqlite_pragmas, call_with_retry, get_sqlite_pragmas, is_locked_error
+
+
+class Command(BaseCommand):
+    """
+    Multi-threaded write-contention benchmark for the SQLite setup.
+
+    Simulates many players placing items at once: every operation reads a few cells
+    (like game_view) and then updates one cell in its own transaction (like place_item).
+    The same workload runs twice on a scratch database file:
+
+    - default: rollback journal, new connection per operation, no retries (Django defaults)
+    - tuned:   the PRAGMAs from main.db, persistent connections, BEGIN IMMEDIATE and jittered retries
+
+    Usage:
+        python manage.py bench_sqlite_writes --threads 16 --ops 200
+    """
+    help = "Benchmark concurrent SQLite writes with the default and the tuned connection setup."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16, help="Number of concurrent writer threads")
+        parser.add_argument("--ops", type=int, default=200, help="Operations per thread")
+        parser.add_argument("--rows", type=int, default=81 * 50, help="Cell rows in the scratch table")
+        parser.add_argument("--timeout", type=float, default=1.0,
+                            help="sqlite3 lock timeout (seconds) for the default mode")
+
+    def handle(self, *args, **options):
+        for mode in ("default", "tuned"):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "bench.sqlite3")
+                self.prepare(path, options["rows"])
+                result = self.run_mode(mode, path, options)
+            self.report(mode, result)
+
+    def prepare(self, path, rows):
+        """
+        Creates the scratch table with one row per cell.
+        """
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE cell (id INTEGER PRIMARY KEY, game INTEGER, selected INTEGER)")
+        conn.executemany("INSERT INTO cell (id, game, selected) VALUES (?, ?, NULL)",
+                         ((i, i // 81) for i in range(rows)))
+        conn.commit()
+        conn.close()
+
+    def run_mode(self, mode, path, options):
+        """
+        Runs the workload in all threads and collects latencies and errors.
+        """
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        rows = options["rows"]
+
+        def connect():
+            if mode == "default":
+                return sqlite3.connect(path, timeout=options["timeout"], isolation_level=None)
+            conn = sqlite3.connect(path, timeout=options["timeout"], isolation_level=None)
+            apply_sqlite_pragmas(conn.cursor(), get_sqlite_pragmas())
+            return conn
+
+        def operation(conn, cell_id):
+            game = cell_id // 81
+            conn.execute("SELECT id, selected FROM cell WHERE game = ?", (game,)).fetchall()
+            conn.execute("BEGIN IMMEDIATE" if mode == "tuned" else "BEGIN")
+            try:
+                conn.execute("UPDATE cell SET selected = ? WHERE id = ?", (cell_id % 9 + 1, cell_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        def worker(index):
+            conn = connect() if mode == "tuned" else None
+            local_latencies = []
+            local_errors = 0
+            for op in range(options["ops"]):
+                cell_id = (index * 7919 + op * 104729) % rows
+                start = time.perf_counter()
+                try:
+                    if mode == "tuned":
+                        call_with_retry(operation, conn, cell_id)
+                    else:
+                        # Django's default: a fresh connection for every request
+                        per_request = connect()
+                        try:
+                            operation(per_request, cell_id)
+                        finally:
+                            per_request.close()
+                    local_latencies.append(time.perf_counter() - start)
+                except sqlite3.OperationalError as e:
+                    if not is_locked_error(e):
+                        raise
+                    local_errors += 1
+            if conn is not None:
+                conn.close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {"latencies": latencies, "errors": sum(errors), "elapsed": elapsed}
+
+    def report(self, mode, result):
+        """
+        Prints throughput, error count and latency percentiles of one mode.
+        """
+        latencies = sorted(result["latencies"])
+        ok = len(latencies)
+        throughput = ok / result["elapsed"] if result["elapsed"] else 0.0
+        if ok >= 2:
+            cuts = statistics.quantiles(latencies, n=100)
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0] if latencies else 0.0
+        self.stdout.write(
+            f"{mode:>8}: {throughput:8.1f} writes/s  ok={ok}  locked={result['errors']}  "
+            f"p50={p50 * 1000:.2f}ms  p95={p95 * 1000:.2f}ms  p99={p99 * 1000:.2f}ms"
+        )
@@ -0,0 +1,75 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.compression import brotli, brotli_bytes, gzip_bytes, is_compressible
+
+
+class Command(BaseCommand):
+    """
+    Writes .gz and .br siblings for compressible files in the collected static directory.
+
+    Run after `collectstatic`; PrecompressedStaticMiddleware then serves the
+    smallest variant the browser accepts without compressing anything per request.
+    Brotli files need the optional `brotli` package.
+
+    Usage:
+        python manage.py collectstatic --noinput
+        python manage.py compress_static [--path DIR]
+    """
+    help = "Precompress static files (.gz and, with the brotli package, .br)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Directory to compress (default: STATIC_ROOT)")
+        parser.add_argument("--min-size", type=int, default=512,
+                            help="Skip files smaller than this many bytes")
+
+    def handle(self, *args, **options):
+        root = options["path"] or settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise CommandError("Static directory not found, run collectstatic first or pass --path.")
+        if brotli is None:
+            self.stdout.write("brotli package not installed, writing .gz files only.")
+
+        written = skipped = 0
+        saved = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = Path(directory) / filename
+                if not is_compressible(path) or path.stat().st_size < options["min_size"]:
+                    continue
+                for suffix, compress in ((".gz", gzip_bytes), (".br", brotli_bytes)):
+                    result = self.compress(path, suffix, compress)
+                    if result is None:
+                        skipped += 1
+                    else:
+                        written += 1
+                        saved += result
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} compressed files ({saved // 1024} KB saved), {skipped} skipped."
+        ))
+
+    def compress(self, path, suffix, compress):
+        """
+        Writes one compressed sibling if it is outdated and actually smaller.
+
+        Returns:
+            int | None: Bytes saved, or None when nothing was written.
+        """
+        target = path.with_name(path.name + suffix)
+        if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+            return None
+
+        data = path.read_bytes()
+        compressed = compress(data)
+        # Not worth serving if compression saves less than 5 %
+        if compressed is None or len(compressed) >= len(data) * 0.95:
+            if target.exists():
+                target.unlink()
+            return None
+
+        target.write_bytes(compressed)
+        return len(data) - len(compressed)
@@ -0,0 +1,215 @@
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from gameplay.jobs import JOB_TIMEOUT, get_job_settings
+from gameplay.models import Cell, Game
+from gameplay.utils import get_game_layout, has_solution
+
+# Prefix of the throwaway accounts, removed after the run unless --keep is given
+USERNAME_PREFIX = "loadtest-"
+
+
+class Command(BaseCommand):
+    """
+    End-to-end load test with simulated players, run in-process with the Django test client
+    against the configured database.
+
+    Every player registers, then for each game: starts it (polling the "preparing" page's
+    status URL when the game is created on the worker pool), walks through the nine rooms
+    via game_block, solves the board from the visible (prefilled) cells with the
+    backtracking solver and places the missing items through place_item, finishes
+    the game and watches story_so_far; at the end it opens the scoreboard.
+
+    Reports per endpoint: request count, error rate, p50/p95/p99 latency and the average
+    query count (captured on the player thread's connection), plus overall throughput.
+
+    Usage:
+        python manage.py loadtest --players 20 --concurrency 4 --games 1 --difficulty easy
+    """
+    help = "Simulate concurrent players and report per-endpoint latency, errors and query counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--players", type=int, default=10, help="Number of simulated players")
+        parser.add_argument("--concurrency", type=int, default=4, help="Players playing at the same time")
+        parser.add_argument("--games", type=int, default=1, help="Games each player finishes")
+        parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], default="easy")
+        parser.add_argument("--keep", action="store_true", help="Keep the simulated accounts after the run")
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        self.samples = defaultdict(list)  # endpoint -> [(seconds, status, queries)]
+        self.lock = threading.Lock()
+        self.games_completed = 0
+        self.corrections = 0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            futures = [
+                pool.submit(self.play, f"{USERNAME_PREFIX}{run_id}-{n}", options)
+                for n in range(options["players"])
+            ]
+            failures = [future.exception() for future in futures if future.exception()]
+        elapsed = time.perf_counter() - started
+
+        if not options["keep"]:
+            User.objects.filter(username__startswith=f"{USERNAME_PREFIX}{run_id}-").delete()
+
+        self.report(elapsed, options)
+        for failure in failures[:5]:
+            self.stderr.write(f"Player aborted: {failure!r}")
+
+    def play(self, username, options):
+        """
+        One simulated player session (runs in a worker thread with its own DB connection).
+        """
+        client = Client(SERVER_NAME="localhost")
+        try:
+            password = uuid.uuid4().hex
+            self.request(client, "register", "post", reverse("register"),
+                         {"username": username, "password1": password, "password2": password})
+
+            for _ in range(options["games"]):
+                self.play_game(client, options["difficulty"])
+
+            self.request(client, "scoreboard", "get", reverse("scoreboard"))
+        finally:
+            connection.close()
+
+    def play_game(self, client, difficulty):
+        response = self.request(client, "start_new_game", "get",
+                                reverse("start_new_game") + f"?difficulty={difficulty}")
+        if response.status_code != 302:
+            return
+        game_url = self.wait_for_game(client, response["Location"])
+        match = resolve(game_url)
+        if match.url_name != "game_view":
+            raise RuntimeError(f"Starting a {difficulty} game redirected to {game_url} instead of a game.")
+        game_id = match.kwargs["game_id"]
+        self.request(client, "game_view", "get", game_url)
+
+        layout = get_game_layout(Game.objects.get(id=game_id))
+        solution = self.solve(layout)
+
+        for block in range(9):
+            self.request(client, "game_block", "get", reverse("game_block", args=[game_id, block]))
+            for row in range(block // 3 * 3, block // 3 * 3 + 3):
+                for column in range(block % 3 * 3, block % 3 * 3 + 3):
+                    if row * 9 + column not in layout.hidden_cells:
+                        continue
+                    if self.place(client, game_id, row * 9 + column, solution[row][column]):
+                        return
+
+        # Boards with few givens can have several solutions; like a player following
+        # the correct/incorrect colouring, fix the cells that differ from the intended one
+        moves = dict(Cell.objects.filter(game_id=game_id).values_list("index", "selected_item__number"))
+        for index in sorted(layout.hidden_cells):
+            number = layout.board[index // 9][index % 9]
+            if moves.get(index) != number:
+                with self.lock:
+                    self.corrections += 1
+                if self.place(client, game_id, index, number):
+                    return
+
+    def wait_for_game(self, client, url):
+        """
+        Follows the "preparing" page of an asynchronous game creation: polls the job status
+        like the page's script and returns the URL it redirects to (any other URL is returned as is).
+
+        Raises:
+            RuntimeError: If the job is unknown or does not finish within its lifetime.
+        """
+        match = resolve(url)
+        if match.url_name != "game_preparing":
+            return url
+
+        status_url = reverse("game_creation_status", args=[match.kwargs["job_id"]])
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while time.monotonic() < deadline:
+            response = self.request(client, "creation_status", "get", status_url)
+            if response.status_code != 200:
+                raise RuntimeError(f"Game creation job status {status_url} answered {response.status_code}.")
+            if response.json().get("redirect_url"):
+                return response.json()["redirect_url"]
+            time.sleep(get_job_settings()[2])
+        raise RuntimeError(f"Game creation job {match.kwargs['job_id']} did not finish in {JOB_TIMEOUT} s.")
+
+    def place(self, client, game_id, cell_index, number):
+        """
+        Places an item; on completion follows the redirect to story_so_far and returns True.
+        """
+        response = self.request(client, "place_item", "post", reverse("place_item", args=[game_id, cell_index]),
+                                {"number": number}, content_type="application/json")
+        if response.status_code == 200 and response.json().get("status") == "completed":
+            with self.lock:
+                self.games_completed += 1
+            self.request(client, "story_so_far", "get", response.json()["redirect_url"])
+            return True
+        return False
+
+    def solve(self, layout):
+        """
+        Solves the board from what the player can see (the prefilled cells).
+        """
+        grid = [[0 if r * 9 + c in layout.hidden_cells else layout.board[r][c] for c in range(9)] for r in range(9)]
+        has_solution(grid)  # fills the grid in place
+        return grid
+
+    def request(self, client, endpoint, method, url, data=None, **extra):
+        """
+        Sends one request and records its latency, status and query count.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data, **extra)
+            duration = time.perf_counter() - start
+
+        with self.lock:
+            self.samples[endpoint].append((duration, response.status_code, len(queries)))
+        return response
+
+    def report(self, elapsed, options):
+        """
+        Prints one line per endpoint and the overall throughput.
+        """
+        self.stdout.write(f"{'endpoint':<16}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}"
+                          f"{'p99 ms':>9}{'queries':>9}")
+        total = 0
+        for endpoint, samples in self.samples.items():
+            latencies = sorted(sample[0] for sample in samples)
+            errors = sum(1 for sample in samples if sample[1] >= 400)
+            queries = [sample[2] for sample in samples]
+            p50, p95, p99 = percentiles(latencies)
+            total += len(samples)
+            self.stdout.write(
+                f"{endpoint:<16}{len(samples):>9}{errors / len(samples):>7.1%} "
+                f"{p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f} "
+                f"{statistics.mean(queries):>8.1f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['players']} players ({options['concurrency']} concurrent): {total} requests in "
+            f"{elapsed:.1f} s = {total / elapsed:.1f} req/s, {self.games_completed} games completed "
+            f"({self.games_completed / elapsed:.2f} games/s), {self.corrections} moves corrected"
+        ))
+
+
+def percentiles(values):
+    """
+    Returns (p50, p95, p99) of sorted values.
+    """
+    if len(values) >= 2:
+        cuts = statistics.quantiles(values, n=100)
+        return cuts[49], cuts[94], cuts[98]
+    value = values[0] if values else 0.0
+    return value, value, value
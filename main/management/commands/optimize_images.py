@@ -0,0 +1,153 @@
+import base64
+import io
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.images import (IMAGE_RULES, OPTIMIZED_DIR, MANIFEST_NAME, PLACEHOLDER_WIDTH, avif_supported,
+                         content_hash, get_static_source_dir, wants_placeholder)
+
+
+class Command(BaseCommand):
+    """
+    Converts the large static images to WebP (and AVIF when Pillow supports it)
+    at the display sizes used by the templates.
+
+    Every variant gets a content-hashed filename under static/optimized/, and
+    static/optimized/manifest.json maps the original static path to its variants.
+    The manifest is read by the static_images template tags, which offer the variants
+    next to the original file (`{% static %}` itself keeps serving the original).
+    Story backgrounds also get a tiny blurred placeholder inlined in the manifest as a data URI.
+
+    Usage:
+        python manage.py optimize_images [--quality 80] [--clean]
+    """
+    help = "Build content-hashed WebP/AVIF variants of static images and their manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quality", type=int, default=80, help="Encoder quality (0–100)")
+        parser.add_argument("--no-avif", action="store_true", help="Skip AVIF even if Pillow supports it")
+        parser.add_argument("--clean", action="store_true", help="Remove variants no longer in the manifest")
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise CommandError("Pillow is required: pip install -r requirements.txt")
+
+        static_dir = get_static_source_dir()
+        out_dir = static_dir / OPTIMIZED_DIR
+        formats = ["webp"]
+        if avif_supported() and not options["no_avif"]:
+            formats.append("avif")
+        else:
+            self.stdout.write("AVIF encoder not available, writing WebP only.")
+
+        images = {}
+        seen = set()
+        before = after = 0
+
+        for pattern, widths in IMAGE_RULES:
+            for source in sorted(static_dir.glob(pattern)):
+                name = source.relative_to(static_dir).as_posix()
+                if name in seen or not source.is_file():
+                    continue
+                seen.add(name)
+
+                with Image.open(source) as image:
+                    image.load()
+                    entry = {"width": image.width, "height": image.height, "variants": {}}
+                    for image_format in formats:
+                        entry["variants"][image_format] = [
+                            self.write_variant(image, source, width, image_format, options["quality"], out_dir, static_dir)
+                            for width in self.target_widths(image.width, widths)
+                        ]
+                    if wants_placeholder(name):
+                        entry["placeholder"] = self.placeholder(image)
+                images[name] = entry
+
+                largest = entry["variants"]["webp"][0]["path"]
+                before += source.stat().st_size
+                after += (static_dir / largest).stat().st_size
+                self.stdout.write(f"{name}: {source.stat().st_size // 1024} KB → "
+                                  f"{(static_dir / largest).stat().st_size // 1024} KB ({largest})")
+
+        manifest = {"version": 1, "formats": formats, "images": images}
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        if options["clean"]:
+            self.clean(out_dir, static_dir, images)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Optimized {len(images)} images: {before // 1024} KB → {after // 1024} KB (largest variants)."
+        ))
+
+    def target_widths(self, source_width, widths):
+        """
+        Returns the widths to generate, largest first, never upscaling the source.
+        """
+        targets = sorted({min(width, source_width) for width in widths}, reverse=True)
+        return targets
+
+    def write_variant(self, image, source, width, image_format, quality, out_dir, static_dir):
+        """
+        Resizes and encodes one variant and writes it under a content-hashed name.
+
+        Returns:
+            dict: {"width": ..., "path": <static path of the variant>}
+        """
+        from PIL import Image
+
+        if width < image.width:
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = image
+        if resized.mode not in ("RGB", "RGBA"):
+            resized = resized.convert("RGBA" if "A" in resized.getbands() else "RGB")
+
+        buffer = io.BytesIO()
+        save_options = {"quality": quality}
+        if image_format == "webp":
+            save_options["method"] = 6
+        resized.save(buffer, format=image_format.upper(), **save_options)
+        data = buffer.getvalue()
+
+        relative_dir = source.parent.relative_to(static_dir)
+        filename = f"{source.stem}-{width}.{content_hash(data)}.{image_format}"
+        target = out_dir / relative_dir / filename
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+        return {"width": width, "path": target.relative_to(static_dir).as_posix()}
+
+    def placeholder(self, image):
+        """
+        Encodes a PLACEHOLDER_WIDTH px wide, slightly blurred WebP as a data URI (a few hundred bytes).
+        """
+        from PIL import ImageFilter
+
+        height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+        small = image.convert("RGB").resize((PLACEHOLDER_WIDTH, height)).filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        small.save(buffer, format="WEBP", quality=40, method=6)
+        return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    def clean(self, out_dir, static_dir, images):
+        """
+        Deletes variants that are not referenced by the new manifest.
+        """
+        keep = {
+            variant["path"]
+            for entry in images.values()
+            for variants in entry["variants"].values()
+            for variant in variants
+        }
+        for root, _, files in os.walk(out_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                relative = os.path.relpath(path, static_dir).replace(os.sep, "/")
+                if filename != MANIFEST_NAME and relative not in keep:
+                    os.remove(path)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.profiling import get_profile_dir, list_profiles, summarize_profile
+
+
+class Command(BaseCommand):
+    """
+    Lists the cProfile captures written by ProfilingMiddleware and summarizes them.
+
+    Usage:
+        python manage.py profiles                              # list, newest first
+        python manage.py profiles --view story_so_far --summary  # top functions of the newest capture
+        python manage.py profiles game_view-20250101-120000-000000.prof --limit 30
+    """
+    help = "List captured request profiles and show their top cumulative functions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="*", help="Profile file names to summarize")
+        parser.add_argument("--view", help="Only profiles of this view")
+        parser.add_argument("--summary", action="store_true", help="Summarize the newest (matching) profile")
+        parser.add_argument("--limit", type=int, default=15, help="Number of functions in a summary")
+
+    def handle(self, *args, **options):
+        profiles = list_profiles()
+        if options["view"]:
+            profiles = [profile for profile in profiles if profile["view"] == options["view"]]
+
+        if options["files"]:
+            for name in options["files"]:
+                path = get_profile_dir() / name
+                if not path.is_file():
+                    raise CommandError(f"Profile not found: {path}")
+                self.summarize(path, options["limit"])
+            return
+
+        if not profiles:
+            self.stdout.write(f"No profiles in {get_profile_dir()}. "
+                              "Request a page as staff with ?profile=1 or the X-Profile: 1 header.")
+            return
+
+        if options["summary"]:
+            self.summarize(profiles[0]["path"], options["limit"])
+            return
+
+        for profile in profiles:
+            self.stdout.write(
+                f"{profile['captured']:%Y-%m-%d %H:%M:%S}  {profile['view']:<24} "
+                f"{profile['path'].stat().st_size // 1024:>5} KB  {profile['path'].name}"
+            )
+
+    def summarize(self, path, limit):
+        self.stdout.write(self.style.SUCCESS(path.name))
+        self.stdout.write(summarize_profile(path, limit))
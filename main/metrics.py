@@ -0,0 +1,220 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the per-request query count buckets
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Quantiles reported over the rolling window of recent observations
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "mystdoku_"
+
+# Timings of the request currently being handled (set by PerformanceMiddleware)
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Accumulates the DB and template time of one request.
+
+    Filled by the DB execute wrapper and the timed template backend while the view runs.
+    """
+    __slots__ = ("db_queries", "db_time", "template_time")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook: times every statement
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+
+class Histogram:
+    """
+    Cumulative bucket counts (exported as a Prometheus histogram) plus a rolling
+    window of the most recent observations for p50/p95/p99.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=None):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=window or getattr(settings, "METRICS_WINDOW", 1000))
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        """
+        Returns the q-quantile of the rolling window (None while it is empty).
+        """
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def cumulative_counts(self):
+        """
+        Returns (upper bound, observations <= bound) pairs, ending with +Inf.
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class MetricsRegistry:
+    """
+    In-process store of histograms and counters, keyed by metric name and labels.
+
+    Each worker process keeps its own numbers; they reset on restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+                self._help.setdefault(name, help_text)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, help_text="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._help.setdefault(name, help_text)
+
+    def get_histogram(self, name, **labels):
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def get_counter(self, name, **labels):
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._help.clear()
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted({key[0] for key in self._histograms}):
+                full_name = METRIC_PREFIX + name
+                if self._help.get(name):
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in histogram.cumulative_counts():
+                        lines.append(f"{full_name}_bucket{format_labels(labels, le=bound)} {count}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {histogram.count}")
+
+                # Rolling-window quantiles as a separate summary metric
+                lines.append(f"# TYPE {full_name}_recent summary")
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    for q in QUANTILES:
+                        value = histogram.quantile(q)
+                        if value is not None:
+                            lines.append(f"{full_name}_recent{format_labels(labels, quantile=q)} {value:.6f}")
+
+            for name in sorted({key[0] for key in self._counters}):
+                full_name = METRIC_PREFIX + name
+                if self._help.get(name):
+                    lines.append(f"# HELP {full_name} {self._help[name]}")
+                lines.append(f"# TYPE {full_name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{full_name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels, **extra):
+    """
+    Formats label pairs as {a="1",b="2"} (empty string without labels).
+    """
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in pairs) + "}"
+
+
+def escape_label_value(value):
+    """
+    Escapes backslashes, quotes and newlines as required by the Prometheus text format.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry used by the middleware and the /metrics view
+registry = MetricsRegistry()
+
+
+def record_request(view_name, duration, timings):
+    """
+    Adds one handled request to the per-view histograms.
+    """
+    registry.observe("request_duration_seconds", duration, view=view_name,
+                     help_text="Wall time of the request")
+    registry.observe("request_db_queries", timings.db_queries, buckets=QUERY_COUNT_BUCKETS, view=view_name,
+                     help_text="Database queries per request")
+    registry.observe("request_db_seconds", timings.db_time, view=view_name,
+                     help_text="Time spent in database queries per request")
+    registry.observe("request_template_seconds", timings.template_time, view=view_name,
+                     help_text="Time spent rendering templates per request")
+
+
+@contextmanager
+def timed(name, help_text="", **labels):
+    """
+    Observes the duration of the with-block in the histogram `name` (also when it raises).
+
+    Example:
+        with timed("game_creation_stage_seconds", stage="fill_cells"):
+            fill_cells(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, help_text=help_text, **labels)
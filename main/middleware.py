@@ -0,0 +1,248 @@
+import mimetypes
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.middleware.gzip import GZipMiddleware
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compression import COMPRESSIBLE_CONTENT_TYPES, ENCODINGS, is_hashed_name, parse_accept_encoding
+from .metrics import RequestTimings, current_timings, record_request, registry
+from .profiling import run_profiled, wants_profile
+from .querylog import QueryLog, get_query_log_settings, logger as query_logger
+
+# One year: the longest max-age browsers honour, used for content-hashed files
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Serves collected static files (settings.STATIC_ROOT) directly from Django.
+
+    Meant for the single-node deployment without a CDN or separate web server:
+    - picks the .br or .gz sibling written by `manage.py compress_static` based on Accept-Encoding,
+    - sends content-hashed files with a far-future immutable Cache-Control,
+    - other files get settings.STATIC_MAX_AGE and Last-Modified revalidation.
+
+    Requests for files that are not collected fall through to the rest of the stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else "/" + settings.STATIC_URL
+        self.root = settings.STATIC_ROOT
+        self.max_age = getattr(settings, "STATIC_MAX_AGE", 60 * 60)
+
+    def __call__(self, request):
+        if self.root and request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        """
+        Returns the response for a static file, or None if it is not in STATIC_ROOT.
+        """
+        try:
+            path = safe_join(self.root, name)
+        except ValueError:
+            # Path traversal attempt, let the normal stack answer
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+            response = HttpResponseNotModified()
+            self.set_cache_headers(response, name)
+            self.set_vary(response, path)
+            return response
+
+        content_type, _ = mimetypes.guess_type(name)
+        served_path, encoding = self.negotiate(request, path)
+
+        response = FileResponse(open(served_path, "rb"), content_type=content_type or "application/octet-stream")
+        response["Last-Modified"] = http_date(stat.st_mtime)
+        response["Content-Length"] = str(os.path.getsize(served_path))
+        if encoding:
+            response["Content-Encoding"] = encoding
+        self.set_cache_headers(response, name)
+        self.set_vary(response, path)
+        return response
+
+    def negotiate(self, request, path):
+        """
+        Picks the best precompressed sibling the client accepts.
+
+        Returns:
+            tuple[str, str | None]: (path to send, Content-Encoding or None)
+        """
+        accepted = parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.exists(path + suffix):
+                return path + suffix, encoding
+        return path, None
+
+    def set_vary(self, response, path):
+        """
+        Marks the response as negotiated when the file has precompressed siblings.
+
+        304 responses get the header too, so caches keep one entry per encoding when they revalidate.
+        """
+        if any(os.path.exists(path + suffix) for _, suffix in ENCODINGS):
+            patch_vary_headers(response, ("Accept-Encoding",))
+
+    def set_cache_headers(self, response, name):
+        if is_hashed_name(name):
+            response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={self.max_age}"
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Gzips dynamic HTML/JSON/text responses above settings.GZIP_MIN_LENGTH bytes.
+
+    Smaller responses and binary content types are passed through untouched,
+    since compressing them costs more CPU than it saves bytes. 304 responses
+    only get Vary: Accept-Encoding.
+    """
+
+    def process_response(self, request, response):
+        if response.status_code == 304:
+            # The full response may have been compressed, so revalidations vary by encoding as well
+            patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, "GZIP_MIN_LENGTH", 1024):
+            return response
+        content_type = response.get("Content-Type", "")
+        if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return response
+        return super().process_response(request, response)
+
+
+class PerformanceMiddleware:
+    """
+    Measures every request: wall time, DB query count and time, template render time.
+
+    - adds a Server-Timing header, so the numbers show up in the browser's network panel
+      (staff users only, or everyone when DEBUG is on: the timings are not for the public),
+    - feeds per-view histograms in main.metrics, exported by the staff-only /metrics view.
+
+    Disabled with settings.PERFORMANCE_METRICS = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERFORMANCE_METRICS", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        duration = time.perf_counter() - start
+
+        record_request(get_view_name(request), duration, timings)
+        if settings.DEBUG or getattr(getattr(request, "user", None), "is_staff", False):
+            response["Server-Timing"] = server_timing_header(duration, timings)
+        return response
+
+
+class QueryLogMiddleware:
+    """
+    Logs slow SQL statements and likely N+1 query patterns, with the view that ran them.
+
+    Statements are grouped by fingerprint (literals normalized); one fingerprint running
+    more than settings.QUERY_LOG_REPEAT_THRESHOLD times in a request is reported as N+1,
+    and statements slower than settings.QUERY_LOG_SLOW_MS are logged with their SQL.
+    Findings also count towards the query_n_plus_one_total / slow_queries_total metrics.
+
+    Switched by settings.QUERY_LOG; when off the middleware is not loaded at all.
+    """
+
+    def __init__(self, get_response):
+        enabled, self.slow_ms, self.repeat_threshold = get_query_log_settings()
+        if not enabled:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        log = QueryLog(self.slow_ms, self.repeat_threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            response = self.get_response(request)
+
+        view_name = get_view_name(request)
+        for sql, count in log.repeated():
+            query_logger.warning("Possible N+1 in %s: %d× %s", view_name, count, sql)
+            registry.inc("query_n_plus_one_total", view=view_name,
+                         help_text="Statements repeated above the N+1 threshold in one request")
+        for duration, sql in log.slow:
+            query_logger.warning("Slow query in %s (%.1f ms): %s", view_name, duration * 1000, sql)
+            registry.inc("slow_queries_total", view=view_name,
+                         help_text="Statements slower than QUERY_LOG_SLOW_MS")
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs a view under cProfile when a staff user asks for it with "X-Profile: 1" or "?profile=1".
+
+    The stats are written to settings.PROFILE_DIR as "<view>-<timestamp>.prof" and the file name
+    is returned in the X-Profile header; `manage.py profiles` lists and summarizes them.
+    Must come after AuthenticationMiddleware (it checks request.user).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not wants_profile(request):
+            return None
+        response, path = run_profiled(get_view_name(request), view_func, request, *view_args, **view_kwargs)
+        response["X-Profile"] = path.name
+        return response
+
+
+def get_view_name(request):
+    """
+    Returns the name of the view function (or class) that handled the request.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return getattr(match.func, "view_class", match.func).__name__
+
+
+def server_timing_header(duration, timings):
+    """
+    Builds the Server-Timing value (durations in milliseconds).
+    """
+    return ", ".join([
+        f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_queries} queries"',
+        f"tpl;dur={timings.template_time * 1000:.1f}",
+        f"total;dur={duration * 1000:.1f}",
+    ])
@@ -0,0 +1,83 @@
+import cProfile
+import io
+import pstats
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+# Opt-in triggers: request header "X-Profile: 1" or query parameter "?profile=1"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "profile"
+# Trigger values that turn profiling on; anything else ("0", "false", empty) leaves it off
+PROFILE_ON_VALUES = {"1", "true", "yes", "on"}
+
+# "<view>-<UTC timestamp>.prof"
+PROFILE_NAME_RE = re.compile(r"^(?P<view>.+)-(?P<stamp>\d{8}-\d{6}-\d{6})\.prof$")
+
+
+def get_profile_dir():
+    """
+    Returns the directory captured profiles are written to (settings.PROFILE_DIR).
+    """
+    return Path(getattr(settings, "PROFILE_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+def wants_profile(request):
+    """
+    True if a staff user asked for this request to be profiled.
+    """
+    flag = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM, "")
+    if flag.strip().lower() not in PROFILE_ON_VALUES:
+        return False
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def run_profiled(view_name, func, *args, **kwargs):
+    """
+    Calls func under cProfile and writes the stats to the profile directory.
+
+    Returns:
+        tuple: (func's return value, Path of the written .prof file)
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+
+    directory = get_profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")
+    path = directory / f"{view_name}-{stamp}.prof"
+    profiler.dump_stats(path)
+    return result, path
+
+
+def list_profiles():
+    """
+    Returns the captured profiles, newest first, as dicts with path, view and captured time.
+    """
+    directory = get_profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.glob("*.prof"):
+        match = PROFILE_NAME_RE.match(path.name)
+        if not match:
+            continue
+        profiles.append({
+            "path": path,
+            "view": match["view"],
+            "captured": datetime.strptime(match["stamp"], "%Y%m%d-%H%M%S-%f").replace(tzinfo=timezone.utc),
+        })
+    return sorted(profiles, key=lambda profile: profile["captured"], reverse=True)
+
+
+def summarize_profile(path, limit=15):
+    """
+    Returns the top `limit` functions of a profile by cumulative time, as printed by pstats.
+    """
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,67 @@
+import functools
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Literals and placeholders replaced by "?" in fingerprints
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+# IN lists of any length collapse into one fingerprint
+IN_LIST_RE = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """
+    Normalizes a statement so queries differing only in their values compare equal.
+
+    Example:
+        'SELECT ... WHERE "id" = 5 AND "name" IN (%s, %s)' -> 'SELECT ... WHERE "id" = ? AND "name" IN (...)'
+    """
+    normalized = LITERAL_RE.sub("?", sql)
+    normalized = IN_LIST_RE.sub("IN (...)", normalized)
+    return WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class QueryLog:
+    """
+    connection.execute_wrapper() hook collecting one request's statements by fingerprint.
+    """
+
+    def __init__(self, slow_ms, repeat_threshold):
+        self.slow_seconds = slow_ms / 1000
+        self.repeat_threshold = repeat_threshold
+        self.counts = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.counts[fingerprint(sql)] += 1
+            if duration >= self.slow_seconds:
+                self.slow.append((duration, sql))
+
+    def repeated(self):
+        """
+        Returns [(fingerprint, count)] of statements run more than the threshold allows, most frequent first.
+        """
+        return [(sql, count) for sql, count in self.counts.most_common() if count > self.repeat_threshold]
+
+
+def get_query_log_settings():
+    """
+    Returns (enabled, slow threshold in ms, N+1 repeat threshold) from settings.
+    """
+    return (
+        getattr(settings, "QUERY_LOG", False),
+        getattr(settings, "QUERY_LOG_SLOW_MS", 100),
+        getattr(settings, "QUERY_LOG_REPEAT_THRESHOLD", 10),
+    )
@@ -0,0 +1,36 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import current_timings
+
+
+class TimedTemplate(Template):
+    """
+    Template that adds its render time to the current request's timings.
+    """
+
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The regular Django template backend, with render times recorded for PerformanceMiddleware.
+
+    Only top-level renders are timed ({% include %} runs inside its parent), so nothing is counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
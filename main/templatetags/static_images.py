@@ -0,0 +1,69 @@
+import mimetypes
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from main.images import get_placeholder, get_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def static_srcset(name, image_format="webp"):
+    """
+    Returns a srcset value with all optimized variants of a static image,
+    e.g. "/static/optimized/rooms/garaz-520.<hash>.webp 520w, ... 260w".
+
+    Empty when the image has no variants (optimize_images not run), so the plain src is used.
+    """
+    return ", ".join(
+        f"{static(variant['path'])} {variant['width']}w"
+        for variant in get_variants(name, image_format)
+    )
+
+
+@register.simple_tag
+def static_picture(name, sizes, css_class=""):
+    """
+    Returns a <picture> of a static image: a <source> per optimized format (AVIF first, then WebP)
+    and the original file as the <img>, which browsers that accept neither format load instead.
+    """
+    sources = format_html_join(
+        "",
+        '<source type="image/{}" srcset="{}" sizes="{}">',
+        (
+            (image_format, srcset, sizes)
+            for image_format in ("avif", "webp")
+            if (srcset := static_srcset(name, image_format))
+        ),
+    )
+    return format_html('<picture>{}<img src="{}" class="{}"></picture>', sources, static(name), css_class)
+
+
+@register.simple_tag
+def static_image_set(name):
+    """
+    Returns a CSS image-set() of a static image for backgrounds: the largest AVIF and WebP
+    variants, then the original file as fallback for browsers that accept neither.
+
+    Empty when the image has no variants (optimize_images not run), so the stylesheet's plain url() is used.
+    """
+    candidates = [
+        f'url("{static(variants[0]["path"])}") type("image/{image_format}")'
+        for image_format in ("avif", "webp")
+        if (variants := get_variants(name, image_format))
+    ]
+    if not candidates:
+        return ""
+    candidates.append(f'url("{static(name)}") type("{mimetypes.guess_type(name)[0]}")')
+    return mark_safe(f"image-set({', '.join(candidates)})")
+
+
+@register.simple_tag
+def static_placeholder(name):
+    """
+    Returns the inline blurred placeholder (data URI) of a static image, or "" if it has none.
+    """
+    return get_placeholder(name)
@@ -0,0 +1,59 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .querylog import fingerprint
+
+# Wall-time ceilings are generous (several times the usual timing), but a very slow or loaded
+# machine can still miss them: QUERY_BUDGET_TIMING=0 python -m pytest turns them off;
+# query counts are always checked
+TIMING_ENV_VAR = "QUERY_BUDGET_TIMING"
+
+
+def timing_enforced():
+    """
+    True if assertQueryBudget should also fail on its wall-time ceilings (unless QUERY_BUDGET_TIMING is off).
+    """
+    return os.environ.get(TIMING_ENV_VAR, "").lower() not in ("0", "false", "no", "off")
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin pinning the cost of a code path: a maximum query count and a wall-time ceiling.
+    The ceiling can be turned off with QUERY_BUDGET_TIMING=0 (see timing_enforced).
+
+    When a budget is exceeded the failure lists the repeated statements (by fingerprint)
+    and every executed SQL statement, so the offending query is visible in the test output.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, max_seconds=None, using="default"):
+        context = CaptureQueriesContext(connections[using])
+        start = time.perf_counter()
+        with context:
+            yield context
+        elapsed = time.perf_counter() - start
+
+        executed = len(context.captured_queries)
+        if executed > max_queries:
+            self.fail(f"{executed} queries executed, budget is {max_queries}.\n"
+                      + format_queries(context.captured_queries))
+        if max_seconds is not None and elapsed > max_seconds and timing_enforced():
+            self.fail(f"Took {elapsed * 1000:.0f} ms, ceiling is {max_seconds * 1000:.0f} ms "
+                      f"({executed} queries).\n" + format_queries(context.captured_queries))
+
+
+def format_queries(captured):
+    """
+    Formats captured queries: repeated fingerprints first, then every statement in order.
+    """
+    counts = Counter(fingerprint(query["sql"]) for query in captured)
+    lines = ["Repeated statements:"]
+    lines += [f"  {count}× {sql}" for sql, count in counts.most_common() if count > 1] or ["  (none)"]
+    lines.append("Executed statements:")
+    lines += [f"  {index}. {query['sql']}" for index, query in enumerate(captured, start=1)]
+    return "\n".join(lines)
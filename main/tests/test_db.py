@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+from main.db import apply_sqlite_pragmas, call_with_retry, get_sqlite_pragmas, is_locked_error
+
+
+class SqlitePragmaTests(SimpleTestCase):
+    # Test that the tuning PRAGMAs are applied to a file database
+    def test_pragmas_applied_to_file_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = sqlite3.connect(os.path.join(tmp, "db.sqlite3"))
+            apply_sqlite_pragmas(conn.cursor())
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 20000)  # OPTIONS timeout of 20 s
+            conn.close()
+
+    # Test that busy_timeout follows the database's driver timeout
+    def test_busy_timeout_follows_driver_timeout(self):
+        self.assertEqual(get_sqlite_pragmas({"OPTIONS": {"timeout": 2.5}})["busy_timeout"], 2500)
+        self.assertEqual(get_sqlite_pragmas({"OPTIONS": {}})["busy_timeout"], 5000)
+
+    # Test that settings override defaults and None disables a PRAGMA
+    @override_settings(SQLITE_PRAGMAS={"busy_timeout": 100, "mmap_size": None})
+    def test_settings_override_defaults(self):
+        pragmas = get_sqlite_pragmas()
+        self.assertEqual(pragmas["busy_timeout"], 100)
+        self.assertEqual(pragmas["journal_mode"], "WAL")
+
+        cursor = MagicMock()
+        apply_sqlite_pragmas(cursor, pragmas)
+        executed = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertIn("PRAGMA busy_timeout = 100", executed)
+        self.assertFalse(any("mmap_size" in sql for sql in executed))
+
+    # Test that lock contention errors are recognized
+    def test_is_locked_error(self):
+        self.assertTrue(is_locked_error(OperationalError("database is locked")))
+        self.assertFalse(is_locked_error(OperationalError("no such table: cell")))
+
+
+@patch("main.db.time.sleep")
+class CallWithRetryTests(SimpleTestCase):
+    # Connection outside of any transaction
+    connection = MagicMock(in_atomic_block=False)
+
+    # Test that a locked write is retried until it succeeds
+    def test_retries_locked_errors(self, sleep):
+        func = MagicMock(side_effect=[OperationalError("database is locked"), "ok"])
+        self.assertEqual(call_with_retry(func, attempts=3, connection=self.connection), "ok")
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(sleep.call_count, 1)
+
+    # Test that the last error is raised once all attempts are used
+    def test_gives_up_after_attempts(self, sleep):
+        func = MagicMock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            call_with_retry(func, attempts=3, connection=self.connection)
+        self.assertEqual(func.call_count, 3)
+
+    # Test that unrelated errors are not retried
+    def test_other_errors_are_not_retried(self, sleep):
+        func = MagicMock(side_effect=OperationalError("no such table"))
+        with self.assertRaises(OperationalError):
+            call_with_retry(func, attempts=3, connection=self.connection)
+        self.assertEqual(func.call_count, 1)
+
+    # Test that nothing is retried inside an outer transaction
+    def test_no_retry_inside_atomic_block(self, sleep):
+        func = MagicMock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            call_with_retry(func, attempts=3, connection=MagicMock(in_atomic_block=True))
+        self.assertEqual(func.call_count, 1)
+
+
+class BenchSqliteWritesCommandTests(SimpleTestCase):
+    # Test that the benchmark runs both modes and reports them
+    def test_reports_both_modes(self):
+        out = StringIO()
+        call_command("bench_sqlite_writes", threads=2, ops=5, rows=81, stdout=out)
+        self.assertIn("default:", out.getvalue())
+        self.assertIn("tuned:", out.getvalue())
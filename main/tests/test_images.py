@@ -0,0 +1,119 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+
+class OptimizeImagesTests(SimpleTestCase):
+    def setUp(self):
+        # Scratch static/ directory with one large story image and one room image
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = Path(self.tmp.name)
+        (self.static_dir / "story").mkdir()
+        (self.static_dir / "rooms").mkdir()
+        Image.new("RGB", (2000, 1000), "navy").save(self.static_dir / "story" / "Intro1.png")
+        Image.new("RGBA", (1024, 1024), (200, 0, 0, 128)).save(self.static_dir / "rooms" / "garaz.png")
+
+        self.settings_override = override_settings(OPTIMIZED_STATIC_SOURCE=self.static_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def build(self):
+        call_command("optimize_images", no_avif=True, stdout=StringIO())
+        return json.loads((self.static_dir / "optimized" / "manifest.json").read_text(encoding="utf-8"))
+
+    # Test that variants are written at the display widths without upscaling
+    def test_writes_variants_at_display_widths(self):
+        manifest = self.build()
+
+        story = manifest["images"]["story/Intro1.png"]["variants"]["webp"]
+        self.assertEqual([v["width"] for v in story], [1792, 1280, 640])
+        rooms = manifest["images"]["rooms/garaz.png"]["variants"]["webp"]
+        self.assertEqual([v["width"] for v in rooms], [520, 260])
+
+        for variant in story + rooms:
+            path = self.static_dir / variant["path"]
+            self.assertTrue(path.exists())
+            with Image.open(path) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.width, variant["width"])
+
+    # Test that filenames carry a content hash and rebuilding is stable
+    def test_filenames_are_content_hashed(self):
+        first = self.build()
+        second = self.build()
+        self.assertEqual(first, second)
+
+        name = Path(first["images"]["rooms/garaz.png"]["variants"]["webp"][0]["path"]).name
+        self.assertRegex(name, r"^garaz-520\.[0-9a-f]{10}\.webp$")
+
+    # Test that {% static %} keeps serving the original file once the variants are built
+    def test_static_lookup_keeps_original(self):
+        self.build()
+        self.assertEqual(static("story/Intro1.png"), "/static/story/Intro1.png")
+        self.assertEqual(static("css/style.css"), "/static/css/style.css")
+
+    # Test that the picture tag offers the WebP variants with the original image as fallback
+    def test_picture_tag(self):
+        manifest = self.build()
+        variants = manifest["images"]["rooms/garaz.png"]["variants"]["webp"]
+
+        html = Template("{% load static_images %}{% static_picture 'rooms/garaz.png' '260px' 'room' %}").render(Context())
+        srcset = ", ".join(f"/static/{v['path']} {v['width']}w" for v in variants)
+        self.assertEqual(html, f'<picture><source type="image/webp" srcset="{srcset}" sizes="260px">'
+                               f'<img src="/static/rooms/garaz.png" class="room"></picture>')
+
+    # Test that the srcset tag lists every variant with its width
+    def test_srcset_tag(self):
+        self.build()
+        html = Template("{% load static_images %}{% static_srcset 'rooms/garaz.png' %}").render(Context())
+        self.assertIn(" 520w, ", html)
+        self.assertTrue(html.endswith(" 260w"))
+
+    # Test that the page background is served as an image-set of the variants with the JPEG as fallback
+    def test_page_background_image_set(self):
+        (self.static_dir / "images").mkdir()
+        Image.new("RGB", (2400, 1600), "black").save(self.static_dir / "images" / "dark_house.jpg")
+        manifest = self.build()
+        largest = manifest["images"]["images/dark_house.jpg"]["variants"]["webp"][0]
+
+        css = Template("{% load static_images %}{% static_image_set 'images/dark_house.jpg' %}").render(Context())
+        self.assertEqual(largest["width"], 1920)
+        self.assertEqual(css, f'image-set(url("/static/{largest["path"]}") type("image/webp"), '
+                              f'url("/static/images/dark_house.jpg") type("image/jpeg"))')
+        html = Template("{% extends 'base.html' %}").render(Context())
+        self.assertIn(f"body {{ background-image: {css}; }}", html)
+
+    # Test that story images get a small inline placeholder and other images do not
+    def test_story_placeholder(self):
+        manifest = self.build()
+        placeholder = manifest["images"]["story/Intro1.png"]["placeholder"]
+        self.assertTrue(placeholder.startswith("data:image/webp;base64,"))
+        self.assertLess(len(placeholder), 1024)
+        self.assertNotIn("placeholder", manifest["images"]["rooms/garaz.png"])
+
+        html = Template("{% load static_images %}{% static_placeholder 'story/Intro1.png' %}").render(Context())
+        self.assertEqual(html, placeholder)
+
+class StaticLookupWithoutManifestTests(SimpleTestCase):
+    # Test that images are served unchanged before the build command ran
+    @override_settings(OPTIMIZED_STATIC_SOURCE=Path(tempfile.gettempdir()) / "missing-static-dir")
+    def test_falls_back_to_original(self):
+        self.assertEqual(static("story/Intro1.png"), "/static/story/Intro1.png")
+        html = Template("{% load static_images %}{% static_srcset 'story/Intro1.png' %}").render(Context())
+        self.assertEqual(html, "")
+        html = Template("{% load static_images %}{% static_placeholder 'story/Intro1.png' %}").render(Context())
+        self.assertEqual(html, "")
+        html = Template("{% load static_images %}{% static_image_set 'images/dark_house.jpg' %}").render(Context())
+        self.assertEqual(html, "")
+        html = Template("{% load static_images %}{% static_picture 'rooms/garaz.png' '260px' %}").render(Context())
+        self.assertEqual(html, '<picture><img src="/static/rooms/garaz.png" class=""></picture>')
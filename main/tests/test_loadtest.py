@@ -0,0 +1,63 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+from gameplay.models import Item, Room
+from gameplay.utils import GameCreationError
+
+
+class InlineExecutor:
+    """
+    Runs game creation jobs immediately, so the test does not race a worker thread for the database.
+    """
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@override_settings(QUERY_LOG=False)
+class LoadTestCommandTests(TransactionTestCase):
+    def setUp(self):
+        # 9 rooms with 9 items each (numbers 1–9, distinct group_ids)
+        for i in range(9):
+            room = Room.objects.create(name=f"Room {i}")
+            for n in range(9):
+                Item.objects.create(name=f"Item {i}-{n}", number=n + 1, room=room, group_id=f"group_{n}")
+
+    # Test that a simulated player finishes a game and every endpoint is reported without errors
+    def test_simulated_player_completes_game(self):
+        out = StringIO()
+        call_command("loadtest", players=1, concurrency=1, stdout=out, stderr=StringIO())
+        report = out.getvalue()
+
+        for endpoint in ("register", "start_new_game", "game_block", "place_item", "story_so_far", "scoreboard"):
+            self.assertRegex(report, rf"{endpoint}\s+\d+\s+0\.0%")
+        self.assertIn("1 games completed", report)
+
+        # The throwaway account is removed after the run
+        self.assertFalse(User.objects.filter(username__startswith="loadtest-").exists())
+
+    # Test that with asynchronous creation the player polls the preparing page's status until the game is ready
+    def test_simulated_player_waits_for_async_game(self):
+        out = StringIO()
+        with self.settings(ASYNC_GAME_CREATION=["easy"]), \
+                patch("gameplay.jobs.get_executor", return_value=InlineExecutor()):
+            call_command("loadtest", players=1, concurrency=1, stdout=out, stderr=StringIO())
+        report = out.getvalue()
+
+        self.assertRegex(report, r"creation_status\s+\d+\s+0\.0%")
+        self.assertIn("1 games completed", report)
+
+    # Test that a failed asynchronous creation aborts the player with a clear message
+    def test_failed_async_game_aborts_player(self):
+        out, err = StringIO(), StringIO()
+        with self.settings(ASYNC_GAME_CREATION=["easy"]), \
+                patch("gameplay.jobs.get_executor", return_value=InlineExecutor()), \
+                patch("gameplay.jobs.create_game_for_player", side_effect=GameCreationError):
+            call_command("loadtest", players=1, concurrency=1, stdout=out, stderr=err)
+
+        self.assertIn("0 games completed", out.getvalue())
+        self.assertIn("instead of a game", err.getvalue())
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from main.metrics import Histogram, MetricsRegistry, registry
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+
+    def tearDown(self):
+        registry.reset()
+
+    # Test that staff responses carry Server-Timing with DB and template timings
+    def test_server_timing_header(self):
+        User.objects.create_user(username="admin", password="test123", is_staff=True)
+        self.client.login(username="admin", password="test123")
+        response = self.client.get(reverse("main_page"))
+        header = response["Server-Timing"]
+        self.assertIn("db;dur=", header)
+        self.assertIn("tpl;dur=", header)
+        self.assertIn("total;dur=", header)
+
+    # Test that other clients only get Server-Timing when DEBUG is on
+    def test_server_timing_hidden_from_public(self):
+        self.assertFalse(self.client.get(reverse("main_page")).has_header("Server-Timing"))
+        User.objects.create_user(username="player", password="test123")
+        self.client.login(username="player", password="test123")
+        self.assertFalse(self.client.get(reverse("main_page")).has_header("Server-Timing"))
+        with self.settings(DEBUG=True):
+            self.assertTrue(self.client.get(reverse("main_page")).has_header("Server-Timing"))
+
+    # Test that requests are recorded per view name with their query counts
+    def test_records_per_view_histograms(self):
+        User.objects.create_user(username="tester", password="test123")
+        self.client.login(username="tester", password="test123")
+        self.client.get(reverse("scoreboard"))
+        self.client.get(reverse("scoreboard"))
+
+        duration = registry.get_histogram("request_duration_seconds", view="scoreboard")
+        self.assertEqual(duration.count, 2)
+        queries = registry.get_histogram("request_db_queries", view="scoreboard")
+        self.assertGreater(queries.sum, 0)
+        self.assertGreater(registry.get_histogram("request_template_seconds", view="scoreboard").sum, 0)
+
+    # Test that /metrics is staff only and exports Prometheus text
+    def test_metrics_endpoint_is_staff_only(self):
+        User.objects.create_user(username="player", password="test123")
+        self.client.login(username="player", password="test123")
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 302)
+
+        User.objects.create_user(username="admin", password="test123", is_staff=True)
+        self.client.login(username="admin", password="test123")
+        self.client.get(reverse("main_page"))
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE mystdoku_request_duration_seconds histogram", body)
+        self.assertIn('mystdoku_request_duration_seconds_count{view="home_landing"} 1', body)
+        self.assertIn('mystdoku_request_duration_seconds_recent{view="home_landing",quantile="0.99"}', body)
+
+
+class HistogramTests(SimpleTestCase):
+    # Test cumulative buckets and rolling-window quantiles
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram(buckets=(1, 5, 10), window=4)
+        for value in (0.5, 3, 7, 20, 2):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative_counts(), [(1, 1), (5, 3), (10, 4), ("+Inf", 5)])
+        # The window only holds the last four values: 3, 7, 20, 2
+        self.assertEqual(histogram.quantile(0.5), 7)
+        self.assertEqual(histogram.quantile(0.99), 20)
+
+    # Test counter rendering and label escaping
+    def test_render_counter(self):
+        metrics = MetricsRegistry()
+        metrics.inc("errors_total", view='say "hi"')
+        self.assertIn('mystdoku_errors_total{view="say \\"hi\\""} 1', metrics.render())
@@ -0,0 +1,126 @@
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from main.compression import parse_accept_encoding
+from main.middleware import CompressionMiddleware
+
+
+class PrecompressedStaticTests(TestCase):
+    def setUp(self):
+        # Scratch STATIC_ROOT with a stylesheet and a content-hashed image
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "css").mkdir()
+        (self.root / "css" / "style.css").write_text("body { color: black; }\n" * 200)
+        (self.root / "items.7c467e4a1e.png").write_bytes(b"\x89PNG" + b"\x00" * 100)
+
+        self.settings_override = override_settings(STATIC_ROOT=str(self.root))
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    # Test that the command writes a smaller .gz sibling for compressible files only
+    def test_compress_static_writes_gzip_siblings(self):
+        call_command("compress_static", stdout=StringIO())
+
+        gz = self.root / "css" / "style.css.gz"
+        self.assertTrue(gz.exists())
+        self.assertEqual(gzip.decompress(gz.read_bytes()), (self.root / "css" / "style.css").read_bytes())
+        self.assertFalse((self.root / "items.7c467e4a1e.png.gz").exists())
+
+    # Test that a gzip-capable client gets the precompressed file
+    def test_serves_gzip_sibling(self):
+        call_command("compress_static", stdout=StringIO())
+
+        response = self.client.get("/static/css/style.css", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = b"".join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), (self.root / "css" / "style.css").read_bytes())
+
+    # Test that clients without gzip support get the plain file
+    def test_serves_plain_file_without_accept_encoding(self):
+        call_command("compress_static", stdout=StringIO())
+
+        response = self.client.get("/static/css/style.css")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    # Test that content-hashed files are cached forever
+    def test_hashed_files_are_immutable(self):
+        response = self.client.get("/static/items.7c467e4a1e.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    # Test revalidation with If-Modified-Since
+    def test_not_modified(self):
+        response = self.client.get("/static/css/style.css")
+        response = self.client.get("/static/css/style.css", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    # Test that revalidating a file with precompressed siblings keeps Vary: Accept-Encoding
+    def test_not_modified_varies_by_encoding(self):
+        call_command("compress_static", stdout=StringIO())
+
+        response = self.client.get("/static/css/style.css", HTTP_ACCEPT_ENCODING="gzip")
+        response = self.client.get("/static/css/style.css", HTTP_ACCEPT_ENCODING="gzip",
+                                   HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    # Test that files outside STATIC_ROOT are not served
+    def test_path_traversal_falls_through(self):
+        response = self.client.get("/static/../manage.py")
+        self.assertNotEqual(response.get("Content-Type"), "text/x-python")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+    def process(self, response):
+        return CompressionMiddleware(lambda request: response)(self.request)
+
+    # Test that large HTML responses are gzipped
+    @override_settings(GZIP_MIN_LENGTH=1024)
+    def test_large_html_is_compressed(self):
+        response = self.process(HttpResponse("<p>MystDoku</p>" * 500))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    # Test that large JSON responses are gzipped
+    @override_settings(GZIP_MIN_LENGTH=1024)
+    def test_large_json_is_compressed(self):
+        response = self.process(JsonResponse([{"username": f"player{i}"} for i in range(200)], safe=False))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    # Test that responses below the threshold are left alone
+    @override_settings(GZIP_MIN_LENGTH=1024)
+    def test_small_response_is_not_compressed(self):
+        response = self.process(HttpResponse("<p>short</p>" * 50))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    # Test that binary content types are not compressed
+    def test_binary_response_is_not_compressed(self):
+        response = self.process(HttpResponse(b"\x00" * 5000, content_type="image/png"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    # Test that 304 responses vary by encoding like the compressed response they revalidate
+    def test_not_modified_varies_by_encoding(self):
+        response = self.process(HttpResponseNotModified())
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    # Test Accept-Encoding parsing with q-values
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding("gzip;q=1.0, br;q=0, identity"), {"gzip", "identity"})
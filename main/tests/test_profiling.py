@@ -0,0 +1,67 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile_dir = Path(self.tmp.name)
+        self.settings_override = override_settings(PROFILE_DIR=self.profile_dir)
+        self.settings_override.enable()
+
+        User.objects.create_user(username="admin", password="test123", is_staff=True)
+        User.objects.create_user(username="player", password="test123")
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    # Test that staff can capture a profile with the query parameter
+    def test_staff_query_parameter_writes_profile(self):
+        self.client.login(username="admin", password="test123")
+        response = self.client.get(reverse("scoreboard") + "?profile=1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["X-Profile"], r"^scoreboard-\d{8}-\d{6}-\d{6}\.prof$")
+        self.assertTrue((self.profile_dir / response["X-Profile"]).exists())
+
+    # Test that the header works as well
+    def test_staff_header_writes_profile(self):
+        self.client.login(username="admin", password="test123")
+        response = self.client.get(reverse("main_page"), HTTP_X_PROFILE="1")
+        self.assertTrue(response["X-Profile"].startswith("home_landing-"))
+
+    # Test that a false flag value does not trigger a capture
+    def test_false_flag_is_not_profiled(self):
+        self.client.login(username="admin", password="test123")
+        for response in (self.client.get(reverse("scoreboard") + "?profile=0"),
+                         self.client.get(reverse("scoreboard"), HTTP_X_PROFILE="false")):
+            self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(list(self.profile_dir.iterdir()), [])
+
+    # Test that regular players cannot trigger profiling
+    def test_non_staff_is_not_profiled(self):
+        self.client.login(username="player", password="test123")
+        response = self.client.get(reverse("scoreboard") + "?profile=1")
+        self.assertFalse(response.has_header("X-Profile"))
+        self.assertEqual(list(self.profile_dir.iterdir()), [])
+
+    # Test that the command lists captures and summarizes the newest one
+    def test_profiles_command(self):
+        self.client.login(username="admin", password="test123")
+        name = self.client.get(reverse("scoreboard") + "?profile=1")["X-Profile"]
+
+        out = StringIO()
+        call_command("profiles", stdout=out)
+        self.assertIn(name, out.getvalue())
+
+        out = StringIO()
+        call_command("profiles", view="scoreboard", summary=True, stdout=out)
+        self.assertIn("cumulative", out.getvalue())
+        self.assertIn("scoreboard", out.getvalue())
@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import ResolverMatch, reverse
+
+from gameplay.models import Room
+from main.metrics import registry
+from main.middleware import QueryLogMiddleware
+from main.querylog import fingerprint
+
+
+class FingerprintTests(SimpleTestCase):
+    # Test that literals and placeholders are normalized
+    def test_normalizes_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 5 AND name = 'O''Brien'  AND x = %s"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND x = ?",
+        )
+
+    # Test that IN lists of different lengths share one fingerprint
+    def test_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    # Test that numbers inside identifiers are kept
+    def test_keeps_identifiers(self):
+        self.assertEqual(fingerprint('SELECT "t1"."id" FROM "t1"'), 'SELECT "t1"."id" FROM "t1"')
+
+
+class QueryLogMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="test123")
+        self.client.login(username="tester", password="test123")
+        for i in range(9):
+            Room.objects.create(name=f"Room {i}")
+        registry.reset()
+
+    def tearDown(self):
+        registry.reset()
+
+    # Test that a lookup repeated per row is reported as N+1 with the view name
+    @override_settings(QUERY_LOG=True, QUERY_LOG_REPEAT_THRESHOLD=5, QUERY_LOG_SLOW_MS=10_000)
+    def test_reports_n_plus_one(self):
+        def room_names(request):
+            # One query per room, the pattern game_view used to have
+            names = [Room.objects.get(id=room_id).name for room_id in Room.objects.values_list("id", flat=True)]
+            return HttpResponse(", ".join(names))
+
+        request = RequestFactory().get("/")
+        request.resolver_match = ResolverMatch(room_names, (), {})
+        with self.assertLogs("main.querylog", "WARNING") as logs:
+            QueryLogMiddleware(room_names)(request)
+
+        self.assertTrue(any("Possible N+1 in room_names: 9×" in line and "gameplay_room" in line
+                            for line in logs.output))
+        self.assertEqual(registry.get_counter("query_n_plus_one_total", view="room_names"), 1)
+
+    # Test that every statement is logged as slow with a zero threshold
+    @override_settings(QUERY_LOG=True, QUERY_LOG_REPEAT_THRESHOLD=1000, QUERY_LOG_SLOW_MS=0)
+    def test_logs_slow_queries(self):
+        with self.assertLogs("main.querylog", "WARNING") as logs:
+            self.client.get(reverse("scoreboard"))
+        self.assertTrue(all("Slow query in scoreboard" in line for line in logs.output))
+
+    # Test that nothing is collected when the log is switched off
+    @override_settings(QUERY_LOG=False, QUERY_LOG_REPEAT_THRESHOLD=0, QUERY_LOG_SLOW_MS=0)
+    def test_disabled(self):
+        with self.assertNoLogs("main.querylog"):
+            self.client.get(reverse("scoreboard"))
@@ -0,0 +1,26 @@
+import os
+import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from gameplay.models import Room
+from main.testing import TIMING_ENV_VAR, QueryBudgetMixin
+
+
+class QueryBudgetMixinTests(QueryBudgetMixin, TestCase):
+
+    # Test that the query count is always enforced
+    def test_query_count(self):
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(0):
+                Room.objects.count()
+
+    # Test that the wall-time ceiling fails by default and QUERY_BUDGET_TIMING=0 turns it off
+    def test_time_ceiling_can_be_turned_off(self):
+        with patch.dict(os.environ, {TIMING_ENV_VAR: "0"}):
+            with self.assertQueryBudget(1, max_seconds=0.001):
+                time.sleep(0.01)
+        with patch.dict(os.environ, {TIMING_ENV_VAR: ""}), self.assertRaises(AssertionError):
+            with self.assertQueryBudget(1, max_seconds=0.001):
+                time.sleep(0.01)
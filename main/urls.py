@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import home_landing, play_redirect, fallback_redirect
+from .views import home_landing, play_redirect, fallback_redirect, metrics
 
 urlpatterns = [
     path('', home_landing, name='main_page'),
     path('play_redirect/', play_redirect, name='play_redirect'),
+    path('metrics', metrics, name='metrics'),  # Prometheus scrape target, staff only
     path('<path:unused_path>', fallback_redirect),
 ]
 
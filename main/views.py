@@ -1,7 +1,11 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 
+from .metrics import registry
+
 def home_landing(request):
     """
     Main page will serve as billboard and launching point of the game.
@@ -34,4 +38,11 @@ def register(request):
     return render(request, 'auth/register.html', {'form': form})
 
 def fallback_redirect(request, unused_path):
-    return redirect('main_page')  # redirect to main page
\ No newline at end of file
+    return redirect('main_page')  # redirect to main page
+
+@staff_member_required
+def metrics(request):
+    """
+    Per-view request timings in the Prometheus text format (staff only).
+    """
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
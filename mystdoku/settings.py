@@ -44,19 +44,24 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'main.middleware.PrecompressedStaticMiddleware',  # Serves collected static files (precompressed, cached)
+    'main.middleware.CompressionMiddleware',  # Gzips larger dynamic HTML/JSON responses
+    'main.middleware.PerformanceMiddleware',  # Server-Timing header (staff or DEBUG) and per-view histograms (/metrics)
+    'main.middleware.QueryLogMiddleware',  # Slow-query and N+1 log, enabled by QUERY_LOG
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.middleware.ProfilingMiddleware',  # Staff opt-in cProfile capture (X-Profile: 1 or ?profile=1)
 ]
 
 ROOT_URLCONF = 'mystdoku.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.template_backends.TimedDjangoTemplates',  # DjangoTemplates with render timing
         'DIRS': [BASE_DIR / "templates"],  # Added path to global templates
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,9 +86,93 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,  # Keep connections open between requests (PRAGMAs are applied once per connection)
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,  # Seconds to wait for a lock (also sets PRAGMA busy_timeout, see main/db.py)
+            'transaction_mode': 'IMMEDIATE',  # Take the write lock at BEGIN, avoids deadlocking lock upgrades
+        },
     }
 }
 
+# SQLite tuning applied on every new connection: main.db.DEFAULT_SQLITE_PRAGMAS, with
+# overrides from an optional SQLITE_PRAGMAS dict (a value of None skips that PRAGMA)
+
+# Retries of contended writes ("database is locked") with jittered exponential backoff
+DB_RETRY_ATTEMPTS = 5
+DB_RETRY_BASE_DELAY = 0.05
+
+# Game creation retries boards failing the solvability check within these limits
+GAME_CREATION_ATTEMPTS = 5
+GAME_CREATION_TIME_BUDGET = 2.0  # seconds; no new attempt is started after this
+
+# Puzzle difficulty by the hardest solving technique needed (levels of gameplay.rating.TECHNIQUES:
+# 1 naked single, 2 hidden single, 3 locked candidates, ... 8 X-wing, 9 guessing);
+# a new board is dug up to RATING_ATTEMPTS times looking for a puzzle within its band
+DIFFICULTY_RATINGS = {'easy': (1, 1), 'medium': (2, 2), 'hard': (3, 8)}
+RATING_ATTEMPTS = 10
+
+# Cache shared by all worker processes: active game ids, progress summaries, the catalog version
+# and the daily challenges are cached here and invalidated on change. Set REDIS_URL (needs the
+# `redis` package) when running more than one process; without it every process has its own
+# local-memory cache, and those entries are only kept for LOCAL_CACHE_TIMEOUT seconds so that
+# changes made by other processes show up quickly (see gameplay.cache.shared_timeout).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # Room for the blocks of every active game, the ratings and the per-user entries;
+            # the default of 300 would cull them routinely (a third at a time when full)
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+LOCAL_CACHE_TIMEOUT = 30
+
+# Speculative pre-generation: game_selection and a completed game build the player's likely
+# next game on a background thread; start_new_game claims it instead of generating one
+GAME_PREFETCH = True
+GAME_PREFETCH_TTL = 600  # seconds; unclaimed reserved games are deleted after this
+GAME_PREFETCH_WORKERS = 2
+
+# Difficulties whose games are generated on a worker pool while the player waits on a
+# "preparing" page that polls for the game, so no request thread runs the generation.
+# The job state lives in the database (GameCreationJob), so every server process answers the polls
+ASYNC_GAME_CREATION = ["hard"]
+GAME_CREATION_WORKERS = 2
+GAME_CREATION_POLL_INTERVAL = 0.5  # seconds between the preparing page's status polls
+
+# Entries shown (and kept cached) on the daily challenge leaderboard
+DAILY_LEADERBOARD_SIZE = 20
+
+# Per-request timings (Server-Timing header, histograms on the staff-only /metrics page)
+PERFORMANCE_METRICS = True
+
+# Number of recent observations per view the p50/p95/p99 on /metrics are computed from
+METRICS_WINDOW = 1000
+
+# Slow-query and N+1 log (logger "main.querylog"); the middleware is skipped entirely when off
+QUERY_LOG = DEBUG
+QUERY_LOG_SLOW_MS = 100  # log statements slower than this
+QUERY_LOG_REPEAT_THRESHOLD = 10  # report a statement running more often than this in one request
+
+# Where staff-requested cProfile captures are written (see `manage.py profiles`)
+PROFILE_DIR = BASE_DIR / 'profiles'
+
+# JSON baselines of `manage.py bench_generator --save/--compare`
+BENCHMARK_DIR = BASE_DIR / 'benchmarks'
+
+# Memory-mapped puzzle bank written by `manage.py export_puzzle_bank`; while it exists,
+# new games pick their board from it instead of generating one (set to None to turn off)
+PUZZLE_BANK_FILE = BASE_DIR / 'puzzle_bank.bin'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -121,6 +210,14 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Target of collectstatic; served by main.middleware.PrecompressedStaticMiddleware
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Cache lifetime (seconds) of static files without a content hash in their name
+STATIC_MAX_AGE = 60 * 60
+
+# Dynamic responses smaller than this (bytes) are sent uncompressed
+GZIP_MIN_LENGTH = 1024
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.apps import apps
 
 class PlayerScore(models.Model):
     """
@@ -37,28 +36,15 @@ class PlayerScore(models.Model):
     def update_unlocked_memories(self):
         """
         Updates the number of unlocked memories for this user
-        by counting unlocked entries from PlayerStoryProgress.
+        by counting unlocked entries from the player's story progress.
         """
-        # Dynamic import model from `apps.get_model`
-        PlayerStoryProgress = apps.get_model('gameplay', 'PlayerStoryProgress')
+        # Imported here to avoid a circular import between the apps
+        from gameplay.cache import load_progress_summary
 
-        try:
-            # Load memory progress for this user
-            story_progress = PlayerStoryProgress.objects.get(player=self.user)
-
-            # Count unlocked memories for all difficulties
-            unlocked_easy = len(story_progress.unlocked_easy)
-            unlocked_medium = len(story_progress.unlocked_medium)
-            unlocked_hard = len(story_progress.unlocked_hard)
-
-            # Save the total count
-            self.unlocked_memories = unlocked_easy + unlocked_medium + unlocked_hard
-            self.save()
-
-        except PlayerStoryProgress.DoesNotExist:
-            # If progress does not exist (new player), reset to 0
-            self.unlocked_memories = 0
-            self.save()
+        # Count unlocked memories for all difficulties from the cached progress summary
+        # (a new player without progress simply has 0)
+        self.unlocked_memories = load_progress_summary(self.user_id).total
+        self.save()
 
     def __str__(self):
         return f"{self.user.username} - Score"
\ No newline at end of file
@@ -0,0 +1,72 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from main.testing import QueryBudgetMixin
+from score.models import PlayerScore
+
+# Scoreboard size the budgets are measured against
+PLAYER_COUNT = 10_000
+
+
+class ScoreQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Query and time budgets of the scoreboard pages and APIs with 10 000 players.
+
+    A failing budget prints the executed SQL; raise a budget only together with the reason.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        password = make_password("test123")
+        rng = random.Random(42)
+        users = User.objects.bulk_create(
+            User(username=f"player{n:05d}", password=password) for n in range(PLAYER_COUNT)
+        )
+        PlayerScore.objects.bulk_create(
+            PlayerScore(
+                user=user,
+                total_completed_games=rng.randint(0, 60),
+                completed_easy=rng.randint(0, 20),
+                best_time_easy=rng.uniform(60, 900) if rng.random() < 0.8 else None,
+                unlocked_memories=rng.randint(0, 60),
+            )
+            for user in users
+        )
+        cls.user = users[-1]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    # Test the default scoreboard page
+    def test_scoreboard_budget(self):
+        with self.assertQueryBudget(4, max_seconds=5.0):
+            response = self.client.get(reverse("scoreboard"))
+        self.assertEqual(response.context["page_obj"].paginator.count, PLAYER_COUNT)
+
+    # Test sorting by username on a later page
+    def test_scoreboard_sorted_by_username_budget(self):
+        with self.assertQueryBudget(4, max_seconds=5.0):
+            response = self.client.get(reverse("scoreboard") + "?sort=user__username&page=500")
+        self.assertEqual(response.context["page_obj"].number, 500)
+
+    # Test the anonymous scoreboard
+    def test_scoreboard_anonymous_budget(self):
+        self.client.logout()
+        with self.assertQueryBudget(1, max_seconds=5.0):
+            self.client.get(reverse("scoreboard") + "?sort=best_time_easy")
+
+    # Test the JSON scoreboard API
+    def test_api_scoreboard_budget(self):
+        with self.assertQueryBudget(3, max_seconds=1.0):
+            response = self.client.get(reverse("api_scoreboard") + "?limit=100&offset=5000")
+        self.assertEqual(len(response.json()), 100)
+
+    # Test the API documentation page
+    def test_api_docs_budget(self):
+        with self.assertQueryBudget(3, max_seconds=1.0):
+            response = self.client.get(reverse("api_docs"))
+        self.assertEqual(response.status_code, 200)
@@ -3,6 +3,8 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from score.models import PlayerScore
 from pathlib import Path
+from unittest.mock import patch
+import markdown
 
 class ScoreboardViewTests(TestCase):
     def setUp(self):
@@ -69,4 +71,24 @@ class ApiDocsViewTests(TestCase):
         response = self.client.get(reverse("api_docs"))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "<h1>API Docs</h1>")
-        self.assertContains(response, "<p>This is test content.</p>")
\ No newline at end of file
+        self.assertContains(response, "<p>This is test content.</p>")
+
+    def test_api_docs_rendered_once_per_file_version(self):
+        with patch("markdown.markdown", wraps=markdown.markdown) as md:
+            self.client.get(reverse("api_docs"))
+            self.client.get(reverse("api_docs"))
+            self.assertEqual(md.call_count, 1)
+
+            # Editing the file invalidates the cached HTML
+            self.md_path.write_text("# Changed\n\nNew content here.", encoding="utf-8")
+            response = self.client.get(reverse("api_docs"))
+            self.assertEqual(md.call_count, 2)
+            self.assertContains(response, "<h1>Changed</h1>")
+
+    def test_api_docs_answers_304_for_matching_etag(self):
+        response = self.client.get(reverse("api_docs"))
+        etag = response["ETag"]
+
+        response = self.client.get(reverse("api_docs"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept-Encoding", response["Vary"])
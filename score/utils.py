@@ -1,7 +1,10 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Least
 from score.models import PlayerScore
 from django.utils import timezone
 
-def update_score_for_game(game):
+def update_score_for_game(game, unlocked_memories=None):
     """
     Updates the player's score after completing a game.
 
@@ -9,49 +12,63 @@ def update_score_for_game(game):
     - Increases counters for total games and per difficulty
     - Updates first-completion timestamps per difficulty
     - Stores best completion time per difficulty
-    - Recalculates unlocked memories
+    - Stores the number of unlocked memories
+
+    All of it happens in a single conditional UPDATE built from F() expressions,
+    so concurrent completions of the same player can't overwrite each other.
+    A first-time player gets the row inserted instead.
+
+    Args:
+        game (Game): The completed game.
+        unlocked_memories (int | None): Total unlocked memories of the player,
+            read from the cached progress summary when not given.
     """
     player = game.player
-    duration = (timezone.now() - game.created_at).total_seconds()
+    now = timezone.now()
+    duration = (now - game.created_at).total_seconds()
     difficulty = game.difficulty
 
-    # Get or create the PlayerScore object for this user
-    score, _ = PlayerScore.objects.get_or_create(user=player)
+    if unlocked_memories is None:
+        # Imported here to avoid a circular import between the apps
+        from gameplay.cache import load_progress_summary
+        unlocked_memories = load_progress_summary(player.pk).total
 
-    # Increase total completed games
-    score.total_completed_games += 1
-    if not score.total_completed_time:
-        score.total_completed_time = timezone.now()
+    # Increase total completed games and store the timestamp of the first win
+    changes = {
+        "total_completed_games": F("total_completed_games") + 1,
+        "total_completed_time": Coalesce(F("total_completed_time"), Value(now)),
+        "unlocked_memories": unlocked_memories,
+    }
+    # Values used when the player completes their very first game
+    initial = {
+        "total_completed_games": 1,
+        "total_completed_time": now,
+        "unlocked_memories": unlocked_memories,
+    }
 
     # Update stats based on difficulty
-    if difficulty == "easy":
-        score.completed_easy += 1
-        # Store timestamp of first easy win
-        if not score.completed_easy_time:
-            score.completed_easy_time = timezone.now()
-        # Update best time if it's the first run or better than previous
-        if not score.best_time_easy or duration < score.best_time_easy:
-            score.best_time_easy = duration
-
-    elif difficulty == "medium":
-        score.completed_medium += 1
-        # Store timestamp of first medium win
-        if not score.completed_medium_time:
-            score.completed_medium_time = timezone.now()
-        # Update best time if it's the first run or better than previous
-        if not score.best_time_medium or duration < score.best_time_medium:
-            score.best_time_medium = duration
-
-    elif difficulty == "hard":
-        score.completed_hard += 1
-        # Store timestamp of first hard win
-        if not score.completed_hard_time:
-            score.completed_hard_time = timezone.now()
+    if difficulty in ("easy", "medium", "hard"):
+        completed = f"completed_{difficulty}"
+        completed_time = f"completed_{difficulty}_time"
+        best_time = f"best_time_{difficulty}"
+
+        changes[completed] = F(completed) + 1
+        # Store timestamp of the first win of this difficulty
+        changes[completed_time] = Coalesce(F(completed_time), Value(now))
         # Update best time if it's the first run or better than previous
-        if not score.best_time_hard or duration < score.best_time_hard:
-            score.best_time_hard = duration
+        changes[best_time] = Least(Coalesce(F(best_time), Value(duration)), Value(duration))
+
+        initial[completed] = 1
+        initial[completed_time] = now
+        initial[best_time] = duration
+
+    # Existing player → one atomic UPDATE
+    if PlayerScore.objects.filter(user=player).update(**changes):
+        return
 
-    # Save updated stats
-    score.save()
-    # Recalculate number of unlocked memories
-    score.update_unlocked_memories()
\ No newline at end of file
+    # First-time player → insert; if a concurrent completion inserted first, update that row
+    try:
+        with transaction.atomic():
+            PlayerScore.objects.create(user=player, **initial)
+    except IntegrityError:
+        PlayerScore.objects.filter(user=player).update(**changes)
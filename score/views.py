@@ -1,10 +1,14 @@
 from django.core.paginator import Paginator
 from .models import PlayerScore
-import markdown
+from django.conf import settings
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from pathlib import Path
 from datetime import timedelta , datetime
 from django.utils.timezone import make_aware
+import hashlib
+import threading
 
 # Precomputed aware datetime for fallback sorting (avoids recomputing each time)
 AWARE_MAX_DATETIME = make_aware(datetime.max.replace(microsecond=0))
@@ -23,8 +27,8 @@ def scoreboard(request):
     # Get sort criteria from query (?sort=...)
     sort_field = request.GET.get("sort", "total_completed_games")
 
-    # Load all scores from the database
-    all_scores = list(PlayerScore.objects.all())
+    # Load all scores from the database (with usernames for sorting and display)
+    all_scores = list(PlayerScore.objects.select_related("user"))
 
     # Apply sorting based on the selected field
     if sort_field == "user__username":
@@ -61,7 +65,7 @@ def scoreboard(request):
     current_player_score = None
     if request.user.is_authenticated:
         try:
-            user_score = next(s for s in scores_with_rank if s.user == request.user)
+            user_score = next(s for s in scores_with_rank if s.user_id == request.user.pk)
             if user_score not in page_obj:
                 current_player_score = user_score
         except StopIteration:
@@ -74,19 +78,75 @@ def scoreboard(request):
         "current_player_score": current_player_score,
     })
 
-def api_docs(request):
+# Location of the API documentation, independent of the working directory
+API_DOCS_PATH = Path(settings.BASE_DIR) / "docs" / "api.md"
+
+# Rendered API docs: (mtime_ns, size) -> (html, digest); guarded by a lock for threaded workers
+_api_docs_cache = {}
+_api_docs_lock = threading.Lock()
+
+
+def get_api_docs_html():
     """
-    Loads the API documentation (Markdown) and renders it as HTML.
+    Returns the API documentation rendered to HTML together with its content digest.
+
+    The rendered HTML is cached in memory and keyed by the file's modification time and size,
+    so a request only costs a stat call until docs/api.md is edited.
+    Python-Markdown is imported lazily to keep it out of worker startup.
+
+    Returns:
+        tuple[str, str]: (html_content, digest)
+    """
+    stat = API_DOCS_PATH.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _api_docs_cache.get(API_DOCS_PATH)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    with _api_docs_lock:
+        # Another thread may have rendered the same version while we waited
+        cached = _api_docs_cache.get(API_DOCS_PATH)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        import markdown
+
+        md_content = API_DOCS_PATH.read_text(encoding="utf-8")
+        # Convert Markdown content to HTML using Python-Markdown
+        html_content = markdown.markdown(md_content, extensions=["extra", "tables"])
+        digest = hashlib.sha1(md_content.encode("utf-8")).hexdigest()
+
+        _api_docs_cache[API_DOCS_PATH] = (key, (html_content, digest))
+        return html_content, digest
+
+
+def api_docs_etag(request):
     """
+    Builds the ETag for the API docs page.
 
-    # Load the Markdown file
-    md_path = Path("docs/api.md")
-    with open(md_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
+    The page body depends on the docs content and on the navigation state of the user
+    (login state, CSRF cookie for the logout form, link to the active game), so all of it is hashed together.
+    """
+    _, digest = get_api_docs_html()
+    parts = [digest, request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")]
+    if request.user.is_authenticated:
+        from gameplay.cache import get_active_game
+        game = get_active_game(request)
+        parts += [str(request.user.pk), str(game.id) if game else ""]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
 
-    # Convert Markdown content to HTML using Python-Markdown
-    html_content = markdown.markdown(md_content, extensions=["extra", "tables"])
 
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=api_docs_etag)
+def api_docs(request):
+    """
+    Loads the API documentation (Markdown) and renders it as HTML.
+
+    Rendering is cached per file version and the response carries an ETag,
+    so unchanged docs are answered with 304 Not Modified.
+    """
+    html_content, _ = get_api_docs_html()
 
     # Render the API documentation page
     return render(request, "score/api_docs.html", {